@@ -0,0 +1,95 @@
+import heapq
+
+from models.brokerage import Brokerage
+
+def to_cents(value: float) -> int:
+    """Converts an amount in reais to integer centavos."""
+    return round(value * 100)
+
+
+def allocate(total: int, weights: list) -> list:
+    """
+    Splits an integer total in proportion to integer weights, by largest remainder.
+
+    Every share is the floor of its exact proportion, and the units left over go to the shares
+    with the largest remainders (the first ones on ties), so the shares always add up to the
+    total exactly.
+
+    Args:
+        total (int): The amount to split, e.g. in centavos.
+        weights (list): The non-negative weight of each share.
+
+    Returns:
+        list: The integer share of each weight, all 0 if the weights add up to 0.
+    """
+    weight_total = sum(weights)
+
+    if not weight_total:
+        return [0] * len(weights)
+
+    sign, total = (-1, -total) if total < 0 else (1, total)
+    shares, remainders = [], []
+
+    for weight in weights:
+        share, remainder = divmod(total * weight, weight_total)
+        shares.append(share)
+        remainders.append(remainder)
+
+    left = total - sum(shares)
+
+    for index in heapq.nlargest(left, range(len(shares)), key=remainders.__getitem__):
+        shares[index] += 1
+
+    return [sign * share for share in shares]
+
+
+def apportion(amounts: list, sells: list, fee: float, ir: float) -> tuple:
+    """
+    Splits the fee of a note among its trades and its IR among its sells, in proportion to their amounts.
+
+    The split is made in centavos, so the shares add up exactly to the note totals.
+
+    Args:
+        amounts (list): The amount (price times quantity) of each trade.
+        sells (list): Whether each trade is a sell.
+        fee (float): The total fee of the note.
+        ir (float): The total IR of the note.
+
+    Returns:
+        tuple: (fee of each trade, IR of each trade, None for buys).
+    """
+    weights = [to_cents(abs(amount)) for amount in amounts]
+    fees = allocate(to_cents(fee), weights)
+    irs = allocate(to_cents(ir), [weight if sell else 0 for weight, sell in zip(weights, sells)])
+
+    return (
+        [cents / 100 for cents in fees],
+        [cents / 100 if sell else None for cents, sell in zip(irs, sells)],
+    )
+
+
+def apportion_brokerages(brokerages: list, fee: float, ir: float) -> None:
+    """
+    Sets the fee and IR of the brokerages of a note, see `apportion`.
+
+    Args:
+        brokerages (list): The Brokerage objects of the note.
+        fee (float): The total fee to split.
+        ir (float): The total IR to split among the sells.
+
+    Returns:
+        None
+    """
+    fees, irs = apportion(
+        [brokerage.price * brokerage.quantity for brokerage in brokerages],
+        [brokerage.operation == Brokerage.OPERATION_SELL for brokerage in brokerages],
+        fee,
+        ir
+    )
+
+    for brokerage, brokerage_fee, brokerage_ir in zip(brokerages, fees, irs):
+        brokerage.fee = brokerage_fee
+
+        if brokerage_ir is not None:
+            brokerage.ir = brokerage_ir
+
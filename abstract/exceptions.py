@@ -0,0 +1,32 @@
+class PDFPasswordError(ValueError):
+    """The PDF is encrypted and none of the passwords given opens it."""
+
+
+class PDFCorruptError(ValueError):
+    """The PDF cannot be parsed, e.g. it is truncated or not a PDF at all."""
+
+
+class PDFTooManyPagesError(ValueError):
+    """The PDF has more pages than the supervisor of the extraction allows."""
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """The extraction of a file took longer than the supervisor allows, and its worker was killed."""
+
+
+class ExtractionMemoryError(MemoryError):
+    """The extraction of a file exceeded the memory limit of its worker."""
+
+
+class WorkerCrashError(RuntimeError):
+    """The worker process extracting a file died without a result."""
+
+
+class RemoteExtractionError(Exception):
+    """An extraction server answered with an error whose exception type is not known here."""
+
+    def __init__(self, message: str, remote_type: str | None = None, code: int | None = None) -> None:
+        super().__init__(message)
+        # The name of the exception raised by the server, if it sent one, and the JSON-RPC error code
+        self.remote_type = remote_type
+        self.code = code
@@ -1,41 +1,544 @@
-import pdfplumber
 import abc
+import copy
+import hashlib
+import json
+import os
+import re
+
+from abstract import profiler, tokenizer
+from abstract.apportionment import apportion_brokerages
+from abstract.exceptions import PDFCorruptError
+from abstract.fee_scanner import FeeScanner
+from abstract.passwords import resolve_password
+from abstract.sources import as_source
+from abstract.table import Glyphs, read_table
+from abstract.text_backends import TextBackend, get_text_backend
+from abstract.tokenizer import NoteGrammar
+from cache.page_cache import PageCache
+
+class _Page:
+    """What was read from a page: the note it belongs to, its layout text and its trades table rows."""
+    
+    __slots__ = ("number", "note_id", "text", "has_table", "table_rows")
+    
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.note_id = None
+        self.text = None
+        self.has_table = False
+        self.table_rows = None
+    
+    def __json__(self) -> list:
+        return [self.number, self.note_id, self.text, self.has_table, self.table_rows]
+    
+    @classmethod
+    def from_json(cls, data: list) -> "_Page":
+        page = cls(data[0])
+        page.note_id, page.text, page.has_table, page.table_rows = data[1:]
+        
+        return page
+
+
+def _read_page_range(cls, backend: TextBackend, path: str, password: str | None, start: int, stop: int, profile: bool) -> tuple:
+    """Reads a range of pages in a worker process. Returns the pages and the profiler stats, if profiling."""
+    extractor = cls.__new__(cls)
+    extractor._backend = backend
+    
+    if not profile:
+        return extractor._read_pages(path, password, start, stop), None
+    
+    with profiler.profile() as page_profiler:
+        pages = extractor._read_pages(path, password, start, stop)
+    
+    return pages, page_profiler.stats()
+
 
 class Extractor(abc.ABC):
     
-    def __init__(self, path: str, password: str | None = None) -> None:
+    # Bump whenever a change alters the extracted data, so cached results are not reused
+    VERSION = "6"
+    
+    # Bump whenever a change alters what is read from the pages (scan, table reading, layout text),
+    # so pages cached by `cache.page_cache.PageCache` are read again. Parsing fixes only bump VERSION.
+    PAGES_VERSION = "1"
+    
+    # Markers of the pages holding the sections the extractor parses (trades table and fee summary).
+    # When set, only the first page of each note and the pages containing a marker go through layout text extraction.
+    SECTION_MARKERS: tuple = ()
+    
+    # Fee name -> label regex of the fees summed by `_get_taxes`
+    FEE_LABELS: dict = {}
+    
+    # Marker where the fee summary starts, fees are only looked up after it when it is found
+    FEE_SECTION_MARKER: str | None = None
+    
+    # Marker of the pages holding the trades table, and its (column name, header label) pairs from left to right.
+    # When set, the table is read from character positions instead of layout text, see `iter_pages`.
+    TABLE_MARKER: str | None = None
+    TABLE_COLUMNS: tuple = ()
+    
+    # Lines of the table header between TABLE_MARKER and the first trade row in layout text
+    TABLE_HEADER_LINES = 0
+    
+    # Labels followed by the auction date and by the note number, and the regex of the number.
+    # When NOTE_ID_LABEL is set, files holding many notes are split into notes where the number
+    # changes from one page to the next, see `iter_pages`.
+    DATE_LABEL: str | None = None
+    NOTE_ID_LABEL: str | None = None
+    NOTE_ID_REGEX = r"\d+"
+    
+    # Trade row patterns of the layout text: the operation ('C' for buy, 'V' for sell) and the market
+    DEAL_TYPE_PATTERN = re.compile(r"\bC\b|\bV\b")
+    MARKET_TYPE_PATTERN = re.compile(r"\bFRACIONARIO\b|\bVISTA\b")
+    
+    # Backend producing the layout text of the pages, see `abstract.text_backends`. Only switch a broker
+    # to another backend once `benchmarks/parity.py` finds no differences on its notes, and bump VERSION.
+    TEXT_BACKEND = "pdfplumber"
+    
+    # Files with at least twice this many pages are read by several processes, this many pages each
+    PARALLEL_PAGES = 50
+    
+    # Markers printed on the first page of the broker's notes, used to detect the broker of
+    # unlabeled files (see `extractors.registry.detect_broker`). Compared without whitespace.
+    FINGERPRINTS: tuple = ()
+    
+    def __init__(self, path, password=None, backend: str | None = None, page_cache: PageCache | None = None) -> None:
+        """
+        Reads a PDF file.
+        
+        Args:
+            path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+            password (optional): The password of the file, or its candidate passwords, see `abstract.passwords.iter_candidates`.
+            backend (str, optional): The text backend to read the file with, TEXT_BACKEND by default.
+            page_cache (PageCache, optional): Where the pages read from files are reused from and stored.
+            
+        Raises:
+            PDFPasswordError: If the file is encrypted and no password opens it.
+            PDFCorruptError: If the text of the file cannot be extracted.
+        """
+        self._backend = get_text_backend(backend or self.TEXT_BACKEND)
+        self._page_cache = page_cache
+        path = as_source(path)
+        password = resolve_password(path, password)
+        
         try:
             self._text = self.pdf_to_text(path, password)
+        except MemoryError:
+            raise
         except Exception as e:
-            raise ValueError("Error extracting text from PDF, check if the file is password protected.")
+            raise PDFCorruptError("Error extracting text from PDF, the file is damaged or not a PDF.") from e
             
-    def pdf_to_text(self, path: str, passport: str | None) -> str:
+    @profiler.profiled("pdf_to_text")
+    def pdf_to_text(self, path, passport: str | None) -> str:
         """
         Extracts text from a PDF file.
+        
+        The notes the file holds are kept in `self._notes` as (text, table rows) pairs.
 
         Args:
-            path (str): The path to the PDF file.
+            path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
 
         Returns:
             str: The extracted text from the PDF file.
         """
-        with pdfplumber.open(path, password=passport) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-            return text
+        self._notes = self._read_notes(path, passport)
+        self._table_rows = self._notes[0][1] if len(self._notes) == 1 else None
         
-    @abc.abstractmethod
-    def extract(self) -> str | None:
-        pass
+        return "".join(text for text, _ in self._notes)
+    
+    def iter_pages(self, path, password: str | None, start: int = 0, stop: int | None = None):
+        """
+        Reads the pages of a PDF file.
         
-    @abc.abstractmethod
-    def _get_auction_date(self, text: str) -> str | None:
-        pass
+        Each page's layout cache is released as soon as it is read, so only one page's layout
+        objects are kept in memory at a time. If the extractor declares SECTION_MARKERS, only the
+        first page of each note and the pages containing a marker go through layout text extraction.
+        
+        If it declares TABLE_COLUMNS, the rows of the trades table are read from the characters of
+        the pages containing TABLE_MARKER, and those pages skip layout text extraction too unless
+        they start a note or hold another section. A table page without a header row keeps its
+        layout text and no rows, so the table is left to be parsed from the text.
+        
+        Args:
+            path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+            password (str, optional): The password of the PDF file.
+            start (int): The first page to read.
+            stop (int, optional): The page to stop before, defaults to the end of the file.
+            
+        Returns:
+            Iterator of _Page.
+        """
+        with self._backend.open(as_source(path), password) as pdf:
+            yield from self._iter_pdf_pages(pdf, start, stop)
+    
+    def _iter_pdf_pages(self, pdf, start: int = 0, stop: int | None = None):
+        table_markers = self._normalize_markers([self.TABLE_MARKER]) if self.TABLE_COLUMNS else []
+        markers = [marker for marker in self._section_markers() if marker not in table_markers]
+        end_markers = self._normalize_markers([self.FEE_SECTION_MARKER]) if self.FEE_SECTION_MARKER else []
+        scan = bool(markers or table_markers or self.NOTE_ID_LABEL)
+        note_id = None
+        
+        for number, page in enumerate(pdf.pages[start:stop], start):
+            try:
+                profiler.count("pages")
+                result = _Page(number)
+                extract = number == start or not scan
+                glyphs = None
+                
+                if scan:
+                    glyphs = self._read_glyphs(pdf, page)
+                    text = re.sub(r"\s+", "", glyphs.text())
+                    result.note_id = self._find_note_id(glyphs)
+                    
+                    # A page with another note number starts a new note, whose header is read from the text
+                    if result.note_id is not None and result.note_id != note_id:
+                        extract = True
+                        note_id = result.note_id
+                    
+                    if any(marker in text for marker in table_markers):
+                        result.has_table = True
+                        result.table_rows = self._read_table(glyphs, end_markers)
+                    
+                    extract = extract or any(marker in text for marker in markers) or (result.has_table and result.table_rows is None)
+                
+                if extract:
+                    profiler.count("pages_extracted")
+                    
+                    with profiler.stage("page_layout"):
+                        result.text = self._backend.text(pdf, page, glyphs)
+                
+                yield result
+            finally:
+                self._backend.close_page(page)
+    
+    def _read_pages(self, path, password: str | None, start: int = 0, stop: int | None = None) -> list:
+        return list(self.iter_pages(path, password, start, stop))
+    
+    def _read_all_pages(self, path, password: str | None) -> list:
+        """
+        Reads every page of a PDF file, splitting large files over a process pool.
+        
+        Files are only split in the main process, so the batch and server workers do not
+        start pools of their own, and only when on disk, as workers open the file by path.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        source = as_source(path)
+        
+        with self._backend.open(source, password) as pdf:
+            count = len(pdf.pages)
+            workers = min(os.cpu_count() or 1, count // self.PARALLEL_PAGES)
+            
+            if workers < 2 or multiprocessing.parent_process() is not None or source.path is None:
+                return list(self._iter_pdf_pages(pdf))
+        
+        size = -(-count // workers)
+        profile = profiler.active_profiler() is not None
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_read_page_range, type(self), self._backend, source.path, password, start, start + size, profile)
+                for start in range(0, count, size)
+            ]
+            pages = []
+            
+            for future in futures:
+                chunk, stats = future.result()
+                pages.extend(chunk)
+                
+                if stats is not None:
+                    profiler.active_profiler().merge(stats)
+        
+        return pages
+    
+    def _read_notes(self, path, password: str | None) -> list:
+        """
+        Reads a PDF file and splits it into notes.
+        
+        A note starts at each page whose note number differs from the previous one, pages
+        without a number belong to the note before them.
+        
+        The pages are reused from the page cache when the file was read before with the same
+        backend, library versions and page reading settings.
+        
+        Returns:
+            list: A (text, table rows) pair per note, the rows being None when the table has to
+                be parsed from the text.
+        """
+        path = as_source(path)
+        cache = self._page_cache
+        cached = None
+        
+        if cache is not None:
+            key = cache.make_key(self._backend.NAME, self._pages_signature(), path.digest())
+            cached = cache.get_pages(key)
+            profiler.count("page_cache_hits" if cached is not None else "page_cache_misses")
+        
+        if cached is not None:
+            all_pages = [_Page.from_json(page) for page in cached]
+        else:
+            all_pages = self._read_all_pages(path, password)
+        
+        notes = []
+        note_id = None
+        
+        for page in all_pages:
+            if not notes or (page.note_id is not None and note_id is not None and page.note_id != note_id):
+                notes.append([])
+            
+            note_id = page.note_id or note_id
+            notes[-1].append(page)
+        
+        result = []
+        
+        for pages in notes:
+            table_pages = [page for page in pages if page.has_table]
+            
+            if table_pages and all(page.table_rows is not None for page in table_pages):
+                rows = [row for page in table_pages for row in page.table_rows]
+            else:
+                rows = None
+                self._extract_missing_text(path, password, table_pages)
+            
+            result.append(("".join(page.text + "\n" for page in pages if page.text is not None), rows))
+        
+        if cache is not None and cached is None:
+            # Stored once the text of the table pages is complete, so a hit never opens the file
+            cache.set_pages(key, [page.__json__() for page in all_pages])
+        
+        return result
+    
+    @classmethod
+    def _pages_signature(cls) -> str:
+        """Returns a hash of the settings that decide what is read from the pages of a file."""
+        settings = [
+            cls.PAGES_VERSION,
+            cls.SECTION_MARKERS,
+            cls.FEE_SECTION_MARKER,
+            cls.TABLE_MARKER,
+            cls.TABLE_COLUMNS,
+            cls.NOTE_ID_LABEL,
+            cls.NOTE_ID_REGEX,
+        ]
+        
+        return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()[:16]
+    
+    def _extract_missing_text(self, path, password: str | None, pages: list) -> None:
+        """Extracts the layout text of the pages that skipped it, for notes whose table has to be parsed from the text."""
+        missing = [page for page in pages if page.text is None]
+        
+        if not missing:
+            return
+        
+        with self._backend.open(as_source(path), password) as pdf:
+            for page in missing:
+                pdf_page = pdf.pages[page.number]
+                
+                try:
+                    profiler.count("pages_extracted")
+                    page.text = self._backend.text(pdf, pdf_page)
+                finally:
+                    self._backend.close_page(pdf_page)
+    
+    def _find_note_id(self, glyphs: Glyphs) -> str | None:
+        if not self.NOTE_ID_LABEL:
+            return None
+        
+        return self._get_grammar().find(glyphs.lines(), tokenizer.NOTE_ID)
+    
+    @classmethod
+    def fingerprint_score(cls, text: str) -> int:
+        """
+        Counts the FINGERPRINTS found in the raw text of a first page.
+        
+        Args:
+            text (str): The characters of the page, without whitespace.
+            
+        Returns:
+            int: The number of fingerprints found.
+        """
+        return sum(
+            any(marker in text for marker in cls._normalize_markers([fingerprint]))
+            for fingerprint in cls.FINGERPRINTS
+        )
+    
+    @classmethod
+    def _section_markers(cls) -> list:
+        return cls._normalize_markers(cls.SECTION_MARKERS)
+    
+    @staticmethod
+    def _normalize_markers(markers) -> list:
+        """
+        Normalizes section markers for matching against raw page text.
+        
+        Whitespace is dropped, as raw strings carry no spacing, and markers printed with
+        doubled characters ("MMeerrccaaddoo") also match their single-character form, since
+        the overprinted characters are drawn as separate strings.
+        """
+        normalized = []
+        
+        for marker in markers:
+            marker = re.sub(r"\s+", "", marker)
+            normalized.append(marker)
+            
+            if len(marker) > 1 and len(marker) % 2 == 0 and marker[::2] == marker[1::2]:
+                normalized.append(marker[::2])
+        
+        return normalized
+    
+    @profiler.profiled("page_glyphs")
+    def _read_glyphs(self, pdf, page) -> Glyphs:
+        return self._backend.glyphs(pdf, page)
+    
+    @profiler.profiled("table_rows")
+    def _read_table(self, glyphs: Glyphs, end_markers: list) -> list | None:
+        return read_table(glyphs, self.TABLE_COLUMNS, end_markers)
+    
+    def extract(self) -> list:
+        """
+        Extracts the brokerages of every note in the file.
+        
+        Returns:
+            list: Brokerage objects.
+        """
+        return list(self.iter_extract())
+    
+    def iter_extract(self):
+        """
+        Yields the brokerages of the file one note at a time.
+        
+        Fees are apportioned over every trade of a note, so a note is parsed as a whole
+        before its brokerages are yielded.
+        
+        Returns:
+            Iterator of Brokerage objects.
+        """
+        for text, table_rows in self._notes:
+            note = copy.copy(self)
+            note._text = text
+            note._table_rows = table_rows
+            note._notes = None
+            
+            yield from note._extract_note()
     
     @abc.abstractmethod
-    def _get_note_id(self, line: str) -> str | None:
+    def _extract_note(self) -> list:
+        """Extracts the brokerages of a single note, from `self._text` and `self._table_rows`."""
         pass
+        
+    @classmethod
+    def _get_fee_scanner(cls) -> FeeScanner:
+        """Returns the fee scanner compiled from the class FEE_LABELS, building it on first use."""
+        scanner = cls.__dict__.get("_fee_scanner")
+        
+        if scanner is None:
+            scanner = FeeScanner(cls.FEE_LABELS)
+            cls._fee_scanner = scanner
+        
+        return scanner
+    
+    @classmethod
+    def _get_grammar(cls) -> NoteGrammar:
+        """Returns the tokenizer grammar compiled from the class labels and markers, building it on first use."""
+        grammar = cls.__dict__.get("_grammar")
+        
+        if grammar is None:
+            grammar = NoteGrammar(
+                cls.DATE_LABEL,
+                cls.NOTE_ID_LABEL,
+                cls.NOTE_ID_REGEX,
+                cls.TABLE_MARKER,
+                cls.TABLE_HEADER_LINES,
+                cls.FEE_SECTION_MARKER
+            )
+            cls._grammar = grammar
+        
+        return grammar
+    
+    def _get_tokens(self) -> dict:
+        """
+        Tokenizes the text of the note on first use.
+        
+        Returns:
+            dict: Event kind -> list of the values of its events, in text order.
+        """
+        if self.__dict__.get("_tokenized") is not self._text:
+            with profiler.stage("tokenize"):
+                tokens = {}
+                
+                for token in self._get_grammar().tokenize(self._text):
+                    tokens.setdefault(token.kind, []).append(token.value)
+            
+            self._tokens = tokens
+            self._tokenized = self._text
+        
+        return self._tokens
+    
+    def _get_token(self, kind: str) -> str | None:
+        values = self._get_tokens().get(kind)
+        
+        return values[0] if values else None
+    
+    def _get_auction_date(self) -> str | None:
+        """Returns the auction date of the note, as printed ("dd/mm/yyyy"), or None if it is not found."""
+        return self._get_token(tokenizer.DATE)
+    
+    def _get_note_id(self) -> str | None:
+        """Returns the note number, or None if it is not found."""
+        return self._get_token(tokenizer.NOTE_ID)
+    
+    def _get_trade_lines(self) -> list:
+        """Returns the rows of the trades table in the text, for notes whose table was not read by columns."""
+        tokens = self._get_tokens()
+        
+        if tokenizer.SECTION_END not in tokens:
+            raise ValueError("No brokerage transactions found in the provided text")
+        
+        return tokens.get(tokenizer.TRADE_ROW, [])
+    
+    def _get_fee_breakdown(self) -> dict:
+        """
+        Extracts every fee of the note and the IRRF.
+        
+        Fees are looked up in the fee summary, or in the whole text when it is not found.
+        
+        Returns:
+            dict: Fee name -> value for the fees found, with the IRRF under "irrf".
+        """
+        rows = self._get_tokens().get(tokenizer.FEE_ROW)
+        
+        return self._get_fee_scanner().scan("\n".join(rows) if rows else self._text)
+    
+    @profiler.profiled("_get_taxes")
+    def _get_taxes(self) -> list:
+        """
+        Extracts the total fee and the IRRF of the note.
+        
+        Returns:
+            list: [fee, ir].
+        """
+        breakdown = self._get_fee_breakdown()
+        
+        fee = sum(breakdown[name] for name in self._get_fee_scanner().fee_names if name in breakdown)
+        ir = breakdown.get(FeeScanner.IRRF, 0.0)
+        
+        return [fee, ir]
+    
+    @profiler.profiled("_make_brokerage_apportionment")
+    def _make_brokerage_apportionment(self, brokerages: list, fee: float, ir: float) -> None:
+        """
+        Splits the fee and IR of the note among its brokerages, see `abstract.apportionment`.
+        
+        Args:
+            brokerages (list): A list of Brokerage objects.
+            fee (float): The total fee to split.
+            ir (float): The total IR to split among the sells.
+            
+        Returns:
+            None
+        """
+        apportion_brokerages(brokerages, fee, ir)
     
     @abc.abstractmethod
     def _get_brokerages(self, text: str) -> list:
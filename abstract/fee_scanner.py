@@ -0,0 +1,70 @@
+import re
+
+class FeeScanner:
+    """
+    Collects the fee and IRRF values of a brokerage note in a single pass.
+
+    Every fee label is compiled into one alternation with a named group per fee, so the
+    text is scanned once no matter how many labels there are. The value of a fee is the
+    first number following its label on the same line, and the IRRF value is the last
+    number on its line (the line also prints the calculation base). Only the first
+    occurrence of a label followed by a number is used.
+    """
+
+    IRRF = "irrf"
+    NUMBER = re.compile(r"\d+,\d+")
+
+    def __init__(self, fee_labels: dict, irrf_label: str = r"I.R.R.F") -> None:
+        """
+        Compiles the scanner.
+
+        Args:
+            fee_labels (dict): Fee name -> label regex, e.g. {"emolumentos": r"Emolumentos"}.
+                Names must be valid identifiers.
+            irrf_label (str): The regex of the IRRF label.
+        """
+        self.fee_names = list(fee_labels)
+
+        groups = [f"(?P<{name}>{label})" for name, label in fee_labels.items()]
+        groups.append(f"(?P<{self.IRRF}>{irrf_label})")
+
+        self._pattern = re.compile("|".join(groups), re.IGNORECASE)
+
+    def scan(self, text: str) -> dict:
+        """
+        Scans the text for fee values.
+
+        Args:
+            text (str): The text of the fee summary section.
+
+        Returns:
+            dict: Fee name -> value for every fee found, with the IRRF under "irrf".
+        """
+        values = {}
+        expected = len(self.fee_names) + 1
+
+        for match in self._pattern.finditer(text):
+            name = match.lastgroup
+
+            if name in values:
+                continue
+
+            line_end = text.find("\n", match.end())
+            rest = text[match.end():line_end if line_end != -1 else len(text)]
+
+            if name == self.IRRF:
+                numbers = self.NUMBER.findall(rest)
+                number = numbers[-1] if numbers else None
+            else:
+                number = self.NUMBER.search(rest)
+                number = number.group(0) if number else None
+
+            if number is None:
+                continue
+
+            values[name] = float(number.replace(",", "."))
+
+            if len(values) == expected:
+                break
+
+        return values
@@ -0,0 +1,142 @@
+import functools
+
+from abstract import profiler
+from abstract.exceptions import PDFCorruptError, PDFPasswordError
+from abstract.sources import as_source
+from cache.password_cache import PasswordCache, default_password_cache
+
+def iter_candidates(path: str, passwords) -> list:
+    """
+    Lists the candidate passwords of a file.
+
+    Args:
+        path (str): The path to the PDF file, or the name of a file given by content.
+        passwords: None, a password, an iterable of passwords, or a callable returning the
+            passwords to try for a path (e.g. the CPF prefixes of the customer owning the file).
+
+    Returns:
+        list: The candidates, in the order they are tried.
+    """
+    if passwords is None:
+        return []
+
+    if isinstance(passwords, str):
+        return [passwords]
+
+    if callable(passwords):
+        passwords = passwords(path)
+
+    return [password for password in passwords if password is not None]
+
+
+def resolve_password(path: str, passwords=None, cache: PasswordCache | None = None) -> str | None:
+    """
+    Finds which of the candidate passwords opens a PDF file.
+
+    Only the trailer of the file is read, and candidates are checked against its encryption
+    dictionary, which costs a key derivation per attempt instead of a parse of the document.
+    The password that worked is remembered by file hash (as a keyed hash, see `PasswordCache`),
+    so the next time the same file is seen it is picked without any attempt.
+
+    Args:
+        path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+        passwords: The candidates, see `iter_candidates`. The empty password is always tried first.
+        cache (PasswordCache, optional): Where working passwords are remembered, the process-wide cache by default.
+
+    Returns:
+        str or None: The password opening the file, or None if the file is not encrypted.
+
+    Raises:
+        PDFPasswordError: If the file is encrypted and no candidate opens it.
+        PDFCorruptError: If the file cannot be parsed.
+    """
+    source = as_source(path)
+    encryption = read_encryption(source)
+
+    if encryption is None:
+        return None
+
+    candidates = ["", *iter_candidates(source.name, passwords)]
+    cache = cache if cache is not None else default_password_cache()
+    digest = source.digest()
+    remembered = cache.lookup(digest)
+
+    if remembered is not None:
+        for candidate in candidates:
+            if cache.fingerprint(digest, candidate) == remembered:
+                profiler.count("password_cache_hits")
+                return candidate
+
+    for candidate in candidates:
+        profiler.count("password_attempts")
+
+        if check_password(encryption, candidate):
+            cache.store(digest, candidate)
+            return candidate
+
+    raise PDFPasswordError("The PDF is password protected and none of the passwords given opens it.")
+
+
+@functools.cache
+def _probe_class() -> type:
+    """Builds the pdfminer document class reading the encryption dictionary without checking a password."""
+    from pdfminer.pdfdocument import PDFDocument
+
+    class EncryptionProbe(PDFDocument):
+
+        def _initialize_password(self, password: str = "") -> None:
+            pass
+
+    return EncryptionProbe
+
+
+def read_encryption(path) -> tuple | None:
+    """
+    Reads the encryption dictionary of a PDF file, from its trailer.
+
+    Args:
+        path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+
+    Returns:
+        tuple or None: (document ID, encryption dictionary), or None if the file is not encrypted.
+    """
+    from pdfminer.pdfparser import PDFParser
+
+    try:
+        with as_source(path).open() as fp:
+            return _probe_class()(PDFParser(fp)).encryption
+    except (OSError, MemoryError):
+        raise
+    except Exception as e:
+        raise PDFCorruptError("Error reading the PDF, the file is damaged or not a PDF.") from e
+
+
+def check_password(encryption: tuple, password: str) -> bool:
+    """
+    Checks a password against the encryption dictionary of a PDF file.
+
+    Args:
+        encryption (tuple): The output of `read_encryption`.
+        password (str): The password to check, user or owner.
+
+    Returns:
+        bool: Whether the password opens the file.
+    """
+    from pdfminer.pdfdocument import PDFDocument, PDFEncryptionError, PDFPasswordIncorrect
+    from pdfminer.pdftypes import int_value
+    from pdfminer.psparser import literal_name
+
+    docid, param = encryption
+    factory = PDFDocument.security_handler_registry.get(int_value(param.get("V", 0)))
+
+    if literal_name(param.get("Filter")) != "Standard" or factory is None:
+        raise PDFPasswordError("The PDF is encrypted with an unsupported method.")
+
+    try:
+        factory(docid, param, password)
+    except PDFPasswordIncorrect:
+        return False
+    except PDFEncryptionError as e:
+        raise PDFPasswordError("The PDF is encrypted with an unsupported method.") from e
+
+    return True
@@ -0,0 +1,159 @@
+import contextlib
+import contextvars
+import functools
+import time
+
+class Profiler:
+    """
+    Collects per-stage timings and counters of an extraction.
+
+    Stages record their number of calls and their inclusive wall and CPU time, so a stage
+    that runs inside another one (e.g. `_get_stock_symbols` inside `_get_brokerages`) is
+    also counted in its parent. Counters track events such as pages extracted, lines
+    skipped or ticker cache hits.
+
+    A profiler only records while it is active, see `profile`.
+    """
+
+    def __init__(self) -> None:
+        self.stages = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block as one call of the given stage."""
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add_stage(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        stage = self.stages.get(name)
+
+        if stage is None:
+            stage = self.stages[name] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+
+        stage["calls"] += calls
+        stage["wall_seconds"] += wall
+        stage["cpu_seconds"] += cpu
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, stats: dict) -> None:
+        """
+        Adds the stats of another profiler, e.g. one that ran in a worker process.
+
+        Args:
+            stats (dict): The output of `Profiler.stats`.
+
+        Returns:
+            None
+        """
+        for name, stage in stats.get("stages", {}).items():
+            self.add_stage(name, stage["wall_seconds"], stage["cpu_seconds"], stage["calls"])
+
+        for name, value in stats.get("counters", {}).items():
+            self.count(name, value)
+
+    def stats(self) -> dict:
+        return {
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+_active = contextvars.ContextVar("profiler", default=None)
+
+_hooks = []
+
+
+def active_profiler() -> Profiler | None:
+    """Returns the profiler recording the current extraction, if any."""
+    return _active.get()
+
+
+@contextlib.contextmanager
+def profile(profiler: Profiler | None = None):
+    """
+    Activates a profiler for the enclosed block.
+
+    Args:
+        profiler (Profiler, optional): The profiler to record into, a new one by default.
+
+    Returns:
+        Context manager yielding the active profiler.
+    """
+    profiler = profiler if profiler is not None else Profiler()
+    token = _active.set(profiler)
+
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+def profiled(name: str):
+    """
+    Decorates a function so its calls are timed as the given stage of the active profiler.
+
+    When no profiler is active the function is called directly.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+
+            if profiler is None:
+                return function(*args, **kwargs)
+
+            with profiler.stage(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def stage(name: str):
+    """Returns a context manager timing the enclosed block as a stage of the active profiler, if any."""
+    profiler = _active.get()
+
+    return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
+
+
+def count(name: str, value: int = 1) -> None:
+    """Increments a counter of the active profiler, if any."""
+    profiler = _active.get()
+
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def add_hook(hook) -> None:
+    """
+    Registers a callable receiving the stats of every profiled extraction.
+
+    Hooks are called as `hook(source, stats)`, with the file path (None for uploads) and
+    the output of `Profiler.stats`, by the batch runner and the extraction server once
+    a file is done, so they can be fed into a metrics system.
+
+    Args:
+        hook (callable): The hook to register.
+
+    Returns:
+        None
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook) -> None:
+    _hooks.remove(hook)
+
+
+def emit(source: str | None, stats: dict) -> None:
+    """Calls every registered hook with the stats of a profiled extraction."""
+    for hook in list(_hooks):
+        hook(source, stats)
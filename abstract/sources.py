@@ -0,0 +1,179 @@
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import stat
+
+from cache.result_cache import hash_file
+
+# Files on disk at least this large are memory-mapped, so the parser's many small seeks and
+# reads are memory accesses instead of buffered file reads
+MMAP_THRESHOLD = 1024 * 1024
+
+
+class MemoryStream(io.RawIOBase):
+    """Read-only seekable binary stream over a bytes-like object, reading it in place."""
+
+    def __init__(self, buffer) -> None:
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+
+        if offset < 0:
+            raise ValueError("negative seek position")
+
+        self._position = offset
+
+        return offset
+
+    def read(self, size: int | None = -1) -> bytes:
+        start = min(self._position, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._position = end
+
+        return self._view[start:end].tobytes()
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+
+        return len(data)
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+class PdfSource:
+    """
+    A PDF file given as a path, a bytes-like object (bytes, bytearray, memoryview, mmap) or a
+    binary file object, e.g. an upload or `sys.stdin.buffer`.
+
+    The extraction opens its file several times (password probe, broker detection, pages),
+    and a source is opened each time without a temporary file or a copy of its data: buffers
+    are read in place, files on disk of MMAP_THRESHOLD bytes or more are memory-mapped, and
+    seekable file objects are rewound. Only file objects that cannot seek, such as a pipe, are
+    read into memory, once.
+    """
+
+    def __init__(self, source, name: str | None = None) -> None:
+        """
+        Args:
+            source: The path, bytes-like object or binary file object. File objects are not closed.
+            name (str, optional): How the file is referred to, its path or the file object's name by default.
+        """
+        self.path = None
+        self._buffer = None
+        self._file = None
+        self._digest = None
+
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer = source
+        elif hasattr(source, "read"):
+            if _is_seekable(source):
+                self._file = source
+                self._start = source.tell()
+            else:
+                self._buffer = source.read()
+        else:
+            raise TypeError(f"Expected a path, a bytes-like object or a binary file object, not {type(source).__name__}")
+
+        file_name = getattr(source, "name", None)
+        self.name = name or self.path or (file_name if isinstance(file_name, str) else None) or "<memory>"
+
+    @contextlib.contextmanager
+    def open(self):
+        """
+        Opens the PDF data.
+
+        Returns:
+            Context manager of a seekable binary stream, positioned at the start of the PDF.
+        """
+        if self._buffer is not None:
+            with MemoryStream(self._buffer) as stream:
+                yield stream
+        elif self._file is not None:
+            mapped = self._map(self._file) if self._start == 0 else None
+
+            if mapped is not None:
+                with mapped:
+                    yield mapped
+            else:
+                self._file.seek(self._start)
+                yield self._file
+        else:
+            with open(self.path, "rb") as fp:
+                mapped = self._map(fp)
+
+                if mapped is not None:
+                    with mapped:
+                        yield mapped
+                else:
+                    yield fp
+
+    @staticmethod
+    def _map(fp) -> mmap.mmap | None:
+        """Maps a regular file of MMAP_THRESHOLD bytes or more, returning None for anything else."""
+        try:
+            info = os.fstat(fp.fileno())
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+
+        if not stat.S_ISREG(info.st_mode) or info.st_size < MMAP_THRESHOLD:
+            return None
+
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def digest(self) -> str:
+        """Returns the SHA-256 of the PDF data, as `hash_file` does for files on disk, computing it once."""
+        if self._digest is None:
+            if self.path is not None:
+                self._digest = hash_file(self.path)
+            elif self._buffer is not None:
+                self._digest = hashlib.sha256(self._buffer).hexdigest()
+            else:
+                digest = hashlib.sha256()
+
+                with self.open() as stream:
+                    while chunk := stream.read(1024 * 1024):
+                        digest.update(chunk)
+
+                self._digest = digest.hexdigest()
+
+        return self._digest
+
+    def __repr__(self) -> str:
+        return f"PdfSource({self.name!r})"
+
+
+def _is_seekable(fp) -> bool:
+    try:
+        return fp.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def as_source(source, name: str | None = None) -> PdfSource:
+    """Returns the PdfSource of a path, bytes-like object or file object, or the source itself if it is one."""
+    return source if isinstance(source, PdfSource) else PdfSource(source, name)
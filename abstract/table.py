@@ -0,0 +1,319 @@
+import bisect
+import functools
+import re
+from array import array
+from collections import OrderedDict
+
+# Same defaults as pdfplumber's text extraction
+X_TOLERANCE = 3
+Y_TOLERANCE = 3
+
+# Largest offset between two copies of an overprinted character
+OVERPRINT_TOLERANCE = 1
+
+
+class Glyphs:
+    """
+    The characters drawn on a page, as parallel arrays of positions and a list of texts.
+
+    Positions are in PDF space: `x0`/`x1` are the horizontal extent of each character and
+    `y` its baseline, growing upwards.
+    """
+
+    def __init__(self) -> None:
+        self.texts = []
+        self.x0 = array("d")
+        self.x1 = array("d")
+        self.y = array("d")
+        self._rows = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def append(self, text: str, x0: float, x1: float, y: float) -> None:
+        self.texts.append(text)
+        self.x0.append(x0)
+        self.x1.append(x1)
+        self.y.append(y)
+
+    def text(self) -> str:
+        """Returns the characters in drawing order, without any spacing or line breaks."""
+        return "".join(self.texts)
+
+    def rows(self, y_tolerance: float = Y_TOLERANCE, overprints: bool = False) -> list:
+        """
+        Groups the characters into rows.
+
+        Characters overprinted to look bold (the same character drawn again at almost the same
+        position) are kept once, unless `overprints` is set.
+
+        Returns:
+            list: The rows from top to bottom, each a list of character indexes from left to right.
+        """
+        key = (y_tolerance, overprints)
+
+        if key in self._rows:
+            return self._rows[key]
+
+        texts, y, x0 = self.texts, self.y, self.x0
+        rows = self._rows[key] = []
+        row, row_y = [], None
+
+        for index in sorted(range(len(texts)), key=lambda index: -y[index]):
+            if row_y is not None and row_y - y[index] > y_tolerance:
+                rows.append(row)
+                row = []
+
+            if not row:
+                row_y = y[index]
+
+            row.append(index)
+
+        if row:
+            rows.append(row)
+
+        for number, row in enumerate(rows):
+            row.sort(key=x0.__getitem__)
+
+            if overprints:
+                continue
+
+            unique = [row[0]]
+
+            for index in row[1:]:
+                last = unique[-1]
+
+                if texts[index] != texts[last] or x0[index] - x0[last] > OVERPRINT_TOLERANCE:
+                    unique.append(index)
+
+            rows[number] = unique
+
+        return rows
+
+    def lines(self, overprints: bool = False) -> str:
+        """
+        Returns the text of the page, a line per row.
+
+        With `overprints`, overprinted characters are kept ("MMeerrccaaddoo"), as in the text of
+        pdfplumber's `extract_text` the parsers were written against.
+        """
+        return "\n".join(self.row_text(row)[0] for row in self.rows(overprints=overprints))
+
+    def row_text(self, row: list, x_tolerance: float = X_TOLERANCE) -> tuple:
+        """
+        Joins the characters of a row, adding a space where they are apart.
+
+        Returns:
+            tuple: (text, list with the character index of each position of the text, -1 for added spaces).
+        """
+        texts, x0, x1 = self.texts, self.x0, self.x1
+        parts, positions = [], []
+        last = None
+
+        for index in row:
+            if last is not None and x0[index] - x1[last] > x_tolerance and parts[-1] != " " and texts[index] != " ":
+                parts.append(" ")
+                positions.append(-1)
+
+            parts.append(texts[index])
+            positions.extend([index] * len(texts[index]))
+            last = index
+
+        return "".join(parts), positions
+
+
+@functools.cache
+def _glyph_device_class() -> type:
+    """Builds the pdfminer device class on first use, so pdfminer is only imported when a PDF is read."""
+    from pdfminer.pdfdevice import PDFTextDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+
+    class GlyphDevice(PDFTextDevice):
+        """pdfminer device recording the position of every character drawn, without building layout objects."""
+
+        def __init__(self, rsrcmgr) -> None:
+            super().__init__(rsrcmgr)
+            self.glyphs = Glyphs()
+
+        def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate) -> float:
+            advance = font.char_width(cid) * fontsize * scaling
+
+            try:
+                text = font.to_unichr(cid)
+            except PDFUnicodeNotDefined:
+                return advance
+
+            a, b, c, d, e, f = matrix
+            self.glyphs.append(text, e, e + a * advance, f + d * rise)
+
+            return advance
+
+    return GlyphDevice
+
+
+def read_glyphs(rsrcmgr, page_obj) -> Glyphs:
+    """
+    Interprets a page, collecting its characters.
+
+    Args:
+        rsrcmgr: The pdfminer resource manager of the document (`pdfplumber.PDF.rsrcmgr`).
+        page_obj: The pdfminer page (`pdfplumber.Page.page_obj`).
+
+    Returns:
+        Glyphs: The characters of the page.
+    """
+    from pdfminer.pdfinterp import PDFPageInterpreter
+
+    device = _glyph_device_class()(rsrcmgr)
+    PDFPageInterpreter(rsrcmgr, device).process_page(page_obj)
+
+    return device.glyphs
+
+
+class TableLayout:
+    """
+    Column x-ranges of a table, learned from the labels of its header row.
+
+    Each column starts where its label starts, as cells are printed from the left edge of their
+    label, and each character belongs to the column its center falls in, so a cell is read
+    whole whatever it contains (e.g. a stock name with digits) and however wider than its label.
+    Numbers printed right-aligned to the end of their label are read whole as long as they are
+    not wider than the label, which holds for the quantity, price and value columns of the notes.
+    """
+
+    # Learned layouts by header row signature, shared by every note with the same layout. The least
+    # recently used are dropped past MAX_LAYOUTS, as a long-running server may meet any number of them.
+    MAX_LAYOUTS = 64
+    _cache = OrderedDict()
+
+    def __init__(self, names: list, boundaries: list) -> None:
+        self.names = names
+        self.boundaries = boundaries
+
+    @classmethod
+    def learn(cls, glyphs: Glyphs, row: list, columns: tuple) -> "TableLayout | None":
+        """
+        Learns the layout of a table from its header row.
+
+        Args:
+            glyphs (Glyphs): The characters of the page.
+            row (list): The header row, as returned by `Glyphs.rows`.
+            columns (tuple): (name, header label) pairs, from left to right.
+
+        Returns:
+            TableLayout or None: The layout, or None if the row does not have every label in order.
+        """
+        text, positions = glyphs.row_text(row)
+        key = (columns, text, round(glyphs.x0[row[0]]), round(glyphs.x1[row[-1]]))
+        layout = cls._cache.get(key)
+
+        if layout is not None:
+            cls._cache.move_to_end(key)
+            return layout
+
+        starts = []
+        start = 0
+
+        for _, label in columns:
+            start = text.find(label, start)
+
+            if start == -1:
+                return None
+
+            starts.append(glyphs.x0[positions[start]])
+            start += len(label)
+
+        boundaries = starts[1:]
+        layout = cls._cache[key] = cls([name for name, _ in columns], boundaries)
+
+        if len(cls._cache) > cls.MAX_LAYOUTS:
+            cls._cache.popitem(last=False)
+
+        return layout
+
+    def split(self, glyphs: Glyphs, row: list, x_tolerance: float = X_TOLERANCE) -> dict:
+        """
+        Splits a row into cells.
+
+        Returns:
+            dict: Column name -> cell text, empty for columns without characters.
+        """
+        texts, x0, x1 = glyphs.texts, glyphs.x0, glyphs.x1
+        boundaries = self.boundaries
+        cells = [[] for _ in self.names]
+        last = [None] * len(self.names)
+
+        for index in row:
+            column = bisect.bisect_right(boundaries, (x0[index] + x1[index]) / 2)
+            cell = cells[column]
+
+            if cell and x0[index] - x1[last[column]] > x_tolerance and cell[-1] != " ":
+                cell.append(" ")
+
+            cell.append(texts[index])
+            last[column] = index
+
+        return {name: "".join(cell).strip() for name, cell in zip(self.names, cells)}
+
+
+def read_table(glyphs: Glyphs, columns: tuple, end_markers: list = ()) -> list | None:
+    """
+    Reads the rows of a table from the characters of a page.
+
+    The table starts after the first row holding every column label and ends before the
+    first row containing one of `end_markers` (compared without whitespace), or at the
+    end of the page.
+
+    Args:
+        glyphs (Glyphs): The characters of the page.
+        columns (tuple): (name, header label) pairs, from left to right.
+        end_markers (list): Markers of the first row after the table.
+
+    Returns:
+        list or None: A dict of cells per row, or None if the header row is not on the page.
+    """
+    rows = glyphs.rows()
+    labels = [label for _, label in columns]
+
+    for number, row in enumerate(rows):
+        text = glyphs.row_text(row)[0]
+
+        if not all(label in text for label in labels):
+            continue
+
+        layout = TableLayout.learn(glyphs, row, columns)
+
+        if layout is None:
+            continue
+
+        table = []
+
+        for row in rows[number + 1:]:
+            if end_markers:
+                compact = re.sub(r"\s+", "", "".join(glyphs.texts[index] for index in row))
+
+                if any(marker in compact for marker in end_markers):
+                    break
+
+            table.append(layout.split(glyphs, row))
+
+        return table
+
+    return None
+
+
+def parse_integer(text: str) -> int | None:
+    """Parses an integer printed with '.' as thousands separator, e.g. "1.000"."""
+    text = text.replace(".", "")
+
+    return int(text) if text.isdigit() else None
+
+
+_DECIMAL = re.compile(r"-?\d{1,3}(?:\.\d{3})*,\d+|-?\d+,\d+|-?\d+")
+
+def parse_decimal(text: str) -> float | None:
+    """Parses a number printed in the Brazilian format, e.g. "1.234,56"."""
+    if not _DECIMAL.fullmatch(text):
+        return None
+
+    return float(text.replace(".", "").replace(",", "."))
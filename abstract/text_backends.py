@@ -0,0 +1,124 @@
+import abc
+import contextlib
+from collections import namedtuple
+
+from abstract.sources import PdfSource
+from abstract.table import Glyphs, read_glyphs
+
+# A document opened by `PdfminerBackend`: its resource manager and pdfminer pages
+_PdfminerDocument = namedtuple("_PdfminerDocument", ["rsrcmgr", "pages"])
+
+
+class TextBackend(abc.ABC):
+    """
+    How the pages of a PDF file are opened and their layout text extracted.
+
+    The extractor reads the characters of every page it scans through `glyphs` (for the note
+    number and the trades table), and the layout text of the pages its parsers read through
+    `text`. Backends differ in what that text costs: `text` is given the glyphs of the page
+    when they were already read, so a backend can lay them out instead of interpreting the
+    page again.
+    """
+
+    NAME: str | None = None
+
+    @abc.abstractmethod
+    def open(self, source: PdfSource, password: str | None):
+        """
+        Opens a PDF file, reading it from the stream of its source.
+
+        Returns:
+            Context manager of the document, whose `pages` is a sequence of the backend's pages.
+        """
+        pass
+
+    @abc.abstractmethod
+    def glyphs(self, document, page) -> Glyphs:
+        """Returns the characters of a page."""
+        pass
+
+    @abc.abstractmethod
+    def text(self, document, page, glyphs: Glyphs | None = None) -> str:
+        """Returns the layout text of a page, given its characters if they were already read."""
+        pass
+
+    def close_page(self, page) -> None:
+        """Releases what was cached while reading a page."""
+        pass
+
+
+class PdfplumberBackend(TextBackend):
+    """The reference backend: pdfplumber's `extract_text`, which runs pdfminer's full layout analysis."""
+
+    NAME = "pdfplumber"
+
+    @contextlib.contextmanager
+    def open(self, source: PdfSource, password: str | None):
+        # Imported on first use, so runs answered from the result cache do not load the PDF stack
+        import pdfplumber
+
+        with source.open() as stream, pdfplumber.open(stream, password=password) as pdf:
+            yield pdf
+
+    def glyphs(self, document, page) -> Glyphs:
+        return read_glyphs(document.rsrcmgr, page.page_obj)
+
+    def text(self, document, page, glyphs: Glyphs | None = None) -> str:
+        return page.extract_text()
+
+    def close_page(self, page) -> None:
+        page.close()
+
+
+class PdfminerBackend(TextBackend):
+    """
+    Lays out the characters decoded from the content streams by pdfminer, without layout objects.
+
+    Rows and spacing follow pdfplumber's defaults (see `Glyphs.lines`), which is enough for
+    machine-generated notes with a fixed layout. Pages already scanned for the note number or
+    the table cost nothing more, and the others a content stream interpretation.
+    """
+
+    NAME = "pdfminer"
+
+    @contextlib.contextmanager
+    def open(self, source: PdfSource, password: str | None):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        with source.open() as fp:
+            document = PDFDocument(PDFParser(fp), password or "")
+            yield _PdfminerDocument(PDFResourceManager(caching=True), list(PDFPage.create_pages(document)))
+
+    def glyphs(self, document, page) -> Glyphs:
+        return read_glyphs(document.rsrcmgr, page)
+
+    def text(self, document, page, glyphs: Glyphs | None = None) -> str:
+        if glyphs is None:
+            glyphs = self.glyphs(document, page)
+
+        return glyphs.lines(overprints=True)
+
+
+# Backend name -> class, see `Extractor.TEXT_BACKEND`
+TEXT_BACKENDS = {
+    PdfplumberBackend.NAME: PdfplumberBackend,
+    PdfminerBackend.NAME: PdfminerBackend,
+}
+
+def get_text_backend(name: str) -> TextBackend:
+    """
+    Returns a text backend by name.
+
+    Args:
+        name (str): The backend name, a key of TEXT_BACKENDS.
+
+    Returns:
+        TextBackend: The backend.
+    """
+    if name not in TEXT_BACKENDS:
+        raise ValueError(f"Text backend not supported: {name}")
+
+    return TEXT_BACKENDS[name]()
@@ -0,0 +1,123 @@
+import re
+from collections import namedtuple
+
+# Kinds of the events emitted by `NoteGrammar.tokenize`
+NOTE_HEADER = "note_header"
+DATE = "date"
+NOTE_ID = "note_id"
+TRADE_ROW = "trade_row"
+FEE_ROW = "fee_row"
+SECTION_END = "section_end"
+
+# An event of the note text: its kind, the number of the line it was found on and its value
+# (the date or note number, or the text of the line for the other kinds)
+Token = namedtuple("Token", ["kind", "line", "value"])
+
+_DATE = re.compile(r"\d{2}/\d{2}/\d{4}")
+
+
+class NoteGrammar:
+    """
+    Line-oriented tokenizer of the layout text of a brokerage note.
+
+    The labels of a broker are compiled into one alternation, and the text is walked once,
+    line by line, through three sections: the header (before the trades table), the table
+    and the fee summary. Each line is only matched against what can still be found:
+
+    - the auction date is the first date after the date label, and the note number the first
+      match of `note_id_pattern` after the note number label, on the same line or the next ones;
+    - the lines between `table_marker` (and `table_header_lines` header lines) and the line
+      holding `section_end` are trade rows;
+    - the lines from `section_end` on are fee rows, starting at the marker on its line.
+    """
+
+    def __init__(
+            self,
+            date_label: str | None = None,
+            note_id_label: str | None = None,
+            note_id_pattern: str = r"\d+",
+            table_marker: str | None = None,
+            table_header_lines: int = 0,
+            section_end: str | None = None
+        ) -> None:
+        labels = {"date": date_label, "note_id": note_id_label, "table": table_marker, "end": section_end}
+        groups = [f"(?P<{name}>{re.escape(label)})" for name, label in labels.items() if label]
+
+        self._labels = re.compile("|".join(groups)) if groups else None
+        self._note_id = re.compile(note_id_pattern)
+        self._table_header_lines = table_header_lines
+        self._has_label = {name: bool(label) for name, label in labels.items()}
+        self._section_end = section_end
+
+    def tokenize(self, text: str):
+        """
+        Walks the text once, yielding its events.
+
+        The date, note number and section end are only reported once, for their first occurrence.
+
+        Args:
+            text (str): The layout text of the note.
+
+        Returns:
+            Iterator of Token.
+        """
+        # None: label not seen yet, True: label seen and value not found yet, False: done
+        date = None if self._has_label["date"] else False
+        note_id = None if self._has_label["note_id"] else False
+        section = None
+        header_lines = 0
+
+        for number, line in enumerate(text.split("\n")):
+            line_section = section
+
+            if date is True and (match := _DATE.search(line)):
+                yield Token(DATE, number, match.group(0))
+                date = False
+
+            if note_id is True and (match := self._note_id.search(line)):
+                yield Token(NOTE_ID, number, match.group(0))
+                note_id = False
+
+            # Once both header labels were seen, table rows only need a substring test for the section end
+            in_rows = section == "table" and date is not None and note_id is not None and bool(self._section_end)
+
+            if self._labels is not None and (date is None or note_id is None or section != "fees") \
+                    and not (in_rows and self._section_end not in line):
+                for label in self._labels.finditer(line):
+                    name = label.lastgroup
+
+                    if name == "date" and date is None:
+                        date = True
+
+                        if match := _DATE.search(line, label.end()):
+                            yield Token(DATE, number, match.group(0))
+                            date = False
+                    elif name == "note_id" and note_id is None:
+                        yield Token(NOTE_HEADER, number, line)
+                        note_id = True
+
+                        if match := self._note_id.search(line, label.end()):
+                            yield Token(NOTE_ID, number, match.group(0))
+                            note_id = False
+                    elif name == "table" and section is None:
+                        section = "table"
+                        header_lines = self._table_header_lines
+                    elif name == "end" and section != "fees":
+                        if section == "table":
+                            yield Token(SECTION_END, number, line)
+
+                        section = "fees"
+                        yield Token(FEE_ROW, number, line[label.start():])
+
+            # The lines opening and closing a section are not rows of it
+            if line_section == "table" and section == "table":
+                if header_lines:
+                    header_lines -= 1
+                else:
+                    yield Token(TRADE_ROW, number, line)
+            elif line_section == "fees":
+                yield Token(FEE_ROW, number, line)
+
+    def find(self, text: str, kind: str) -> str | None:
+        """Returns the value of the first event of a kind, walking the text only until it is found."""
+        return next((token.value for token in self.tokenize(text) if token.kind == kind), None)
@@ -0,0 +1,169 @@
+"""
+Compares the records extracted with two text backends, to tell when a broker can switch backend.
+
+Every file is extracted with the reference backend and the candidate one, without the result
+cache, and the Brokerage records that differ are reported field by field along with the
+time each backend took. Without sources, a corpus of synthetic notes is generated. The run
+fails if any file differs, so it can gate a change of an extractor's TEXT_BACKEND.
+
+Usage: python -m benchmarks.parity [<source>...] [--broker auto] [--backends pdfplumber pdfminer] [--password P]... [--stub-resolver] [--output FILE]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from abstract.text_backends import TEXT_BACKENDS
+from benchmarks.run import StubResolver
+from benchmarks.synthetic import make_note
+from extractors.registry import AUTO, get_extractor_class, resolve_broker
+from extractors.rico import Rico
+from pipeline.batch import collect_paths
+
+# (pages, trades, notes) of the generated notes of each broker
+SYNTHETIC_NOTES = [(1, 10, 1), (3, 300, 1), (2, 50, 3), (1, 5, 4)]
+
+
+def extract(broker: str, path: str, password, backend: str, resolver=None) -> tuple:
+    """
+    Extracts a file with a backend.
+
+    Returns:
+        tuple: (JSON records or None, error dict or None, wall time in seconds).
+    """
+    cls = get_extractor_class(broker)
+    options = {"resolver": resolver} if resolver is not None and issubclass(cls, Rico) else {}
+    start = time.perf_counter()
+
+    try:
+        records = [brokerage.__json__() for brokerage in cls(path, password, backend=backend, **options).extract()]
+        error = None
+    except Exception as e:
+        records, error = None, {"exception": str(e), "type": type(e).__name__}
+
+    return records, error, time.perf_counter() - start
+
+
+def compare(reference: list, candidate: list) -> list:
+    """
+    Lists the differences between the records extracted from a file.
+
+    Returns:
+        list: A {"record", "field", "reference", "candidate"} dict per differing field, without
+            "field" for records only one of the backends extracted.
+    """
+    differences = []
+
+    for number in range(max(len(reference), len(candidate))):
+        expected = reference[number] if number < len(reference) else None
+        actual = candidate[number] if number < len(candidate) else None
+
+        if expected is None or actual is None:
+            differences.append({"record": number, "reference": expected, "candidate": actual})
+            continue
+
+        for field in dict.fromkeys([*expected, *actual]):
+            if expected.get(field) != actual.get(field):
+                differences.append({
+                    "record": number, "field": field, "reference": expected.get(field), "candidate": actual.get(field)
+                })
+
+    return differences
+
+
+def check_file(broker: str, path: str, password, backends: list, resolver=None) -> dict:
+    """Extracts a file with both backends and compares the results."""
+    reference, candidate = backends
+    result = {"path": path, "broker": None, "seconds": {}}
+
+    try:
+        broker = resolve_broker(broker, path, password)
+    except Exception as e:
+        return {**result, "error": {"exception": str(e), "type": type(e).__name__}}
+
+    result["broker"] = broker
+    outputs = {}
+
+    for backend in backends:
+        records, error, seconds = extract(broker, path, password, backend, resolver)
+        outputs[backend] = (records, error)
+        result["seconds"][backend] = seconds
+
+    (expected, expected_error), (actual, actual_error) = outputs[reference], outputs[candidate]
+
+    if expected_error is not None or actual_error is not None:
+        result["errors"] = {reference: expected_error, candidate: actual_error}
+        result["differences"] = [] if expected_error == actual_error else [{"reference": expected_error, "candidate": actual_error}]
+    else:
+        result["records"] = len(expected)
+        result["differences"] = compare(expected, actual)
+
+    return result
+
+
+def summarize(results: list, backends: list) -> dict:
+    """Sums the files, differing files and time of each backend per broker."""
+    summary = {}
+
+    for result in results:
+        totals = summary.setdefault(result["broker"], {
+            "files": 0, "differing": 0, "seconds": {backend: 0.0 for backend in backends}
+        })
+        totals["files"] += 1
+        totals["differing"] += bool(result.get("differences")) or "error" in result
+
+        for backend, seconds in result["seconds"].items():
+            totals["seconds"][backend] += seconds
+
+    return summary
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.parity", description="Compare the records extracted with two text backends.")
+    parser.add_argument("sources", nargs="*", help="PDF files, directories, glob patterns or @manifest files, synthetic notes if none")
+    parser.add_argument("--broker", default=AUTO, help="The broker of the notes, or 'auto' to detect it per file")
+    parser.add_argument(
+        "--backends", nargs=2, choices=list(TEXT_BACKENDS), default=["pdfplumber", "pdfminer"], metavar=("REFERENCE", "CANDIDATE"),
+        help="The reference backend and the one compared with it"
+    )
+    parser.add_argument("--password", action="append", help="Password of the PDF files, may be repeated")
+    parser.add_argument("--stub-resolver", action="store_true", help="Derive Rico tickers from the stock names instead of resolving them online")
+    parser.add_argument("--output", help="Write the JSON to this file instead of stdout")
+
+    args = parser.parse_args(argv)
+    resolver = StubResolver() if args.stub_resolver or not args.sources else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.sources:
+            paths = collect_paths(args.sources)
+        else:
+            paths = []
+
+            for broker in ("rico", "nuinvest"):
+                for seed, (pages, trades, notes) in enumerate(SYNTHETIC_NOTES):
+                    path = os.path.join(directory, f"{broker}-{pages}-{trades}-{notes}.pdf")
+                    make_note(path, broker, pages, trades, seed=seed, notes=notes)
+                    paths.append(path)
+
+        results = [check_file(args.broker, path, args.password, args.backends, resolver) for path in paths]
+
+    report = {
+        "backends": {"reference": args.backends[0], "candidate": args.backends[1]},
+        "summary": summarize(results, args.backends),
+        "files": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    return 1 if any(result.get("differences") or "error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
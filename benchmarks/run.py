@@ -0,0 +1,172 @@
+"""
+Benchmarks the extraction stages over synthetic brokerage notes.
+
+Each stage is timed separately (best and median of the repetitions) along with its peak
+traced memory, and the results are printed as JSON so runs can be compared across commits.
+The network ticker resolver is replaced with a stub, so only local work is measured.
+
+Usage: python -m benchmarks.run [--brokers rico nuinvest] [--pages 1 10] [--trades 10 1000] [--repeat 3] [--password P] [--backend pdfminer]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pdfplumber
+
+from abstract.text_backends import TEXT_BACKENDS, get_text_backend
+from benchmarks.synthetic import make_note
+from extractors.nuinvest import Nuinvest
+from extractors.rico import Rico
+from resolvers.ticker_index import default_index
+
+EXTRACTORS = {
+    "rico": Rico,
+    "nuinvest": Nuinvest,
+}
+
+
+class StubResolver:
+    """Stands in for the Yahoo Finance resolver, deriving a ticker from the stock name."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def resolve(self, stock_name: str) -> str:
+        self.calls += 1
+        return stock_name.split(" ")[0][:4].upper() + "3"
+
+    def resolve_many(self, stock_names) -> dict:
+        return {stock_name.strip(): self.resolve(stock_name) for stock_name in dict.fromkeys(stock_names)}
+
+
+def make_extractor(broker: str, backend: str | None = None):
+    """Builds an extractor without reading a PDF, so each stage can be timed on its own."""
+    cls = EXTRACTORS[broker]
+    extractor = cls.__new__(cls)
+    extractor._backend = get_text_backend(backend or cls.TEXT_BACKEND)
+    extractor._page_cache = None
+
+    if isinstance(extractor, Rico):
+        extractor._resolver = StubResolver()
+        extractor._ticker_index = default_index()
+
+    return extractor
+
+
+def measure(function, repeat: int) -> tuple:
+    """
+    Runs a function `repeat` times.
+
+    Returns:
+        tuple: (last result, list of wall times in seconds, peak traced memory in bytes).
+    """
+    times = []
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    # Memory is traced on a separate run, as tracing slows the code down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, times, peak
+
+
+def bench_note(broker: str, path: str, password: str | None, repeat: int, backend: str | None = None) -> dict:
+    extractor = make_extractor(broker, backend)
+    stages = {}
+
+    def record(stage: str, function):
+        result, times, peak = measure(function, repeat)
+        stages[stage] = {
+            "best_seconds": min(times),
+            "median_seconds": statistics.median(times),
+            "peak_bytes": peak,
+        }
+        return result
+
+    extractor._text = record("pdf_to_text", lambda: extractor.pdf_to_text(path, password))
+    brokerages = record("_get_brokerages", extractor._get_brokerages)
+    fee, ir = record("_get_taxes", extractor._get_taxes)
+    record("_make_brokerage_apportionment", lambda: extractor._make_brokerage_apportionment(brokerages, fee, ir))
+
+    return {"brokerages": len(brokerages), "stages": stages}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmark the extraction stages.")
+    parser.add_argument("--brokers", nargs="+", choices=list(EXTRACTORS), default=list(EXTRACTORS))
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--trades", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--password", help="Also benchmark notes encrypted with this password")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=list(TEXT_BACKENDS), help="Text backend to time, each broker's TEXT_BACKEND by default")
+    parser.add_argument("--output", help="Write the JSON to this file instead of stdout")
+
+    args = parser.parse_args(argv)
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for broker in args.brokers:
+            for pages in args.pages:
+                for trades in args.trades:
+                    for password in [None, args.password] if args.password else [None]:
+                        path = os.path.join(directory, f"{broker}-{pages}-{trades}.pdf")
+                        make_note(path, broker, pages, trades, password, args.seed)
+
+                        with pdfplumber.open(path, password=password) as pdf:
+                            page_count = len(pdf.pages)
+
+                        results.append({
+                            "broker": broker,
+                            "pages": page_count,
+                            "trades": trades,
+                            "encrypted": password is not None,
+                            "file_bytes": os.path.getsize(path),
+                            **bench_note(broker, path, password, args.repeat, args.backend),
+                        })
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "pdfplumber": pdfplumber.__version__,
+        "repeat": args.repeat,
+        "backend": args.backend,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""
+Measures the import cost of the command line entry points.
+
+Each scenario runs in a fresh interpreter under `python -X importtime`, and the cumulative
+import time of its top-level modules is printed as JSON. The run fails if a scenario imports
+a module it should not need, e.g. the CLI loading pdfplumber before a PDF is actually read.
+
+Usage: python -m benchmarks.startup [--repeat 5] [--output FILE]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scenario -> (code run, modules it must not import)
+SCENARIOS = {
+    "import main": ("import main", ["pdfplumber", "pdfminer", "requests"]),
+    "nuinvest extractor": (
+        "from extractors.registry import get_extractor_class; get_extractor_class('nuinvest')",
+        ["pdfplumber", "pdfminer", "requests"],
+    ),
+    "rico extractor": (
+        "from extractors.registry import get_extractor_class; get_extractor_class('rico')",
+        ["pdfplumber", "pdfminer", "requests"],
+    ),
+}
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(code: str) -> tuple:
+    """
+    Runs code in a new interpreter and reads its `-X importtime` report.
+
+    Returns:
+        tuple: (total import time in microseconds, set of the modules imported).
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    total, modules = 0, set()
+
+    for line in process.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+
+        if match:
+            modules.add(match.group(4))
+
+            # Nested imports are already included in the cumulative time of the top-level ones
+            if len(match.group(3)) == 1:
+                total += int(match.group(2))
+
+    return total, modules
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Measure the import cost of the CLI.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON to this file instead of stdout")
+
+    args = parser.parse_args(argv)
+    results = {}
+    failed = False
+
+    for name, (code, forbidden) in SCENARIOS.items():
+        runs = [import_times(code) for _ in range(args.repeat)]
+        # The imported modules are the same on every run, only the timings vary
+        modules = runs[0][1]
+        loaded = [module for module in forbidden if module in modules]
+
+        results[name] = {
+            "best_microseconds": min(total for total, _ in runs),
+            "median_microseconds": statistics.median(total for total, _ in runs),
+            "modules": len(modules),
+            "forbidden_imports": loaded,
+        }
+        failed = failed or bool(loaded)
+
+    report = {"python": sys.version.split()[0], "repeat": args.repeat, "scenarios": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,417 @@
+"""
+Generator of synthetic Rico and Nuinvest brokerage notes.
+
+The PDFs are written by hand (Helvetica text drawn line by line, with the trades table
+drawn in columns), so no PDF library is needed, and can optionally be encrypted with the PDF
+standard security handler (RC4, 40 bits). The layouts only reproduce the text the extractors
+parse, not the look of the real notes.
+
+Usage: python -m benchmarks.synthetic <rico|nuinvest> <output.pdf> [--pages N] [--trades N] [--notes N] [--password P]
+"""
+import argparse
+import csv
+import hashlib
+import random
+
+from resolvers.ticker_index import DEFAULT_DATA_FILE
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 30
+LINE_HEIGHT = 11
+FONT_SIZE = 8
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+
+# Padding string of the standard security handler (PDF 1.7, 7.6.3.3)
+PASSWORD_PADDING = bytes.fromhex("28BF4E5E4E758A4164004E56FFFA01082E2E00B6D0683E802F0CA9FE6453697A")
+
+# Left edge of each column of the trades table, in the order of its header labels
+TABLE_COLUMNS = {
+    "rico": [
+        ("Q", 30),
+        ("Negociação", 40),
+        ("C/V", 90),
+        ("Tipo mercado", 110),
+        ("Prazo", 170),
+        ("Especificação do título", 195),
+        ("Obs. (*)", 330),
+        ("Quantidade", 365),
+        ("Preço / Ajuste", 415),
+        ("Valor Operação / Ajuste", 470),
+        ("D/C", 565),
+    ],
+    "nuinvest": [
+        ("Praça", 30),
+        ("C/V", 75),
+        ("Tipo Mercado", 95),
+        ("Código", 155),
+        ("Especificação do Título", 200),
+        ("Quantidade", 345),
+        ("Preço / Ajuste", 395),
+        ("Valor / Ajuste", 460),
+        ("D/C", 540),
+    ],
+}
+
+BOILERPLATE = [
+    "As operações a termo não são computadas no líquido da fatura.",
+    "(*) Observações: A - Posição futuro, T - Liquidação pelo bruto, I - POP, C - Clubes e fundos de ações.",
+    "Ouvidoria: atendimento de segunda a sexta das 9h às 18h.",
+]
+
+
+def _rc4(key: bytes, data: bytes) -> bytes:
+    state = list(range(256))
+    j = 0
+
+    for i in range(256):
+        j = (j + state[i] + key[i % len(key)]) % 256
+        state[i], state[j] = state[j], state[i]
+
+    out = bytearray()
+    i = j = 0
+
+    for byte in data:
+        i = (i + 1) % 256
+        j = (j + state[i]) % 256
+        state[i], state[j] = state[j], state[i]
+        out.append(byte ^ state[(state[i] + state[j]) % 256])
+
+    return bytes(out)
+
+
+class _Encryption:
+    """Standard security handler, revision 2 (40-bit RC4)."""
+
+    PERMISSIONS = -44
+
+    def __init__(self, password: str, document_id: bytes) -> None:
+        user = (password.encode("latin-1") + PASSWORD_PADDING)[:32]
+
+        # Algorithm 3: the owner password is the user password
+        owner_key = hashlib.md5(user).digest()[:5]
+        self.owner = _rc4(owner_key, user)
+
+        # Algorithm 2: the file encryption key
+        digest = hashlib.md5(user + self.owner + self.PERMISSIONS.to_bytes(4, "little", signed=True) + document_id)
+        self.key = digest.digest()[:5]
+
+        # Algorithm 4: the user password check value
+        self.user = _rc4(self.key, PASSWORD_PADDING)
+
+    def encrypt(self, number: int, data: bytes) -> bytes:
+        object_key = hashlib.md5(self.key + number.to_bytes(3, "little") + b"\x00\x00").digest()[:10]
+        return _rc4(object_key, data)
+
+    def dictionary(self) -> bytes:
+        return (
+            b"<< /Filter /Standard /V 1 /R 2 /Length 40 /P " + str(self.PERMISSIONS).encode()
+            + b" /O <" + self.owner.hex().encode() + b"> /U <" + self.user.hex().encode() + b"> >>"
+        )
+
+
+def _escape(text: str) -> bytes:
+    data = text.encode("cp1252", "replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_pdf(path: str, pages: list, password: str | None = None) -> None:
+    """
+    Writes a PDF with one text line per entry of each page.
+
+    Args:
+        path (str): The output path.
+        pages (list): A list of pages, each a list of lines. A line is either a string drawn
+            at the left margin or a list of (x, text) cells.
+        password (str, optional): Encrypts the PDF with this user password.
+
+    Returns:
+        None
+    """
+    document_id = hashlib.md5(repr(pages).encode("utf-8")).digest()
+    encryption = _Encryption(password, document_id) if password else None
+
+    # Objects 1: catalog, 2: pages, 3: font, then a page and a content stream per page
+    page_numbers = [4 + 2 * index for index in range(len(pages))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: (
+            b"<< /Type /Pages /Count " + str(len(pages)).encode()
+            + b" /Kids [" + b" ".join(b"%d 0 R" % number for number in page_numbers) + b"] >>"
+        ),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+
+    for number, lines in zip(page_numbers, pages):
+        content = [b"BT /F1 %d Tf" % FONT_SIZE]
+
+        for index, line in enumerate(lines):
+            y = PAGE_HEIGHT - MARGIN - index * LINE_HEIGHT
+
+            for x, text in [(MARGIN, line)] if isinstance(line, str) else line:
+                if text:
+                    content.append(b"1 0 0 1 %d %d Tm (%s) Tj" % (x, y, _escape(text)))
+
+        content.append(b"ET")
+        stream = b"\n".join(content)
+
+        if encryption:
+            stream = encryption.encrypt(number + 1, stream)
+
+        objects[number] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] " % (PAGE_WIDTH, PAGE_HEIGHT)
+            + b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (number + 1)
+        )
+        objects[number + 1] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+
+    if encryption:
+        objects[len(objects) + 1] = encryption.dictionary()
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+
+    for number in sorted(objects):
+        offsets[number] = len(output)
+        output += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+
+    for number in sorted(objects):
+        output += b"%010d 00000 n \n" % offsets[number]
+
+    trailer = b"<< /Size %d /Root 1 0 R /ID [<%s> <%s>]" % (len(objects) + 1, document_id.hex().encode(), document_id.hex().encode())
+
+    if encryption:
+        trailer += b" /Encrypt %d 0 R" % len(objects)
+
+    output += b"trailer\n" + trailer + b" >>\nstartxref\n%d\n%%%%EOF\n" % xref_offset
+
+    with open(path, "wb") as fp:
+        fp.write(output)
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def make_trades(count: int, seed: int = 0, unindexed_ratio: float = 0.1) -> list:
+    """
+    Builds random trades.
+
+    Args:
+        count (int): Number of trades.
+        seed (int): Random seed, so runs are reproducible.
+        unindexed_ratio (float): Share of trades whose stock is not in the bundled ticker index.
+
+    Returns:
+        list: (ticker, stock_name, deal_type, market, quantity, price) tuples.
+    """
+    rng = random.Random(seed)
+
+    with open(DEFAULT_DATA_FILE, encoding="utf-8", newline="") as fp:
+        rows = [(row["ticker"], row["issuer"], row["share_class"]) for row in csv.DictReader(fp)]
+
+    trades = []
+
+    for _ in range(count):
+        if rng.random() < unindexed_ratio:
+            ticker = f"SYNT{rng.randint(0, 9)}3"
+            stock_name = f"SINTETICA{ticker[4]} ON NM"
+        else:
+            ticker, issuer, share_class = rng.choice(rows)
+            stock_name = f"{issuer} {share_class} {rng.choice(['NM', 'N1', 'N2'])}"
+
+        # Quantities are kept off the digits printed before them on the line (e.g. "1-BOVESPA"),
+        # which the text extractors would mistake for the quantity
+        quantity = rng.choice([10, 20, 50, 100, 200, 300, 500, 1000])
+        market = "FRACIONARIO" if quantity < 100 else "VISTA"
+        price = round(rng.uniform(1, 120), 2)
+        trades.append((ticker, stock_name, rng.choice("CV"), market, quantity, price))
+
+    return trades
+
+
+def _table_line(broker: str, texts: list) -> list:
+    return [(x, text) for (_, x), text in zip(TABLE_COLUMNS[broker], texts)]
+
+
+def _trade_line(broker: str, trade: tuple) -> list:
+    ticker, stock_name, deal_type, market, quantity, price = trade
+    value = _format_number(quantity * price)
+    debit_credit = "D" if deal_type == "C" else "C"
+
+    if broker == "rico":
+        texts = ["", "1-BOVESPA", deal_type, market, "", stock_name, "", str(quantity), _format_number(price), value, debit_credit]
+    else:
+        symbol = ticker + ("F" if market == "FRACIONARIO" else "")
+        texts = ["BOVESPA", deal_type, market, symbol, stock_name, str(quantity), _format_number(price), value, debit_credit]
+
+    return _table_line(broker, texts)
+
+
+def _header(broker: str, note_id: str, date: str, page: int) -> list:
+    if broker == "rico":
+        return [
+            "NOTA DE CORRETAGEM",
+            "Nr. nota Folha Data pregão",
+            f"{note_id} {page} {date}",
+            "Rico Investimentos - Corretora de Títulos e Valores Mobiliários S.A.",
+            "Cliente: 000000 INVESTIDOR SINTETICO",
+        ]
+
+    return [
+        "NOTA DE NEGOCIAÇÃO",
+        "Número da nota Folha Data Pregão",
+        f"{note_id} {page}",
+        date,
+        "Nu Invest Corretora de Valores S.A.",
+    ]
+
+
+def _fee_block(broker: str, trades: list, fees: dict) -> list:
+    sold = sum(quantity * price for _, _, deal_type, _, quantity, price in trades if deal_type == "V")
+
+    if broker == "rico":
+        return [
+            "Resumo dos Negócios Resumo Financeiro",
+            f"Vendas à vista {_format_number(sold)} Clearing",
+            f"Taxa de liquidação {_format_number(fees['liquidacao'])} D",
+            f"Taxa de Registro {_format_number(fees['registro'])} D",
+            "Taxa de termo/opções 0,00",
+            "Taxa A.N.A. 0,00",
+            f"Emolumentos {_format_number(fees['emolumentos'])} D",
+            "Taxa Operacional 0,00 D",
+            "Execução 0,00",
+            "Taxa de Custódia 0,00",
+            "Impostos 0,00",
+            f"I.R.R.F. s/ operações, base R${_format_number(sold)} {_format_number(fees['irrf'])}",
+            "Outros 0,00 C",
+        ]
+
+    return [
+        "RReessuummoo ddooss NNeeggóócciiooss",
+        f"Vendas à vista {_format_number(sold)}",
+        f"Taxa de liquidação {_format_number(fees['liquidacao'])}",
+        f"Taxa de Registro {_format_number(fees['registro'])}",
+        f"Emolumentos {_format_number(fees['emolumentos'])}",
+        "Corretagem 0,00",
+        "ISS 0,00",
+        f"I.R.R.F. s/ operações {_format_number(sold)} {_format_number(fees['irrf'])}",
+        "Outras 0,00",
+    ]
+
+
+def make_note_pages(
+        broker: str,
+        trades: list,
+        pages: int = 1,
+        note_id: str = "123456",
+        date: str = "15/03/2024"
+    ) -> list:
+    """
+    Lays out a note as lists of lines, as taken by `write_pdf`.
+
+    Trades are spread over as many pages as needed, each starting with the note header and
+    the trades table title, and the fee summary closes the last trades page. Pages beyond
+    those are filled with boilerplate text, as the terms pages of real notes.
+
+    Args:
+        broker (str): "rico" or "nuinvest".
+        trades (list): Trades built by `make_trades`.
+        pages (int): Minimum number of pages.
+        note_id (str): The note number.
+        date (str): The trading date, "dd/mm/yyyy".
+
+    Returns:
+        list: The pages, each a list of lines.
+    """
+    if broker not in ("rico", "nuinvest"):
+        raise ValueError("Broker not supported")
+
+    total = sum(quantity * price for _, _, _, _, quantity, price in trades)
+    fees = {
+        "liquidacao": round(total * 0.00025, 2),
+        "registro": round(total * 0.00005, 2),
+        "emolumentos": round(total * 0.00005, 2),
+        "irrf": round(sum(quantity * price for _, _, deal_type, _, quantity, price in trades if deal_type == "V") * 0.00005, 2),
+    }
+
+    header = _table_line(broker, [label for label, _ in TABLE_COLUMNS[broker]])
+    table = ["Negócios realizados" if broker == "rico" else "MMeerrccaaddoo", header]
+
+    fee_block = _fee_block(broker, trades, fees)
+    lines = [_trade_line(broker, trade) for trade in trades]
+    per_page = LINES_PER_PAGE - 5 - len(table)
+    result = []
+
+    while True:
+        page_lines = _header(broker, note_id, date, len(result) + 1) + table
+        chunk, lines = lines[:per_page], lines[per_page:]
+        page_lines += chunk
+
+        if not lines and len(page_lines) + len(fee_block) <= LINES_PER_PAGE:
+            result.append(page_lines + fee_block)
+            break
+
+        result.append(page_lines)
+
+        if not lines:
+            result.append(_header(broker, note_id, date, len(result) + 1) + table + fee_block)
+            break
+
+    while len(result) < pages:
+        result.append(_header(broker, note_id, date, len(result) + 1) + BOILERPLATE * 10)
+
+    return result
+
+
+def make_note(
+        path: str,
+        broker: str,
+        pages: int = 1,
+        trades: int = 10,
+        password: str | None = None,
+        seed: int = 0,
+        notes: int = 1,
+        unindexed_ratio: float = 0.1
+    ) -> list:
+    """
+    Writes a synthetic brokerage note, or a consolidated file of many notes.
+
+    Args:
+        path (str): The output path.
+        broker (str): "rico" or "nuinvest".
+        pages (int): Minimum number of pages of each note.
+        trades (int): Number of trade lines of each note.
+        password (str, optional): Encrypts the PDF with this password.
+        seed (int): Random seed of the trades.
+        notes (int): Number of notes, numbered from 123456 and traded on consecutive days.
+        unindexed_ratio (float): Share of trades whose stock is not in the bundled ticker index.
+
+    Returns:
+        list: The trades of each note, as built by `make_trades`.
+    """
+    trade_lists = [make_trades(trades, seed + index, unindexed_ratio) for index in range(notes)]
+    note_pages = []
+
+    for index, trade_list in enumerate(trade_lists):
+        note_pages += make_note_pages(broker, trade_list, pages, str(123456 + index), f"{index % 28 + 1:02d}/03/2024")
+
+    write_pdf(path, note_pages, password)
+
+    return trade_lists
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic brokerage note.")
+    parser.add_argument("broker", choices=["rico", "nuinvest"])
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--trades", type=int, default=10)
+    parser.add_argument("--password")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--notes", type=int, default=1)
+
+    args = parser.parse_args()
+    make_note(args.output, args.broker, args.pages, args.trades, args.password, args.seed, args.notes)
@@ -0,0 +1,95 @@
+import functools
+import json
+import zlib
+
+from cache.sqlite_cache import MISSING, SQLiteCache
+
+class PageCache(SQLiteCache):
+    """
+    Cache of what was read from the pages of PDF files: layout text, note numbers and table rows.
+
+    Reading the pages is nearly all the cost of an extraction and does not depend on how the
+    extractors parse them, so when a parsing fix bumps an extractor VERSION (invalidating its
+    results) the notes are parsed again from the cached pages instead of decoding the PDFs.
+    Entries are keyed by the file content hash, the text backend, the PDF library versions and
+    how the extractor reads its pages (see `Extractor._pages_signature`), and stored as
+    zlib-compressed JSON, the least recently used being evicted past `max_bytes`.
+    """
+
+    FILENAME = "pages.sqlite3"
+    PERSIST_STATS = True
+
+    MAX_ENTRIES = 100_000
+    MAX_BYTES = 1024 * 1024 * 1024
+
+    COMPRESSION_LEVEL = 6
+
+    def __init__(
+            self,
+            path: str | None = None,
+            max_entries: int | None = MAX_ENTRIES,
+            max_bytes: int | None = MAX_BYTES
+        ) -> None:
+        super().__init__(path, ttl=None, max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(backend: str, signature: str, digest: str) -> str:
+        return f"{backend}:{library_versions()}:{signature}:{digest}"
+
+    def get_pages(self, key: str) -> list | None:
+        """
+        Fetches the pages read from a file.
+
+        Args:
+            key (str): The key built by `make_key`.
+
+        Returns:
+            list or None: A JSON record per page, or None on a cache miss.
+        """
+        value = self.get(key)
+
+        if value is MISSING:
+            return None
+
+        return json.loads(zlib.decompress(value))
+
+    def set_pages(self, key: str, pages: list) -> None:
+        """
+        Stores the pages read from a file.
+
+        Args:
+            key (str): The key built by `make_key`.
+            pages (list): A JSON record per page.
+
+        Returns:
+            None
+        """
+        self.set(key, zlib.compress(json.dumps(pages, separators=(",", ":")).encode("utf-8"), self.COMPRESSION_LEVEL))
+
+
+@functools.cache
+def library_versions() -> str:
+    """Returns the versions of the PDF libraries the pages are read with, without importing them."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = []
+
+    for package in ("pdfplumber", "pdfminer.six"):
+        try:
+            versions.append(f"{package}-{version(package)}")
+        except PackageNotFoundError:
+            versions.append(f"{package}-none")
+
+    return ",".join(versions)
+
+
+_default_page_cache = None
+
+def default_page_cache() -> PageCache:
+    """Returns the process-wide page cache."""
+    global _default_page_cache
+
+    if _default_page_cache is None:
+        _default_page_cache = PageCache()
+
+    return _default_page_cache
@@ -0,0 +1,100 @@
+import hmac
+import os
+import secrets
+
+from cache.sqlite_cache import MISSING, SQLiteCache
+
+class PasswordCache(SQLiteCache):
+    """
+    Remembers which password opens each encrypted PDF, keyed by the file content hash.
+
+    Passwords are not stored: each entry holds an HMAC-SHA256 of the file hash and the password,
+    which is only used to recognize the password among the candidates of a later run. The HMAC
+    key is a random secret created on first use in a file of its own, readable by its owner only,
+    so the database alone cannot be used to test passwords against. Whoever can read the key as
+    well can, and the passwords of notes (e.g. CPF prefixes) are few, so the key must be kept as
+    private as the passwords themselves. Deleting it only makes every entry a miss.
+    """
+
+    FILENAME = "passwords.sqlite3"
+
+    # Name of the key file, next to the database unless BROKERAGE_EXTRACTOR_PASSWORD_KEY gives its path
+    KEY_FILENAME = "passwords.key"
+
+    MAX_ENTRIES = 100_000
+
+    def __init__(self, path: str | None = None, max_entries: int | None = MAX_ENTRIES, key_path: str | None = None) -> None:
+        super().__init__(path, ttl=None, max_entries=max_entries)
+        self.key_path = (
+            key_path
+            or os.environ.get("BROKERAGE_EXTRACTOR_PASSWORD_KEY")
+            or os.path.join(os.path.dirname(self.path), self.KEY_FILENAME)
+        )
+        self._key = None
+
+    def _read_key(self) -> bytes:
+        """Returns the HMAC key, creating its file on first use."""
+        if self._key is None:
+            try:
+                with open(self.key_path, "rb") as file:
+                    self._key = file.read()
+            except FileNotFoundError:
+                self._key = self._create_key()
+
+        return self._key
+
+    def _create_key(self) -> bytes:
+        directory = os.path.dirname(self.key_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Written to a temporary file and linked in place, so processes creating the key at the
+        # same time agree on the one linked first and never read a partial key
+        key = secrets.token_bytes(32)
+        temporary = f"{self.key_path}.{os.getpid()}.tmp"
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(key)
+
+            os.link(temporary, self.key_path)
+        except FileExistsError:
+            with open(self.key_path, "rb") as file:
+                key = file.read()
+        finally:
+            os.unlink(temporary)
+
+        return key
+
+    def fingerprint(self, digest: str, password: str) -> str:
+        return hmac.new(self._read_key(), f"{digest}:{password}".encode("utf-8"), "sha256").hexdigest()
+
+    def lookup(self, digest: str) -> str | None:
+        """
+        Looks up the fingerprint of the password that opened a file.
+
+        Args:
+            digest (str): The SHA-256 of the file content.
+
+        Returns:
+            str or None: The fingerprint stored by `store`, or None if the file was never opened.
+        """
+        value = self.get(digest)
+
+        return None if value is MISSING else value
+
+    def store(self, digest: str, password: str) -> None:
+        self.set(digest, self.fingerprint(digest, password))
+
+
+_default_password_cache = None
+
+def default_password_cache() -> PasswordCache:
+    """Returns the process-wide password cache."""
+    global _default_password_cache
+
+    if _default_password_cache is None:
+        _default_password_cache = PasswordCache()
+
+    return _default_password_cache
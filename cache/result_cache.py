@@ -0,0 +1,119 @@
+import hashlib
+import json
+
+from cache.sqlite_cache import MISSING, SQLiteCache
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the SHA-256 of a file's content.
+
+    Args:
+        path (str): The path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as fp:
+        while chunk := fp.read(chunk_size):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class ResultCache(SQLiteCache):
+    """
+    Cache of extraction results keyed by the PDF content hash, the broker and the extractor version.
+
+    Results are stored as the JSON of the extracted brokerages, so a file that was already
+    extracted is only hashed. Bumping an extractor VERSION invalidates its previous results.
+    """
+
+    FILENAME = "results.sqlite3"
+    PERSIST_STATS = True
+
+    MAX_ENTRIES = 100_000
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(
+            self,
+            path: str | None = None,
+            max_entries: int | None = MAX_ENTRIES,
+            max_bytes: int | None = MAX_BYTES
+        ) -> None:
+        super().__init__(path, ttl=None, max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(broker: str, version: str, digest: str) -> str:
+        return f"{broker}:{version}:{digest}"
+
+    def get_broker(self, digest: str) -> str | None:
+        """
+        Fetches the broker detected for a file, so extracting it again does not open it.
+
+        Args:
+            digest (str): The SHA-256 of the file content.
+
+        Returns:
+            str or None: The broker, or None on a cache miss.
+        """
+        value = self.get(f"broker:{digest}")
+
+        return None if value is MISSING else value
+
+    def set_broker(self, digest: str, broker: str) -> None:
+        """
+        Stores the broker detected for a file.
+
+        Args:
+            digest (str): The SHA-256 of the file content.
+            broker (str): The broker.
+
+        Returns:
+            None
+        """
+        self.set(f"broker:{digest}", broker)
+
+    def get_result(self, key: str) -> list | None:
+        """
+        Fetches a cached extraction result.
+
+        Args:
+            key (str): The key built by `make_key`.
+
+        Returns:
+            list or None: The brokerages as JSON dicts, or None on a cache miss.
+        """
+        value = self.get(key)
+
+        if value is MISSING:
+            return None
+
+        return json.loads(value)
+
+    def set_result(self, key: str, records: list) -> None:
+        """
+        Stores an extraction result.
+
+        Args:
+            key (str): The key built by `make_key`.
+            records (list): The brokerages as JSON dicts.
+
+        Returns:
+            None
+        """
+        self.set(key, json.dumps(records, separators=(",", ":")))
+
+
+_default_result_cache = None
+
+def default_result_cache() -> ResultCache:
+    """Returns the process-wide result cache."""
+    global _default_result_cache
+
+    if _default_result_cache is None:
+        _default_result_cache = ResultCache()
+
+    return _default_result_cache
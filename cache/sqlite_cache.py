@@ -0,0 +1,306 @@
+import atexit
+import os
+import sqlite3
+import time
+
+MISSING = object()
+
+
+def default_cache_dir() -> str:
+    """
+    Returns the directory where the on-disk caches are stored.
+
+    The location can be overridden with the BROKERAGE_EXTRACTOR_CACHE_DIR environment variable.
+
+    Returns:
+        str: The cache directory path.
+    """
+    cache_dir = os.environ.get("BROKERAGE_EXTRACTOR_CACHE_DIR")
+
+    if not cache_dir:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base_dir, "brokerage_extractor")
+
+    return cache_dir
+
+
+class SQLiteCache:
+    """
+    A key/value cache persisted in a SQLite database.
+
+    Entries may expire after a TTL and the least recently used ones are evicted once the
+    cache grows beyond `max_entries` entries or `max_bytes` of stored values. The database
+    runs in WAL mode so it can be shared by several processes at the same time.
+
+    The number of entries and their total size are kept up to date by triggers, so a write
+    only has to evict when a limit is exceeded, and it then shrinks the cache to EVICT_TO of
+    its limits at once. Lookups are kept read-only as much as possible, as every write takes the database lock
+    shared by all those processes: the access time of an entry is only refreshed once it is
+    TOUCH_INTERVAL seconds old, and persisted hit/miss counters are written in batches.
+    """
+
+    FILENAME = "cache.sqlite3"
+
+    # Whether hit/miss counters are also accumulated in the database, across processes and runs
+    PERSIST_STATS = False
+
+    # Seconds the recorded access time of an entry may lag behind, which is the precision of the LRU order
+    TOUCH_INTERVAL = 60.0
+
+    # Lookups counted in memory before the persisted counters are updated
+    STATS_BATCH = 100
+
+    # Fraction of `max_entries` and `max_bytes` the cache is shrunk to once it grows beyond either
+    EVICT_TO = 0.9
+
+    def __init__(
+            self,
+            path: str | None = None,
+            ttl: float | None = None,
+            max_entries: int | None = None,
+            max_bytes: int | None = None
+        ) -> None:
+        self.path = path or os.path.join(default_cache_dir(), self.FILENAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._pending_stats = {}
+
+        if self.PERSIST_STATS:
+            atexit.register(self._flush_stats)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across a fork, so reconnect in child processes
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Not bound to the thread opening it, as the ticker cache may be used from the helper thread of
+            # `YahooFinanceResolver.resolve_many` while that thread waits; it is never used concurrently
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # So replacing an entry fires the delete trigger that keeps `usage` up to date
+            self._conn.execute("PRAGMA recursive_triggers=ON")
+            self._create_schema(self._conn)
+            self._pid = os.getpid()
+            # Counts inherited from the parent process are the parent's to write
+            self._pending_stats = {}
+
+        return self._conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        # In one transaction, so `usage` starts from the entries of a database created before it
+        # without missing the writes of other processes
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB, "
+                "expires_at REAL, "
+                "accessed_at REAL NOT NULL, "
+                "size INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Covers the LRU order and the sizes, which are otherwise stored past the values
+            conn.execute("DROP INDEX IF EXISTS entries_accessed_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at, size)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), "
+                "entries INTEGER NOT NULL, "
+                "bytes INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO usage SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+                "UPDATE usage SET entries = entries + 1, bytes = bytes + NEW.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+                "UPDATE usage SET entries = entries - 1, bytes = bytes - OLD.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN "
+                "UPDATE usage SET bytes = bytes - OLD.size + NEW.size; END"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str, default=MISSING):
+        """
+        Fetches a value from the cache.
+
+        Args:
+            key (str): The entry key.
+            default: The value returned when the key is missing or expired.
+
+        Returns:
+            The cached value, or `default` if there is no valid entry.
+        """
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            self._count("misses")
+            return default
+
+        value, expires_at, accessed_at = row
+
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count("misses")
+            return default
+
+        if now - accessed_at >= self.TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        self._count("hits")
+
+        return value
+
+    def _count(self, name: str) -> None:
+        setattr(self, name, getattr(self, name) + 1)
+
+        if self.PERSIST_STATS:
+            self._pending_stats[name] = self._pending_stats.get(name, 0) + 1
+
+            if sum(self._pending_stats.values()) >= self.STATS_BATCH:
+                self._flush_stats()
+
+    def _flush_stats(self) -> None:
+        """
+        Adds the hits and misses counted since the last flush to the persisted counters.
+
+        It runs at exit too, though processes that are killed lose their last counts.
+        """
+        if not self._pending_stats or self._pid != os.getpid():
+            return
+
+        pending = list(self._pending_stats.items())
+        self._pending_stats = {}
+        self._connection().executemany(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            pending
+        )
+
+    def set(self, key: str, value, ttl: float | None = None, expires_at: float | None = None) -> None:
+        """
+        Stores a value in the cache, evicting old entries if needed.
+
+        Args:
+            key (str): The entry key.
+            value: The value to store (str, bytes or None).
+            ttl (float, optional): Time to live in seconds, defaults to the cache TTL.
+            expires_at (float, optional): Absolute expiration timestamp, overrides `ttl`.
+
+        Returns:
+            None
+        """
+        now = time.time()
+
+        if expires_at is None:
+            ttl = ttl if ttl is not None else self.ttl
+            expires_at = now + ttl if ttl is not None else None
+
+        size = len(value) if value is not None else 0
+
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+            (key, value, expires_at, now, size)
+        )
+        self._evict()
+        self._flush_stats()
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM stats")
+        self._pending_stats = {}
+
+    def items(self):
+        """
+        Iterates over the valid entries of the cache.
+
+        Returns:
+            Iterator of (key, value, expires_at) tuples.
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "SELECT key, value, expires_at FROM entries WHERE expires_at IS NULL OR expires_at > ? ORDER BY key",
+            (now,)
+        )
+
+        yield from cursor
+
+    def _evict(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        entries, size = conn.execute("SELECT entries, bytes FROM usage").fetchone()
+        excess_entries = excess_bytes = 0
+
+        if self.max_entries is not None and entries > self.max_entries:
+            excess_entries = entries - int(self.max_entries * self.EVICT_TO)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            excess_bytes = size - int(self.max_bytes * self.EVICT_TO)
+
+        if not excess_entries and not excess_bytes:
+            return
+
+        # Drop the least recently used entries until both the count and the size are back under EVICT_TO
+        conn.execute(
+            "DELETE FROM entries WHERE rowid IN ("
+            "SELECT rowid FROM ("
+            "SELECT rowid, ROW_NUMBER() OVER lru AS number, SUM(size) OVER lru - size AS freed FROM entries "
+            "WINDOW lru AS (ORDER BY accessed_at, rowid)"
+            ") WHERE number <= ? OR freed < ?)",
+            (excess_entries, excess_bytes)
+        )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT entries FROM usage").fetchone()[0]
+
+    def stats(self) -> dict:
+        self._flush_stats()
+        conn = self._connection()
+        entries, size = conn.execute("SELECT entries, bytes FROM usage").fetchone()
+        stats = {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+        if self.PERSIST_STATS:
+            totals = dict(conn.execute("SELECT name, value FROM stats"))
+            stats["total_hits"] = totals.get("hits", 0)
+            stats["total_misses"] = totals.get("misses", 0)
+
+        return stats
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._flush_stats()
+            self._conn.close()
+
+        self._conn = None
+        self._pid = None
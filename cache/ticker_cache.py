@@ -0,0 +1,105 @@
+import json
+import re
+
+from cache.sqlite_cache import MISSING, SQLiteCache
+
+class TickerCache(SQLiteCache):
+    """
+    Persistent cache of stock name -> ticker resolutions.
+
+    Both successful lookups and misses are stored, so a name prefix that has no match
+    is not queried again until its (shorter) negative TTL expires.
+    """
+
+    FILENAME = "tickers.sqlite3"
+
+    POSITIVE_TTL = 30 * 24 * 60 * 60
+    NEGATIVE_TTL = 7 * 24 * 60 * 60
+    MAX_ENTRIES = 50_000
+
+    def __init__(
+            self,
+            path: str | None = None,
+            ttl: float | None = POSITIVE_TTL,
+            negative_ttl: float | None = NEGATIVE_TTL,
+            max_entries: int | None = MAX_ENTRIES
+        ) -> None:
+        super().__init__(path, ttl, max_entries)
+        self.negative_ttl = negative_ttl
+
+    @staticmethod
+    def normalize(stock_name: str) -> str:
+        """Normalizes a stock name so equivalent names share the same cache entry."""
+        return re.sub(r"\s+", " ", stock_name).strip().upper()
+
+    def lookup(self, stock_name: str):
+        """
+        Looks up a stock name in the cache.
+
+        Args:
+            stock_name (str): The stock name (or name prefix) to look up.
+
+        Returns:
+            str if the ticker is cached, None if the name is known to have no ticker,
+            or MISSING if the name was never resolved.
+        """
+        value = self.get(self.normalize(stock_name))
+
+        if value is MISSING:
+            return MISSING
+
+        return value or None
+
+    def store(self, stock_name: str, stock_symbol: str | None) -> None:
+        """
+        Stores the resolution of a stock name.
+
+        Args:
+            stock_name (str): The stock name (or name prefix) that was resolved.
+            stock_symbol (str or None): The ticker found, or None if the lookup had no results.
+
+        Returns:
+            None
+        """
+        ttl = self.ttl if stock_symbol else self.negative_ttl
+        self.set(self.normalize(stock_name), stock_symbol, ttl=ttl)
+
+    def export(self, fp) -> int:
+        """
+        Writes the valid entries of the cache as JSON.
+
+        Args:
+            fp: A text file object to write to.
+
+        Returns:
+            int: The number of exported entries.
+        """
+        entries = [
+            {"name": key, "symbol": value, "expires_at": expires_at}
+            for key, value, expires_at in self.items()
+        ]
+        json.dump(entries, fp, indent=2)
+
+        return len(entries)
+
+    def import_(self, fp) -> int:
+        """
+        Loads entries previously written by `export`.
+
+        Args:
+            fp: A text file object to read from.
+
+        Returns:
+            int: The number of imported entries.
+        """
+        entries = json.load(fp)
+
+        for entry in entries:
+            expires_at = entry.get("expires_at")
+
+            if expires_at is None:
+                self.store(entry["name"], entry.get("symbol"))
+            else:
+                self.set(self.normalize(entry["name"]), entry.get("symbol"), expires_at=expires_at)
+
+        return len(entries)
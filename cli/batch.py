@@ -0,0 +1,125 @@
+import argparse
+import json
+import sys
+
+from abstract import profiler
+from models.brokerage_batch import BrokerageBatch
+from pipeline.batch import collect_paths, run_batch
+
+def main(argv: list) -> int:
+    """
+    Extracts many brokerage notes in parallel.
+
+    Usage: python main.py batch <broker|auto> <source>... [--workers N] [--chunksize N] [--password P]... [--format json|ndjson|csv] [--no-cache] [--profile]
+                                [--timeout S] [--max-memory MB] [--max-pages N] [--max-files-per-worker N]
+    """
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Extract many brokerage notes in parallel.")
+    parser.add_argument("broker", help="The broker of the notes (rico or nuinvest), or 'auto' to detect it per file")
+    parser.add_argument("sources", nargs="+", help="PDF files, directories, glob patterns or @manifest files")
+    parser.add_argument(
+        "--password", action="append",
+        help="Password of the PDF files, may be repeated. Each file is opened with the first one that works"
+    )
+    parser.add_argument("--workers", type=int, help="Number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--chunksize", type=int, default=1, help="Number of files sent to a worker at a time")
+    parser.add_argument(
+        "--format", 
+        choices=["json", "ndjson", "csv"], 
+        default="json", 
+        help=(
+            "'json' prints a list of per-file results at the end, 'ndjson' streams one record per line, "
+            "'csv' prints every brokerage as a CSV row at the end and the errors to stderr"
+        )
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse or store results of previously extracted files")
+    parser.add_argument("--profile", action="store_true", help="Write per-stage timings and counters summed over every file as JSON to stderr")
+    parser.add_argument("--timeout", type=float, help="Kill the extraction of a file after this many seconds, reporting an ExtractionTimeoutError")
+    parser.add_argument("--max-memory", type=int, metavar="MB", help="Address space limit of each worker, reporting an ExtractionMemoryError past it")
+    parser.add_argument("--max-pages", type=int, help="Fail files with more pages than this with a PDFTooManyPagesError, before reading them")
+    parser.add_argument("--max-files-per-worker", type=int, metavar="N", help="Replace each worker after it extracted this many files")
+
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    for option in ("timeout", "max_memory", "max_pages", "max_files_per_worker"):
+        if getattr(args, option) is not None and getattr(args, option) <= 0:
+            parser.error(f"--{option.replace('_', '-')} must be positive")
+
+    limits = None
+
+    if any(value is not None for value in (args.timeout, args.max_memory, args.max_pages, args.max_files_per_worker)):
+        from pipeline.supervisor import Limits
+
+        # Files are timed one at a time, so chunks do not apply
+        memory = args.max_memory * 1024 * 1024 if args.max_memory is not None else None
+        limits = Limits(args.timeout, memory, args.max_pages, args.max_files_per_worker)
+
+    paths = collect_paths(args.sources)
+    results = run_batch(args.broker, paths, args.password, args.workers, args.chunksize, not args.no_cache, args.profile, limits)
+
+    if not args.profile:
+        return _write_results(results, args.format)
+
+    totals = profiler.Profiler()
+    hook = lambda source, stats: totals.merge(stats)
+    profiler.add_hook(hook)
+
+    try:
+        return _write_results(results, args.format)
+    finally:
+        profiler.remove_hook(hook)
+        sys.stderr.write(json.dumps({"profile": totals.stats()}) + "\n")
+
+
+def _write_results(results, format: str) -> int:
+    """Writes the per-file results in the given format. Returns the exit code."""
+    if format == "ndjson":
+        failed = False
+
+        for result in results:
+            failed = _write_ndjson(result) or failed
+
+        return 1 if failed else 0
+
+    if format == "csv":
+        batch = BrokerageBatch(with_source=True)
+        failed = False
+
+        for result in results:
+            if "error" in result:
+                failed = True
+                sys.stderr.write(json.dumps({"source": result["path"], "error": result["error"]}) + "\n")
+                continue
+
+            for record in result["data"]:
+                batch.append_json(record, result["path"])
+
+        batch.to_csv(sys.stdout)
+
+        return 1 if failed else 0
+
+    results = list(results)
+    print(json.dumps(results))
+
+    return 1 if any("error" in result for result in results) else 0
+
+
+def _write_ndjson(result: dict) -> bool:
+    """Writes the records of a per-file result, one per line. Returns whether the file failed."""
+    source = result["path"]
+
+    if "error" in result:
+        lines = [json.dumps({"source": source, "error": result["error"]})]
+    else:
+        lines = [json.dumps({"source": source, **record}) for record in result["data"]]
+
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    return "error" in result
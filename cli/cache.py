@@ -0,0 +1,84 @@
+import argparse
+import json
+import sys
+
+from cache.page_cache import PageCache
+from cache.result_cache import ResultCache
+from cache.ticker_cache import TickerCache
+from resolvers.yahoo import YahooFinanceResolver
+
+def main(argv: list) -> int:
+    """
+    Manages the ticker resolution, extraction result and page caches.
+
+    Usage: python main.py cache <warm|export|import|stats|clear> [file]
+    """
+    parser = argparse.ArgumentParser(prog="main.py cache", description="Manage the ticker resolution, extraction result and page caches.")
+    parser.add_argument("--path", help="Ticker cache database path (defaults to the user cache directory)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    warm = subparsers.add_parser("warm", help="Resolve the stock names listed in a file, one per line")
+    warm.add_argument("file", help="File with stock names, or '-' for stdin")
+
+    export = subparsers.add_parser("export", help="Export the cache entries as JSON")
+    export.add_argument("file", nargs="?", default="-", help="Output file, or '-' for stdout")
+
+    import_ = subparsers.add_parser("import", help="Import cache entries from a JSON export")
+    import_.add_argument("file", help="File written by 'export', or '-' for stdin")
+
+    subparsers.add_parser("stats", help="Show cache statistics")
+
+    clear = subparsers.add_parser("clear", help="Remove every cache entry")
+    clear.add_argument("which", nargs="?", choices=["tickers", "results", "pages", "all"], default="all")
+
+    args = parser.parse_args(argv)
+    cache = TickerCache(path=args.path)
+
+    if args.command == "warm":
+        resolver = YahooFinanceResolver(cache)
+        names = _read_lines(args.file)
+        resolved = resolver.resolve_many(names)
+        failed = [name for name, stock_symbol in resolved.items() if not stock_symbol]
+
+        print(json.dumps({
+            "names": len(names),
+            "failed": failed,
+            "requests": resolver.requests_made,
+        }))
+    elif args.command == "export":
+        if args.file == "-":
+            cache.export(sys.stdout)
+        else:
+            with open(args.file, "w", encoding="utf-8") as fp:
+                cache.export(fp)
+    elif args.command == "import":
+        if args.file == "-":
+            count = cache.import_(sys.stdin)
+        else:
+            with open(args.file, encoding="utf-8") as fp:
+                count = cache.import_(fp)
+
+        print(json.dumps({"imported": count}))
+    elif args.command == "stats":
+        print(json.dumps({"tickers": cache.stats(), "results": ResultCache().stats(), "pages": PageCache().stats()}))
+    elif args.command == "clear":
+        if args.which in ("tickers", "all"):
+            cache.clear()
+
+        if args.which in ("results", "all"):
+            ResultCache().clear()
+
+        if args.which in ("pages", "all"):
+            PageCache().clear()
+
+    return 0
+
+
+def _read_lines(path: str) -> list:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as fp:
+            lines = fp.read().splitlines()
+
+    return [line.strip() for line in lines if line.strip()]
@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from pipeline.server import ExtractionServer
+
+def main(argv: list) -> int:
+    """
+    Runs the extraction server.
+
+    Usage: python main.py serve <address> [--workers N] [--timeout S] [--max-concurrency N] [--no-cache] [--profile]
+    """
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Run a long-lived extraction server.")
+    parser.add_argument("address", help="'unix:/path/to/socket' or 'host:port'")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-concurrency", type=int, help="Maximum requests extracted at once (defaults to twice the workers)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse or store results of previously extracted files")
+    parser.add_argument("--profile", action="store_true", help="Record per-stage timings and counters, served by the 'stats' method")
+
+    args = parser.parse_args(argv)
+    server = ExtractionServer(args.workers, args.timeout, args.max_concurrency, not args.no_cache, args.profile)
+
+    try:
+        asyncio.run(server.serve(args.address))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+    return 0
@@ -0,0 +1,49 @@
+import argparse
+import json
+import sys
+
+from extractors.registry import AUTO, EXTRACTORS
+from pipeline.watch import Watcher
+
+def main(argv: list) -> int:
+    """
+    Extracts the notes of a directory and keeps extracting the ones added or changed.
+
+    Usage: python main.py watch <directory> --output DIR [--broker B] [--password P]... [--workers N] [--interval S] [--poll] [--once] [--no-cache]
+    """
+    parser = argparse.ArgumentParser(prog="main.py watch", description="Extract new and changed notes of a directory into per-customer NDJSON files.")
+    parser.add_argument("directory", help="Directory of notes, with a subdirectory per customer")
+    parser.add_argument("--output", required=True, help="Directory of the <customer>.ndjson files and of the manifest")
+    parser.add_argument("--broker", default=AUTO, help="The broker of the notes, detected per file by default")
+    parser.add_argument(
+        "--password", action="append",
+        help="Password of the PDF files, may be repeated. Each file is opened with the first one that works"
+    )
+    parser.add_argument("--workers", type=int, help="Number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between rescans when inotify is not available")
+    parser.add_argument("--poll", action="store_true", help="Rescan periodically even if inotify is available")
+    parser.add_argument("--once", action="store_true", help="Sync the directory once and exit")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse or store results of previously extracted files")
+
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.broker != AUTO and args.broker not in EXTRACTORS:
+        parser.error(f"--broker must be '{AUTO}' or one of: {', '.join(EXTRACTORS)}")
+
+    watcher = Watcher(args.directory, args.output, args.broker, args.password, args.workers, not args.no_cache, args.interval)
+    report = lambda stats: (sys.stdout.write(json.dumps(stats) + "\n"), sys.stdout.flush())
+
+    if args.once:
+        stats = watcher.sync()
+        report(stats)
+        return 1 if stats["failed"] else 0
+
+    try:
+        watcher.watch(report, args.poll)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
@@ -1,48 +1,58 @@
 
 import re
 
+from abstract import profiler
 from abstract.extractor import Extractor
+from abstract.table import parse_decimal, parse_integer
 from models.brokerage import Brokerage
 
 class Nuinvest (Extractor):
     
-    def extract(self) -> list:
+    SECTION_MARKERS = ("MMeerrccaaddoo", "RReessuummoo")
+    
+    FEE_LABELS = {
+        "liquidacao": r"Taxa de liquidação",
+        "registro": r"Taxa de Registro",
+        "termo_opcoes": r"Taxa de Termo / Opções",
+        "ana": r"Taxa A.N.A",
+        "emolumentos": r"Emolumentos",
+        "corretagem": r"Corretagem",
+        "iss": r"ISS",
+        "outras": r"Outras",
+    }
+    
+    FEE_SECTION_MARKER = "RReessuummoo"
+    
+    DATE_LABEL = "Data Pregão"
+    
+    NOTE_ID_LABEL = "Número da nota"
+    
+    NOTE_ID_REGEX = r"\d{5,}"
+    
+    TABLE_MARKER = "MMeerrccaaddoo"
+    
+    FINGERPRINTS = ("MMeerrccaaddoo", "Nu Invest", "Número da nota")
+    
+    TABLE_COLUMNS = (
+        ("market", "Praça"),
+        ("operation", "C/V"),
+        ("market_type", "Tipo Mercado"),
+        ("code", "Código"),
+        ("title", "Especificação do Título"),
+        ("quantity", "Quantidade"),
+        ("price", "Preço / Ajuste"),
+        ("value", "Valor / Ajuste"),
+        ("side", "D/C"),
+    )
+    
+    def _extract_note(self) -> list:
         brokerages = self._get_brokerages()
         fee, ir = self._get_taxes()
         self._make_brokerage_apportionment(brokerages, fee, ir)
         
         return brokerages
     
-    def _get_auction_date(self) -> str | None:
-        """
-        Extracts the auction date from the given text.
-                    
-        Returns:
-            str or None: The extracted auction date in the format "dd/mm/yyyy", or None if no date is found.
-        """
-        # Combine the search for "Data pregão" and the date pattern in one regex
-        pattern = r"Data Pregão(.|\n)*?(\d{2}/\d{2}/\d{4})"
-        
-        # Search for the pattern in the entire text
-        match = re.search(pattern, self._text, re.DOTALL)
-        
-        # Return the date if found, otherwise return None
-        return match.group(2) if match else None
-
-
-    def _get_note_id(self) -> str | None:
-        """
-        Extracts the note ID from the given text.
-        
-        Returns:
-            str or None: The extracted note ID, or None if no ID is found.
-        """
-        pattern = r"Número da nota(.|\n)*?(\d{5,})"
-        match = re.search(pattern, self._text, re.DOTALL)
-        
-        return match.group(2) if match else None
-
-
+    @profiler.profiled("_get_brokerages")
     def _get_brokerages(self) -> list:
         """
         Extracts brokerage transactions from the given text.
@@ -61,20 +71,17 @@ class Nuinvest (Extractor):
         if not date:
             raise ValueError("Auction date not found in the provided text")
         
-        pattern = r"MMeerrccaaddoo(.|\n)*?RReessuummoo"
-        match = re.search(pattern, self._text, re.DOTALL)
+        # Parse the date once for the whole note instead of once per trade
+        date = Brokerage.parse_date(date)
         
-        if not match:
-            raise ValueError("No brokerage transactions found in the provided text")
-        
-        lines = match.group(0).split("\n")
-        
-        # Ignore first and last lines and table header
-        lines = lines[1:-1]
+        if self._table_rows is not None:
+            lines, parse = self._table_rows, self._extract_brokerage_note_from_cells
+        else:
+            lines, parse = self._get_trade_lines(), self._extract_brokerage_note_from_text
             
         # Look for the "Negócios realizados" section in the text
         for line in lines:
-            brokerage = self._extract_brokerage_note_from_text(line)
+            brokerage = parse(line)
             
             if not brokerage:
                 continue
@@ -83,21 +90,45 @@ class Nuinvest (Extractor):
             brokerage.__setattr__("note_id", note_id)
             brokerages.append(brokerage)
         
+        profiler.count("lines_parsed", len(brokerages))
+        profiler.count("lines_skipped", len(lines) - len(brokerages))
+        
         return brokerages
     
     
-    def _extract_brokerage_note_from_text(self, line: str) -> Brokerage | None:
+    @profiler.profiled("_extract_brokerage_note_from_cells")
+    def _extract_brokerage_note_from_cells(self, cells: dict) -> Brokerage | None:
+        """
+        Parses a row of the trades table read by columns.
         
-        def extract_deal_type(line: str) -> str | None:
-            """Extracts the deal type ('C' for buy, 'V' for sell) from the line."""
-            match = re.search(r"\bC\b|\bV\b", line)
-            return match.group(0) if match else None
+        Args:
+            cells (dict): Column name -> cell text, as in TABLE_COLUMNS.
+            
+        Returns:
+            Brokerage or None: The trade, or None if the row is not a trade.
+        """
+        if cells["operation"] not in ("C", "V") or cells["market_type"] not in ("VISTA", "FRACIONARIO"):
+            return None
+        
+        quantity = parse_integer(cells["quantity"])
+        price = parse_decimal(cells["price"])
         
-        def extract_transaction_type(line: str) -> str | None:
-            """Extracts the transaction type (e.g., 'FRACIONARIO', 'VISTA') from the line."""
-            match = re.search(r"\bFRACIONARIO\b|\bVISTA\b", line)
-            return match.group(0) if match else None
+        if quantity is None or price is None:
+            return None
+        
+        operation = Brokerage.OPERATION_BUY if cells["operation"] == "C" else Brokerage.OPERATION_SELL
         
+        return Brokerage(
+            stock_symbol=self._get_stock_symbol(cells["code"] or cells["title"]), 
+            quantity=quantity, 
+            price=price, 
+            operation=operation,
+            broker="nuinvest",
+        )
+    
+    
+    @profiler.profiled("_extract_brokerage_note_from_text")
+    def _extract_brokerage_note_from_text(self, line: str) -> Brokerage | None:
         data = line.split(" ")
             
         if len(data) < 4:
@@ -108,8 +139,10 @@ class Nuinvest (Extractor):
         price = data[-3].replace(",", ".")
         quantity = data[-4]
         
-        deal_type = extract_deal_type(line)
-        transaction_type = extract_transaction_type(line)
+        deal_type = self.DEAL_TYPE_PATTERN.search(line)
+        deal_type = deal_type.group(0) if deal_type else None
+        transaction_type = self.MARKET_TYPE_PATTERN.search(line)
+        transaction_type = transaction_type.group(0) if transaction_type else None
         
         if not transaction_type:
             # Skip if the transaction type is not found
@@ -141,6 +174,7 @@ class Nuinvest (Extractor):
         )
                         
                         
+    @profiler.profiled("_get_stock_symbol")
     def _get_stock_symbol(self, stock_name: str) -> str:
         """
         Extracts the stock code from the given stock name.
@@ -165,59 +199,5 @@ class Nuinvest (Extractor):
         # Raise an exception if no valid stock code is found after all attempts
         raise Exception("Stock code not found after trying all possibilities.")
     
-    def _get_taxes(self) -> list:
-        fee_patterns = [
-            r"Taxa de liquidação.*?(\d+,\d+)",
-            r"Taxa de Registro.*?(\d+,\d+)",
-            r"Taxa de Termo / Opções.*?(\d+,\d+)",
-            r"Taxa A.N.A.*?(\d+,\d+)",
-            r"Emolumentos.*?(\d+,\d+)",
-            r"Corretagem.*?(\d+,\d+)",
-            r"ISS.*?(\d+,\d+)",
-            r"Outras.*?(\d+,\d+)"
-        ]
-        
-        ir_pattern = r"I.R.R.F.*?(\d+,\d+)(?!.*\d+,\d+)"
-        
-        fee = []
-        for pattern in fee_patterns:
-            match = re.search(pattern, self._text, re.IGNORECASE)
-            if match:
-                fee.append(float(match.group(1).replace(",", ".")))
-        
-        ir_match = re.search(ir_pattern, self._text, re.IGNORECASE)
-        ir = float(ir_match.group(1).replace(",", ".")) if ir_match else 0.0
-        
-        fee = sum(fee)
-        
-        return [fee, ir]
-    
-    def _make_brokerage_apportionment(self, brokerages: list, fee: float, ir: float):
-        """
-        Splits the fee and IR among the brokerages.
-        
-        Args:
-            brokerages (list): A list of Brokerage objects.
-            fee (float): The total fee to split.
-            ir (float): The total IR to split.
-            
-        Returns:
-            None
-        """
-        total_amount, sold_amount = 0, 0
-        
-        for brokerage in brokerages:
-            total_amount += abs(brokerage.price * brokerage.quantity)
-            if brokerage.operation == Brokerage.OPERATION_SELL:
-                sold_amount += abs(brokerage.price * brokerage.quantity)
-                
-        for brokerage in brokerages:
-            brokerage.fee = round(fee * abs(brokerage.price * brokerage.quantity) / total_amount, 2) if total_amount else 0.0
-            
-            if brokerage.operation == Brokerage.OPERATION_SELL:
-                brokerage.ir = round(ir * abs(brokerage.price * brokerage.quantity) / sold_amount, 2) if sold_amount else 0.0
-        
-        return 
-
     def _get_deal_type(self, line: str) -> str | None:
         raise NotImplementedError
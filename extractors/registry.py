@@ -0,0 +1,109 @@
+import importlib
+import re
+
+from abstract import profiler
+from abstract.exceptions import PDFCorruptError
+from abstract.passwords import resolve_password
+from abstract.sources import as_source
+
+# Broker -> "module:class" of its extractor, or the class itself. Modules are imported on first use,
+# so a run only pays for the extractor it needs (e.g. Nuinvest notes never import the Yahoo Finance resolver).
+EXTRACTORS = {
+    "rico": "extractors.rico:Rico",
+    "nuinvest": "extractors.nuinvest:Nuinvest",
+}
+
+# Broker name that asks for the broker to be detected from the file, see `detect_broker`
+AUTO = "auto"
+
+def register_extractor(broker: str, extractor) -> None:
+    """
+    Registers the extractor of a broker, replacing any previous one.
+
+    Args:
+        broker (str): The broker name.
+        extractor (type or str): The Extractor subclass, or its "module:class" path to import it on first use.
+
+    Returns:
+        None
+    """
+    if broker == AUTO:
+        raise ValueError(f"'{AUTO}' is reserved for broker detection")
+
+    EXTRACTORS[broker] = extractor
+
+def get_extractor_class(broker: str):
+    """
+    Returns the extractor class of a broker, importing its module if needed.
+
+    Args:
+        broker (str): The broker name, a key of EXTRACTORS.
+
+    Returns:
+        type: The Extractor subclass.
+    """
+    if broker not in EXTRACTORS:
+        raise ValueError("Broker not supported")
+
+    extractor = EXTRACTORS[broker]
+
+    if not isinstance(extractor, str):
+        return extractor
+
+    module, _, name = extractor.partition(":")
+
+    return getattr(importlib.import_module(module), name)
+
+@profiler.profiled("detect_broker")
+def detect_broker(path, password: str | None = None) -> str:
+    """
+    Detects the broker of a note from the FINGERPRINTS of the registered extractors.
+
+    Only the characters of the first page are read, without layout analysis, so a file is
+    routed for a fraction of the cost of its extraction.
+
+    Args:
+        path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+        password (optional): The password of the PDF file, or its candidate passwords.
+
+    Returns:
+        str: The broker whose extractor matches the most fingerprints.
+    """
+    source = as_source(path)
+    text = _read_first_page(source, resolve_password(source, password))
+    scores = {broker: get_extractor_class(broker).fingerprint_score(text) for broker in EXTRACTORS}
+    best = max(scores.values(), default=0)
+    brokers = [broker for broker, score in scores.items() if score == best]
+
+    if best == 0:
+        raise ValueError("Broker not detected, pass it explicitly")
+
+    if len(brokers) > 1:
+        raise ValueError(f"Broker not detected, the note matches {', '.join(brokers)}")
+
+    return brokers[0]
+
+def resolve_broker(broker: str, path, password: str | None = None) -> str:
+    """Returns the broker, detecting it from the file when it is AUTO."""
+    return detect_broker(path, password) if broker == AUTO else broker
+
+def _read_first_page(path, password: str | None) -> str:
+    """Returns the characters of the first page of a PDF file, without whitespace."""
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+
+    from abstract.table import read_glyphs
+
+    try:
+        with as_source(path).open() as fp:
+            document = PDFDocument(PDFParser(fp), password or "")
+            page = next(PDFPage.create_pages(document), None)
+            glyphs = read_glyphs(PDFResourceManager(), page) if page is not None else None
+    except (OSError, MemoryError):
+        raise
+    except Exception as e:
+        raise PDFCorruptError("Error reading the PDF, the file is damaged or not a PDF.") from e
+
+    return re.sub(r"\s+", "", glyphs.text()) if glyphs is not None else ""
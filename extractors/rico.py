@@ -1,13 +1,68 @@
-
-import requests
-import re
-
+from abstract import profiler
 from abstract.extractor import Extractor
+from abstract.table import parse_decimal, parse_integer
+from cache.page_cache import PageCache
 from models.brokerage import Brokerage
+from resolvers.ticker_index import TickerIndex, default_index
+from resolvers.yahoo import YahooFinanceResolver, default_resolver
 
 class Rico (Extractor):
     
-    def extract(self) -> list:
+    SECTION_MARKERS = ("Negócios realizados", "Resumo dos Negócios")
+    
+    FEE_LABELS = {
+        "liquidacao": r"Taxa de liquidação",
+        "registro": r"Taxa de Registro",
+        "termo_opcoes": r"Taxa de termo/opções",
+        "ana": r"Taxa A.N.A",
+        "emolumentos": r"Emolumentos",
+        "operacional": r"Taxa Operacional",
+        "execucao": r"Execução",
+        "custodia": r"Taxa de Custódia",
+        "impostos": r"Impostos",
+        "outros": r"Outros",
+    }
+    
+    FEE_SECTION_MARKER = "Resumo dos Negócios"
+    
+    DATE_LABEL = "Data pregão"
+    
+    NOTE_ID_LABEL = "Nr. nota"
+    
+    TABLE_MARKER = "Negócios realizados"
+    
+    TABLE_HEADER_LINES = 1
+    
+    FINGERPRINTS = ("Negócios realizados", "Rico Investimentos", "Nr. nota")
+    
+    TABLE_COLUMNS = (
+        ("q", "Q"),
+        ("market", "Negociação"),
+        ("operation", "C/V"),
+        ("market_type", "Tipo mercado"),
+        ("term", "Prazo"),
+        ("title", "Especificação do título"),
+        ("notes", "Obs. (*)"),
+        ("quantity", "Quantidade"),
+        ("price", "Preço / Ajuste"),
+        ("value", "Valor Operação / Ajuste"),
+        ("side", "D/C"),
+    )
+    
+    def __init__(
+            self, 
+            path, 
+            password=None, 
+            resolver: YahooFinanceResolver | None = None, 
+            ticker_index: TickerIndex | None = None,
+            backend: str | None = None,
+            page_cache: PageCache | None = None
+        ) -> None:
+        super().__init__(path, password, backend, page_cache)
+        self._resolver = resolver or default_resolver()
+        self._ticker_index = ticker_index or default_index()
+    
+    def _extract_note(self) -> list:
         brokerages = self._get_brokerages()
         fee, ir = self._get_taxes()
         self._make_brokerage_apportionment(brokerages, fee, ir)
@@ -15,36 +70,7 @@ class Rico (Extractor):
         return brokerages
     
     
-    def _get_auction_date(self) -> str | None:
-        """
-        Extracts the auction date from the given text.
-                    
-        Returns:
-            str or None: The extracted auction date in the format "dd/mm/yyyy", or None if no date is found.
-        """
-        # Combine the search for "Data pregão" and the date pattern in one regex
-        pattern = r"Data pregão.*?(\d{2}/\d{2}/\d{4})"
-        
-        # Search for the pattern in the entire text
-        match = re.search(pattern, self._text, re.DOTALL)
-        
-        # Return the date if found, otherwise return None
-        return match.group(1) if match else None
-    
-    
-    def _get_note_id(self) -> str | None:
-        """
-        Extracts the note ID from the given text.
-        
-        Returns:
-            str or None: The extracted note ID, or None if no ID is found.
-        """
-        pattern = r"Nr\. nota(.|\n)*?(\d+)"
-        match = re.search(pattern, self._text, re.DOTALL)
-        
-        return match.group(2) if match else None
-
-
+    @profiler.profiled("_get_brokerages")
     def _get_brokerages(self) -> list:
         """
         Extracts brokerage transactions from the given text.
@@ -63,43 +89,84 @@ class Rico (Extractor):
         if not date:
             raise ValueError("Auction date not found in the provided text")
         
-        pattern = r"Negócios realizados.*?Resumo dos Negócios"
-        match = re.search(pattern, self._text, re.DOTALL)
-        
-        if not match:
-            raise ValueError("No brokerage transactions found in the provided text")
-        
-        lines = match.group(0).split("\n")
+        # Parse the date once for the whole note instead of once per trade
+        date = Brokerage.parse_date(date)
         
-        # Ignore first and last lines and table header
-        lines = lines[2:-1]
+        if self._table_rows is not None:
+            lines, parse = self._table_rows, self._extract_brokerage_note_from_cells
+        else:
+            lines, parse = self._get_trade_lines(), self._extract_brokerage_note_from_text
+            
+        stock_names = []
             
         # Look for the "Negócios realizados" section in the text
         for line in lines:
-            brokerage = self._extract_brokerage_note_from_text(line)
+            trade = parse(line)
             
-            if not brokerage:
+            if not trade:
                 continue
             
+            stock_name, brokerage = trade
             brokerage.__setattr__("date", date)
             brokerage.__setattr__("note_id", note_id)
             brokerages.append(brokerage)
+            stock_names.append(stock_name)
+        
+        profiler.count("lines_parsed", len(brokerages))
+        profiler.count("lines_skipped", len(lines) - len(brokerages))
+        
+        # Resolve each distinct name once, then fan the symbols back to the trades
+        stock_symbols = self._get_stock_symbols(stock_names)
+        
+        for stock_name, brokerage in zip(stock_names, brokerages):
+            brokerage.stock_symbol = stock_symbols[stock_name]
         
         return brokerages
     
     
-    def _extract_brokerage_note_from_text(self, line: str) -> Brokerage | None:
+    @profiler.profiled("_extract_brokerage_note_from_cells")
+    def _extract_brokerage_note_from_cells(self, cells: dict) -> tuple | None:
+        """
+        Parses a row of the "Negócios realizados" table read by columns.
+        
+        Args:
+            cells (dict): Column name -> cell text, as in TABLE_COLUMNS.
+            
+        Returns:
+            tuple or None: (stock_name, Brokerage), or None if the row is not a trade.
+        """
+        if cells["operation"] not in ("C", "V") or cells["market_type"] not in ("VISTA", "FRACIONARIO"):
+            return None
+        
+        quantity = parse_integer(cells["quantity"])
+        price = parse_decimal(cells["price"])
         
-        def extract_deal_type(line: str) -> str | None:
-            """Extracts the deal type ('C' for buy, 'V' for sell) from the line."""
-            match = re.search(r"\bC\b|\bV\b", line)
-            return match.group(0) if match else None
+        if quantity is None or price is None:
+            return None
+        
+        operation = Brokerage.OPERATION_BUY if cells["operation"] == "C" else Brokerage.OPERATION_SELL
+        
+        return cells["title"].replace("#", "").strip(), Brokerage(
+            quantity=quantity, 
+            price=price, 
+            operation=operation,
+            broker="rico"
+        )
+    
+    
+    @profiler.profiled("_extract_brokerage_note_from_text")
+    def _extract_brokerage_note_from_text(self, line: str) -> tuple | None:
+        """
+        Parses a trade line of the "Negócios realizados" table.
         
-        def extract_transaction_type(line: str) -> str | None:
-            """Extracts the transaction type (e.g., 'FRACIONARIO', 'VISTA') from the line."""
-            match = re.search(r"\bFRACIONARIO\b|\bVISTA\b", line)
-            return match.group(0) if match else None
+        The stock symbol is left unset, so the names of the whole note can be resolved together.
         
+        Args:
+            line (str): The table line.
+            
+        Returns:
+            tuple or None: (stock_name, Brokerage), or None if the line is not a trade.
+        """
         data = line.split(" ")
             
         if len(data) < 4:
@@ -110,8 +177,10 @@ class Rico (Extractor):
         price = data[-3].replace(",", ".")
         quantity = data[-4]
         
-        deal_type = extract_deal_type(line)
-        transaction_type = extract_transaction_type(line)
+        deal_type = self.DEAL_TYPE_PATTERN.search(line)
+        deal_type = deal_type.group(0) if deal_type else None
+        transaction_type = self.MARKET_TYPE_PATTERN.search(line)
+        transaction_type = transaction_type.group(0) if transaction_type else None
         
         if not transaction_type:
             # Skip if the transaction type is not found
@@ -122,8 +191,6 @@ class Rico (Extractor):
         stock_name_end = line.index(str(quantity)) - 1
         stock_name = line[stock_name_start:stock_name_end].replace("#", "").strip()
         
-        stock_symbol = self._get_stock_symbol(stock_name)
-        
         try:
             price = float(price)
             quantity = int(quantity)
@@ -134,8 +201,7 @@ class Rico (Extractor):
         operation = Brokerage.OPERATION_BUY if deal_type == "C" else Brokerage.OPERATION_SELL
         
         # Append the brokerage information
-        return Brokerage(
-            stock_symbol=stock_symbol, 
+        return stock_name, Brokerage(
             quantity=quantity, 
             price=price, 
             operation=operation,
@@ -143,108 +209,46 @@ class Rico (Extractor):
         )
                         
                         
-    def _get_stock_symbol(self, stock_name: str) -> str:
+    @profiler.profiled("_get_stock_symbols")
+    def _get_stock_symbols(self, stock_names: list) -> dict:
         """
-        Fetches the stock code for the given stock name from Yahoo Finance.
+        Looks up the stock codes of many stock names.
+        
+        Names missing from the bundled B3 index are deduplicated and resolved concurrently.
         
         Args:
-            stock_name (str): The name of the stock.
+            stock_names (list): The names of the stocks.
             
         Returns:
-            str: The stock code, or raises an exception if not found.
+            dict: Stock name -> stock code, or raises an exception if a name is not found.
         """
+        stock_symbols = {}
+        missing = []
         
-        def fetch_stock_data(query: str) -> dict:
-            """Helper function to make the API request to Yahoo Finance."""
-            url = "https://query2.finance.yahoo.com/v1/finance/search"
-            user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
-            params = {"q": query, "quotes_count": 1, "country": "Brazil"}
-            
-            response = requests.get(url=url, params=params, headers={'User-Agent': user_agent})
-            if response.status_code != 200:
-                raise Exception(f"Failed to fetch stock data for query '{query}' (HTTP {response.status_code})")
+        for stock_name in dict.fromkeys(stock_names):
+            stock_symbol = self._ticker_index.lookup(stock_name)
             
-            return response.json()
-
-        stock_name = stock_name.strip()
+            if stock_symbol:
+                stock_symbols[stock_name] = stock_symbol
+            else:
+                missing.append(stock_name)
+        
+        profiler.count("ticker_index_hits", len(stock_symbols))
         
-        # Retry search with progressively shorter names if no results found
-        while stock_name:
-            data = fetch_stock_data(stock_name)
+        if missing:
+            profiler.count("resolver_calls", len(missing))
+            resolved = self._resolver.resolve_many(missing)
             
-            if data.get('quotes'):
-                company_code = data['quotes'][0]['symbol'].split(".")[0]
+            for stock_name in missing:
+                stock_symbol = resolved.get(stock_name.strip())
                 
-                # Remove trailing 'F' if present
-                if company_code.endswith('F'):
-                    company_code = company_code[:-1]
+                if not stock_symbol:
+                    raise Exception("Stock code not found after trying all possibilities.")
                 
-                return company_code
-            
-            # If no results, remove the last word from the stock_name
-            stock_name = " ".join(stock_name.split(" ")[:-1])
-
-        # Raise an exception if no valid stock code is found after all attempts
-        raise Exception("Stock code not found after trying all possibilities.")
-    
-    
-    def _get_taxes(self) -> list:
-        fee_patterns = [
-            r"Taxa de liquidação.*?(\d+,\d+)",
-            r"Taxa de Registro.*?(\d+,\d+)",
-            r"Taxa de termo/opções.*?(\d+,\d+)",
-            r"Taxa A.N.A.*?(\d+,\d+)",
-            r"Emolumentos.*?(\d+,\d+)",
-            r"Taxa Operacional.*?(\d+,\d+)",
-            r"Execução.*?(\d+,\d+)",
-            r"Taxa de Custódia.*?(\d+,\d+)",
-            r"Impostos.*?(\d+,\d+)",
-            r"Outros.*?(\d+,\d+)"
-        ]
-        
-        ir_pattern = r"I.R.R.F.*?(\d+,\d+)(?!.*\d+,\d+)"
+                stock_symbols[stock_name] = stock_symbol
         
-        fee = []
-        for pattern in fee_patterns:
-            match = re.search(pattern, self._text, re.IGNORECASE)
-            if match:
-                fee.append(float(match.group(1).replace(",", ".")))
-        
-        ir_match = re.search(ir_pattern, self._text, re.IGNORECASE)
-        ir = float(ir_match.group(1).replace(",", ".")) if ir_match else 0.0
-        
-        fee = sum(fee)
-        
-        return [fee, ir]
+        return stock_symbols
     
     
-    def _make_brokerage_apportionment(self, brokerages: list, fee: float, ir: float):
-        """
-        Splits the fee and IR among the brokerages.
-        
-        Args:
-            brokerages (list): A list of Brokerage objects.
-            fee (float): The total fee to split.
-            ir (float): The total IR to split.
-            
-        Returns:
-            None
-        """
-        total_amount, sold_amount = 0, 0
-        
-        for brokerage in brokerages:
-            total_amount += abs(brokerage.price * brokerage.quantity)
-            if brokerage.operation == Brokerage.OPERATION_SELL:
-                sold_amount += abs(brokerage.price * brokerage.quantity)
-                
-        for brokerage in brokerages:
-            brokerage.fee = round(fee * abs(brokerage.price * brokerage.quantity) / total_amount, 2) if total_amount else 0.0
-            
-            if brokerage.operation == Brokerage.OPERATION_SELL:
-                brokerage.ir = round(ir * abs(brokerage.price * brokerage.quantity) / sold_amount, 2) if sold_amount else 0.0
-        
-        return 
-
-
     def _get_deal_type(self, line: str) -> str | None:
         raise NotImplementedError
@@ -1,40 +1,181 @@
-from extractors.nuinvest import Nuinvest
-from extractors.rico import Rico
+from abstract import profiler
+from abstract.sources import as_source
+from cache.page_cache import PageCache, default_page_cache
+from cache.result_cache import ResultCache, default_result_cache
+from extractors.registry import AUTO, get_extractor_class, resolve_broker
+from models.brokerage import Brokerage
+import argparse
+import contextlib
 import json
+import os
 import sys
 
-def get_brokerages_data(broker: str, path: str, password: str | None = None) -> list:
-    if broker == "rico":
-        rico = Rico(path, password)
-        data = rico.extract()
-    elif broker == "nuinvest":
-        nuinvest = Nuinvest(path, password)
-        data = nuinvest.extract()
-    else:
-        raise ValueError("Broker not supported")
+# Path argument reading the PDF from stdin
+STDIN = "-"
+
+def get_extractor(broker: str, path, password=None, page_cache: PageCache | None = None):
+    path = as_source(path)
+    
+    return get_extractor_class(resolve_broker(broker, path, password))(path, password, page_cache=page_cache)
+
+def get_brokerages_data(
+        broker: str, 
+        path, 
+        password=None, 
+        cache: ResultCache | None = None
+    ) -> list:
+    path = as_source(path)
+    
+    if cache is None:
+        return get_extractor(broker, path, password).extract()
+    
+    if broker == AUTO:
+        # Looked up by content hash too, so a file extracted before is answered without opening it
+        detected = cache.get_broker(path.digest())
+        
+        if detected is None:
+            detected = resolve_broker(broker, path, password)
+            cache.set_broker(path.digest(), detected)
+        
+        broker = detected
+    
+    key = cache.make_key(broker, get_extractor_class(broker).VERSION, path.digest())
+    records = cache.get_result(key)
+    
+    if records is not None:
+        profiler.count("result_cache_hits")
+        return [Brokerage.from_json(record) for record in records]
+    
+    profiler.count("result_cache_misses")
+    # A miss after a VERSION bump still finds the pages of the file, so only the parsing runs again
+    data = get_extractor(broker, path, password, default_page_cache()).extract()
+    cache.set_result(key, [brokerage.__json__() for brokerage in data])
     
     return data
 
+def iter_brokerages_data(
+        broker: str, 
+        path, 
+        password=None, 
+        cache: ResultCache | None = None
+    ):
+    if cache is not None:
+        # Cached results are stored per file, so there is nothing to stream lazily
+        yield from get_brokerages_data(broker, path, password, cache)
+        return
+    
+    yield from get_extractor(broker, path, password).iter_extract()
+
+def request_brokerages_data(address: str, broker: str, path: str, password=None, use_cache: bool = True) -> list:
+    from pipeline.server import call
+    
+    params = {"broker": broker, "password": password, "cache": use_cache}
+    
+    if path == STDIN:
+        import base64
+        
+        params["content"] = base64.b64encode(sys.stdin.buffer.read()).decode("ascii")
+    else:
+        params["path"] = os.path.abspath(path)
+    
+    return [Brokerage.from_json(record) for record in call(address, "extract", params)]
+
+def open_source(path: str):
+    return as_source(sys.stdin.buffer, "<stdin>") if path == STDIN else as_source(path)
+
+def write_ndjson(record: dict) -> None:
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "cache":
+        from cli.cache import main as cache_main
+        sys.exit(cache_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from cli.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from cli.serve import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        from cli.watch import main as watch_main
+        sys.exit(watch_main(sys.argv[2:]))
+
     if len(sys.argv) < 3:
-        print("Usage: python main.py <broker> <path_to_pdf> [password]")
+        print("Usage: python main.py <broker|auto> <path_to_pdf|-> [password] [--password P]... [--ndjson] [--no-cache] [--server ADDRESS] [--profile [FILE]]")
+        print("       python main.py batch <broker|auto> <source>... [--workers N] [--chunksize N] [--password P]... [--format json|ndjson|csv] [--no-cache] [--profile] [--timeout S] [--max-memory MB] [--max-pages N] [--max-files-per-worker N]")
+        print("       python main.py serve <address> [--workers N] [--timeout S] [--max-concurrency N] [--no-cache] [--profile]")
+        print("       python main.py watch <directory> --output DIR [--broker B] [--password P]... [--workers N] [--interval S] [--poll] [--once] [--no-cache]")
+        print("       python main.py cache <warm|export|import|stats|clear> [file]")
         sys.exit(1)
 
-    broker = sys.argv[1]
-    path = sys.argv[2]
-    password = sys.argv[3] if len(sys.argv) == 4 else None
-    
+    parser = argparse.ArgumentParser(prog="main.py")
+    parser.add_argument("broker", help="The broker of the note (rico or nuinvest), or 'auto' to detect it from the first page")
+    parser.add_argument("path", help=f"The PDF file, or '{STDIN}' to read it from stdin")
+    parser.add_argument("password", nargs="?")
+    parser.add_argument(
+        "--password", dest="passwords", action="append", default=[], metavar="P",
+        help="Another candidate password, may be repeated. The first one that opens the file is used"
+    )
+    parser.add_argument("--ndjson", action="store_true", help="Write one JSON record per line as they are extracted")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse or store results of previously extracted files")
+    parser.add_argument("--server", metavar="ADDRESS", help="Send the file to a running 'main.py serve' instead of extracting it here")
+    parser.add_argument(
+        "--profile", nargs="?", const="", metavar="FILE",
+        help="Write per-stage timings and counters as JSON to stderr, and a cProfile dump to FILE if given"
+    )
+    args = parser.parse_args()
+
+    broker = args.broker
+    path = args.path
+    password = [args.password, *args.passwords] if args.password else args.passwords or None
+    cache = None if args.no_cache else default_result_cache()
+
+    profiling = contextlib.ExitStack()
+
+    if args.profile is not None:
+        note_profiler = profiling.enter_context(profiler.profile())
+
+        if args.profile:
+            import cProfile
+
+            # Callbacks run in reverse order, so the profile is disabled before it is dumped
+            code_profiler = cProfile.Profile()
+            profiling.callback(code_profiler.dump_stats, args.profile)
+            profiling.callback(code_profiler.disable)
+            code_profiler.enable()
+
+        profiling.callback(lambda: sys.stderr.write(json.dumps({"profile": note_profiler.stats()}) + "\n"))
+
     try:
-        data = get_brokerages_data(broker, path, password)
+        with profiling:
+            if args.server:
+                brokerages = request_brokerages_data(args.server, broker, path, password, not args.no_cache)
+            elif args.ndjson:
+                brokerages = iter_brokerages_data(broker, open_source(path), password, cache)
+            else:
+                brokerages = get_brokerages_data(broker, open_source(path), password, cache)
+
+            if args.ndjson:
+                for brokerage in brokerages:
+                    write_ndjson({"source": path, **brokerage.__json__()})
     except Exception as e:
         error_data = {
             "error": {
                 "message": "An error occurred while extracting the data.",
-                "exception": str(e)
-            }    
+                "exception": str(e),
+                # Errors answered by a server of a type unknown here keep the name of that type
+                "type": getattr(e, "remote_type", None) or type(e).__name__
+            }
         }
+        if args.ndjson:
+            error_data["source"] = path
         print(json.dumps(error_data))
         sys.exit(1)
-    
-    data_json = [brokerage.__json__() for brokerage in data]
-    print(json.dumps(data_json))
\ No newline at end of file
+
+    if not args.ndjson:
+        data_json = [brokerage.__json__() for brokerage in brokerages]
+        print(json.dumps(data_json))
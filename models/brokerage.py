@@ -1,6 +1,27 @@
 import datetime
+import functools
 
 class Brokerage:
+    """
+    A trade of a brokerage note.
+    
+    Fields are plain slotted attributes. Their values are validated where brokerages come in,
+    by the constructor and `from_json`, and not on every assignment, as the extractors assign
+    the date, note, symbol and fees of each trade after building it.
+    """
+    
+    # Slots avoid a per-instance __dict__, as a batch run may hold millions of trades
+    __slots__ = (
+        "date",
+        "stock_symbol",
+        "quantity",
+        "price",
+        "operation",
+        "fee",
+        "ir",
+        "broker",
+        "note_id",
+    )
     
     OPERATION_BUY = "buy"
     OPERATION_SELL = "sell"
@@ -21,118 +42,77 @@ class Brokerage:
             broker: str|None = None,
             note_id: str|None = None
         ) -> None:
-        if date:
-            self.__setattr__("date", date)
-        self._stock_symbol = stock_symbol or None
-        self._quantity = quantity or None
-        self._price = price or None
-        self._operation = operation or None
-        self._fee = fee or None
-        self._ir = ir or None
-        self._broker = broker or None
-        self._note_id = note_id or None
-        
-    @property
-    def date(self) -> datetime.date|None:
-        return self._date
-    
-    @date.setter
-    def date(self, date) -> None:
-        if isinstance(date, str):
-            date = datetime.datetime.strptime(date, "%d/%m/%Y").date()
+        """
+        Builds a brokerage, validating the values given.
         
-        if not isinstance(date, datetime.date):
+        Raises:
+            TypeError: If a value has the wrong type.
+            ValueError: If the date string is not "dd/mm/yyyy" or the operation is unknown.
+        """
+        if isinstance(date, str):
+            date = self.parse_date(date)
+        
+        self.date = date or None
+        self.stock_symbol = stock_symbol or None
+        self.quantity = quantity or None
+        self.price = price or None
+        self.operation = operation or None
+        self.fee = fee or None
+        self.ir = ir or None
+        self.broker = broker or None
+        self.note_id = note_id or None
+        self.validate()
+    
+    def validate(self) -> None:
+        """
+        Checks the types of the fields that are set.
+        
+        Raises:
+            TypeError: If a field has the wrong type.
+            ValueError: If the operation is unknown.
+        """
+        if self.date is not None and not isinstance(self.date, datetime.date):
             raise TypeError("Date must be a datetime.date object")
         
-        self._date = date
-        
-    @property
-    def stock_symbol(self) -> str|None:
-        return self._stock_symbol
-    
-    @stock_symbol.setter
-    def stock_symbol(self, stock_symbol) -> None:
-        if not isinstance(stock_symbol, str):
+        if self.stock_symbol is not None and not isinstance(self.stock_symbol, str):
             raise TypeError("Stock code must be a string")
         
-        self._stock_symbol = stock_symbol
-    
-    @property
-    def quantity(self) -> int|None:
-        return self._quantity
-    
-    @quantity.setter
-    def quantity(self, quantity) -> None:
-        if not isinstance(quantity, int):
+        if self.quantity is not None and not isinstance(self.quantity, int):
             raise TypeError("Quantity must be an integer")
         
-        self._quantity = quantity
-        
-    @property
-    def price(self) -> float|None:
-        return self._price
-    
-    @price.setter
-    def price(self, price) -> None:
-        if not isinstance(price, float):
+        if self.price is not None and not isinstance(self.price, float):
             raise TypeError("Price must be a float")
         
-        self._price = price
-        
-    @property
-    def operation(self) -> str|None:
-        return self._operation
-    
-    @operation.setter
-    def operation(self, operation) -> None:
-        if not operation in self.OPERATIONS:
+        if self.operation is not None and self.operation not in self.OPERATIONS:
             raise ValueError(f"Operation must be one of {self.OPERATIONS}")
         
-        self._operation = operation
-        
-    @property
-    def fee(self) -> float|None:
-        return self._fee
-    
-    @fee.setter
-    def fee(self, fee) -> None:
-        if not isinstance(fee, float):
+        if self.fee is not None and not isinstance(self.fee, float):
             raise TypeError("fee must be a float")
         
-        self._fee = fee
-        
-    @property
-    def ir(self) -> float|None:
-        return self._ir
-    
-    @ir.setter
-    def ir(self, ir) -> None:
-        if not isinstance(ir, float):
+        if self.ir is not None and not isinstance(self.ir, float):
             raise TypeError("IR must be a float")
         
-        self._ir = ir
-        
-    @property
-    def broker(self) -> str|None:
-        return self._broker
-    
-    @broker.setter
-    def broker(self, broker) -> None:
-        if not isinstance(broker, str):
+        if self.broker is not None and not isinstance(self.broker, str):
             raise TypeError("Broker must be a string")
         
-        self._broker = broker
-        
-    @property
-    def note_id(self) -> str|None:
-        return self._note_id
-    
-    @note_id.setter
-    def note_id(self, note_id) -> None:
-        if not isinstance(note_id, str):
+        if self.note_id is not None and not isinstance(self.note_id, str):
             raise TypeError("Note ID must be a string")
-        
-        self._note_id = note_id
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def parse_date(date: str) -> datetime.date:
+        """
+        Parses a date in the "dd/mm/yyyy" format printed on brokerage notes.
+        
+        Every trade of a note shares the same date, so parsed dates are memoized.
+        
+        Args:
+            date (str): The date string.
+            
+        Returns:
+            datetime.date: The parsed date.
+        """
+        return datetime.datetime.strptime(date, "%d/%m/%Y").date()
         
     def __json__(self):
         return {
@@ -147,5 +127,35 @@ class Brokerage:
             "note_id": self.note_id
         }
         
+    @classmethod
+    def from_json(cls, data: dict) -> "Brokerage":
+        """
+        Builds a Brokerage from the dict returned by `__json__`.
+        
+        Args:
+            data (dict): The serialized brokerage.
+            
+        Returns:
+            Brokerage: The rebuilt brokerage.
+            
+        Raises:
+            TypeError: If a field has the wrong type.
+            ValueError: If the operation is unknown.
+        """
+        # Assign the fields directly, as the constructor turns falsy values such as a 0.0 fee into None
+        brokerage = cls.__new__(cls)
+        brokerage.date = datetime.date.fromisoformat(data["date"]) if data.get("date") else None
+        brokerage.stock_symbol = data.get("stock_symbol")
+        brokerage.quantity = data.get("quantity")
+        brokerage.price = data.get("price")
+        brokerage.operation = data.get("operation")
+        brokerage.fee = data.get("fee")
+        brokerage.ir = data.get("ir")
+        brokerage.broker = data.get("broker")
+        brokerage.note_id = data.get("note_id")
+        brokerage.validate()
+        
+        return brokerage
+        
     def __str__(self) -> str:
         return f"Brokerage(date={self.date}, stock_symbol={self.stock_symbol}, quantity={self.quantity}, price={self.price}, operation={self.operation}, fee={self.fee}, ir={self.ir}, broker={self.broker}), note_id={self.note_id}"
\ No newline at end of file
@@ -0,0 +1,235 @@
+import csv
+import datetime
+import json
+import math
+import sys
+from array import array
+
+from models.brokerage import Brokerage
+
+class BrokerageBatch:
+    """
+    Columnar container for the brokerages of a whole run.
+
+    Numeric fields are kept in typed arrays and text fields in lists of interned strings,
+    so each trade costs a few bytes per column instead of a Python object. Missing values
+    are stored as sentinels: 0 for dates (as ordinals), NaN for floats, INT_NULL for
+    quantities and -1 for operations.
+    """
+
+    FIELDS = ["date", "stock_symbol", "quantity", "price", "operation", "fee", "ir", "broker", "note_id"]
+
+    INT_NULL = -(2 ** 63)
+
+    def __init__(self, with_source: bool = False) -> None:
+        """
+        Creates an empty batch.
+
+        Args:
+            with_source (bool): Whether to keep a `source` column with the file of each brokerage.
+        """
+        self._dates = array("l")
+        self._quantities = array("q")
+        self._prices = array("d")
+        self._fees = array("d")
+        self._irs = array("d")
+        self._operations = array("b")
+        self._symbols = []
+        self._brokers = []
+        self._note_ids = []
+        self._sources = [] if with_source else None
+
+    @classmethod
+    def from_brokerages(cls, brokerages, source: str | None = None) -> "BrokerageBatch":
+        batch = cls(with_source=source is not None)
+        batch.extend(brokerages, source)
+
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    @property
+    def fields(self) -> list:
+        return self.FIELDS + ["source"] if self._sources is not None else self.FIELDS
+
+    def append(self, brokerage: Brokerage, source: str | None = None) -> None:
+        self._append(
+            brokerage.date.toordinal() if brokerage.date else 0,
+            brokerage.stock_symbol,
+            brokerage.quantity,
+            brokerage.price,
+            brokerage.operation,
+            brokerage.fee,
+            brokerage.ir,
+            brokerage.broker,
+            brokerage.note_id,
+            source
+        )
+
+    def extend(self, brokerages, source: str | None = None) -> None:
+        for brokerage in brokerages:
+            self.append(brokerage, source)
+
+    def append_json(self, record: dict, source: str | None = None) -> None:
+        """
+        Appends a brokerage from its `__json__` dict, without building a Brokerage object.
+
+        Args:
+            record (dict): The serialized brokerage.
+            source (str, optional): The file the brokerage was extracted from.
+
+        Returns:
+            None
+        """
+        date = record.get("date")
+
+        self._append(
+            datetime.date.fromisoformat(date).toordinal() if date else 0,
+            record.get("stock_symbol"),
+            record.get("quantity"),
+            record.get("price"),
+            record.get("operation"),
+            record.get("fee"),
+            record.get("ir"),
+            record.get("broker"),
+            record.get("note_id"),
+            source
+        )
+
+    def _append(self, date, stock_symbol, quantity, price, operation, fee, ir, broker, note_id, source) -> None:
+        self._dates.append(date)
+        self._symbols.append(_intern(stock_symbol))
+        self._quantities.append(self.INT_NULL if quantity is None else quantity)
+        self._prices.append(math.nan if price is None else price)
+        self._operations.append(Brokerage.OPERATIONS.index(operation) if operation else -1)
+        self._fees.append(math.nan if fee is None else fee)
+        self._irs.append(math.nan if ir is None else ir)
+        self._brokers.append(_intern(broker))
+        self._note_ids.append(_intern(note_id))
+
+        if self._sources is not None:
+            self._sources.append(_intern(source))
+
+    def apportion(self, totals: dict) -> None:
+        """
+        Splits fee and IR totals among the brokerages of each note, e.g. after a correction of the fees.
+
+        The split is the one made at extraction (see `abstract.apportionment.apportion`), run over
+        the price, quantity and operation columns without building Brokerage objects.
+
+        Args:
+            totals (dict): (broker, note ID) -> (fee, IR) of the note. Notes without totals are left unchanged.
+
+        Returns:
+            None
+        """
+        from abstract.apportionment import apportion
+
+        notes = {}
+
+        for index, note in enumerate(zip(self._brokers, self._note_ids)):
+            if note in totals:
+                notes.setdefault(note, []).append(index)
+
+        prices, quantities, operations = self._prices, self._quantities, self._operations
+        sell = Brokerage.OPERATIONS.index(Brokerage.OPERATION_SELL)
+
+        for note, indexes in notes.items():
+            amounts = [
+                prices[index] * quantities[index]
+                if prices[index] == prices[index] and quantities[index] != self.INT_NULL else 0.0
+                for index in indexes
+            ]
+            fees, irs = apportion(amounts, [operations[index] == sell for index in indexes], *totals[note])
+
+            for index, fee, ir in zip(indexes, fees, irs):
+                self._fees[index] = fee
+
+                if ir is not None:
+                    self._irs[index] = ir
+
+    def iter_rows(self):
+        """
+        Iterates over the brokerages as tuples of plain values, in `fields` order.
+
+        Returns:
+            Iterator of tuples.
+        """
+        int_null = self.INT_NULL
+        operations = Brokerage.OPERATIONS
+        dates = {}
+
+        columns = [
+            self._dates,
+            self._symbols,
+            self._quantities,
+            self._prices,
+            self._operations,
+            self._fees,
+            self._irs,
+            self._brokers,
+            self._note_ids,
+        ]
+
+        if self._sources is not None:
+            columns.append(self._sources)
+
+        for row in zip(*columns):
+            date, stock_symbol, quantity, price, operation, fee, ir = row[:7]
+
+            if date not in dates:
+                dates[date] = datetime.date.fromordinal(date).isoformat() if date else None
+
+            yield (
+                dates[date],
+                stock_symbol,
+                None if quantity == int_null else quantity,
+                None if price != price else price,
+                operations[operation] if operation >= 0 else None,
+                None if fee != fee else fee,
+                None if ir != ir else ir,
+                *row[7:]
+            )
+
+    def __iter__(self):
+        """Iterates over the brokerages as Brokerage objects."""
+        for row in self.iter_rows():
+            yield Brokerage.from_json(dict(zip(self.FIELDS, row)))
+
+    def to_records(self) -> list:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.iter_rows()]
+
+    def to_json(self, fp=None) -> str | None:
+        """
+        Serializes the batch as a JSON list of brokerages.
+
+        Args:
+            fp (optional): A text file object to write to. When omitted the JSON is returned.
+
+        Returns:
+            str or None: The JSON, if no file object was given.
+        """
+        if fp is None:
+            return json.dumps(self.to_records())
+
+        json.dump(self.to_records(), fp)
+
+    def to_csv(self, fp) -> None:
+        """
+        Writes the batch as CSV, with a header row.
+
+        Args:
+            fp: A text file object opened with newline="".
+
+        Returns:
+            None
+        """
+        writer = csv.writer(fp)
+        writer.writerow(self.fields)
+        writer.writerows(self.iter_rows())
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
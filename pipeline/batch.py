@@ -0,0 +1,187 @@
+import contextlib
+import glob
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from abstract import profiler
+from cache.result_cache import default_result_cache
+
+def collect_paths(sources: list) -> list:
+    """
+    Expands the batch sources into a list of PDF paths.
+
+    Each source can be a PDF file, a directory (searched recursively for PDFs), a glob
+    pattern, or a manifest file prefixed with '@' listing one path per line.
+
+    Args:
+        sources (list): The sources given on the command line.
+
+    Returns:
+        list: The PDF paths, without duplicates, in the order they were found.
+    """
+    paths = []
+
+    for source in sources:
+        if source.startswith("@"):
+            paths.extend(collect_paths(_read_manifest(source[1:])))
+        elif os.path.isdir(source):
+            pattern = os.path.join(source, "**", "*.[pP][dD][fF]")
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            paths.append(source)
+
+    return list(dict.fromkeys(paths))
+
+
+def _read_manifest(manifest: str) -> list:
+    """Reads a manifest file, resolving relative paths against the manifest directory."""
+    base_dir = os.path.dirname(os.path.abspath(manifest))
+    sources = []
+
+    with open(manifest, encoding="utf-8") as fp:
+        for line in fp:
+            line = line.strip()
+
+            if not line or line.startswith("#"):
+                continue
+
+            sources.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+
+    return sources
+
+
+def extract_file(task: tuple) -> dict:
+    """
+    Extracts a single file, turning any failure into an error result.
+
+    Args:
+        task (tuple): (broker, path, password, use_cache, profile). The path can also be the
+            content of the file or any other source taken by `abstract.sources.PdfSource`.
+
+    Returns:
+        dict: {"path", "data"} on success or {"path", "error"} on failure, plus the
+            per-stage stats under "profile" when profiling. "path" is None for content.
+    """
+    # Imported here so worker processes only load the extractors once they receive work
+    from main import get_brokerages_data
+
+    broker, path, password, use_cache, profile = task
+    cache = default_result_cache() if use_cache else None
+
+    with profiler.profile() if profile else contextlib.nullcontext() as file_profiler:
+        try:
+            data = get_brokerages_data(broker, path, password, cache)
+        except Exception as e:
+            result = error_result(path, e)
+        else:
+            result = {
+                "path": result_path(path),
+                "data": [brokerage.__json__() for brokerage in data]
+            }
+
+    if file_profiler is not None:
+        result["profile"] = file_profiler.stats()
+
+    return result
+
+
+def error_result(path, exception: BaseException) -> dict:
+    """Returns the per-file result of a file that failed with an exception."""
+    return {
+        "path": result_path(path),
+        "error": {
+            "message": "An error occurred while extracting the data.",
+            "exception": str(exception),
+            "type": type(exception).__name__
+        }
+    }
+
+
+def result_path(path) -> str | None:
+    """Returns the path a result is reported under, None for content, which is not sent back."""
+    return path if isinstance(path, str) else None
+
+
+def extract_chunk(tasks: list) -> list:
+    return [extract_file(task) for task in tasks]
+
+
+def run_batch(
+        broker: str,
+        paths,
+        password=None,
+        workers: int | None = None,
+        chunksize: int = 1,
+        use_cache: bool = True,
+        profile: bool = False,
+        limits=None
+    ):
+    """
+    Extracts many files, fanning the work out over a process pool.
+
+    A file that fails to extract produces an error result and does not stop the batch.
+    Only a few chunks per worker are in flight at a time, so results are yielded as
+    soon as they are ready and memory does not grow with the number of files.
+
+    Args:
+        broker (str): The broker of every file.
+        paths (iterable): The PDF paths to extract.
+        password (optional): The password of the files, or their candidate passwords (see
+            `abstract.passwords.iter_candidates`). Callables must be picklable to run in workers.
+        workers (int, optional): Number of worker processes, defaults to the number of CPUs.
+            With a single worker the files are extracted in the current process.
+        chunksize (int): Number of files sent to a worker at a time.
+        use_cache (bool): Whether to reuse results of files extracted before.
+        profile (bool): Whether to record per-stage stats of each file, which are added to
+            its result under "profile" and passed to the hooks registered with `profiler.add_hook`.
+        limits (pipeline.supervisor.Limits, optional): Bounds of the time, memory and pages of each
+            file. When given, every file is extracted by a `pipeline.supervisor.Supervisor` worker,
+            one at a time, even with a single worker.
+
+    Returns:
+        Iterator of per-file results, in the same order as `paths`.
+    """
+    tasks = ((broker, path, password, use_cache, profile) for path in paths)
+
+    if limits is not None:
+        results = _run_supervised(tasks, workers, limits)
+    else:
+        results = _run_tasks(tasks, workers, chunksize)
+
+    for result in results:
+        if "profile" in result:
+            profiler.emit(result["path"], result["profile"])
+
+        yield result
+
+
+def _run_supervised(tasks, workers: int | None, limits):
+    from pipeline.supervisor import Supervisor
+
+    with Supervisor(workers, limits) as supervisor:
+        yield from supervisor.run(tasks)
+
+
+def _run_tasks(tasks, workers: int | None, chunksize: int):
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        yield from map(extract_file, tasks)
+        return
+
+    window = workers * 2
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while chunk := list(itertools.islice(tasks, chunksize)):
+            pending.append(executor.submit(extract_chunk, chunk))
+
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,74 @@
+import os
+import sqlite3
+from collections import namedtuple
+
+# A file seen by the watcher: its stat and content hash when it was extracted, the broker and
+# extractor VERSION it was extracted with (None if it failed before the broker was known), the
+# output store file and byte offset its `count` records were appended at, and the error if it failed
+ManifestEntry = namedtuple(
+    "ManifestEntry",
+    ["path", "size", "mtime_ns", "sha256", "broker", "version", "output", "offset", "count", "error"]
+)
+
+
+class Manifest:
+    """
+    The files already extracted by the watcher, persisted in a SQLite database.
+
+    Entries record the stat and content hash of each file along with the extractor version
+    and where its records were written, so a rescan only hashes files whose size or mtime
+    changed and only extracts files whose content or extractor changed.
+    """
+
+    FILENAME = ".manifest.sqlite3"
+
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, "
+            "sha256 TEXT NOT NULL, "
+            "broker TEXT, "
+            "version TEXT, "
+            "output TEXT, "
+            "offset INTEGER, "
+            "count INTEGER, "
+            "error TEXT)"
+        )
+
+    def entries(self) -> dict:
+        """Returns every entry, by path."""
+        return {row[0]: ManifestEntry(*row) for row in self._conn.execute(f"SELECT {', '.join(ManifestEntry._fields)} FROM files")}
+
+    def get(self, path: str) -> ManifestEntry | None:
+        row = self._conn.execute(f"SELECT {', '.join(ManifestEntry._fields)} FROM files WHERE path = ?", (path,)).fetchone()
+
+        return ManifestEntry(*row) if row is not None else None
+
+    def put(self, entry: ManifestEntry) -> None:
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO files ({', '.join(ManifestEntry._fields)}) VALUES ({', '.join('?' * len(entry))})",
+            entry
+        )
+
+    def touch(self, path: str, size: int, mtime_ns: int) -> None:
+        """Updates the stat of a file whose content did not change."""
+        self._conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (size, mtime_ns, path))
+
+    def delete(self, path: str) -> None:
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
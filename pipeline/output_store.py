@@ -0,0 +1,38 @@
+import json
+import os
+import re
+
+class OutputStore:
+    """
+    Append-only NDJSON files holding the records extracted for each customer.
+
+    Every line carries the `source` PDF and its `sha256`, so when a note changes and is
+    extracted again the records of its current content are the ones with the latest hash
+    (the watcher manifest keeps it). Deleted notes get a `{"source", "deleted": true}` line.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def path(self, customer: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", customer) + ".ndjson")
+
+    def append(self, customer: str, records: list) -> tuple:
+        """
+        Appends records to the file of a customer.
+
+        Args:
+            customer (str): The customer the records belong to.
+            records (list): The JSON dicts to write, one per line.
+
+        Returns:
+            tuple: (file path, byte offset of the first record, number of records).
+        """
+        path = self.path(customer)
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(path, "ab") as fp:
+            offset = fp.tell()
+            fp.write("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+
+        return path, offset, len(records)
@@ -0,0 +1,365 @@
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import signal
+import socket
+
+from abstract import exceptions, profiler
+from extractors.registry import AUTO
+from pipeline.supervisor import Limits, Worker, timeout_error
+
+# Largest request line accepted, base64 uploads of big notes included
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+EXTRACTION_ERROR = -32000
+TIMEOUT_ERROR = -32001
+
+# Exceptions raised again with their own type when a server answers with them, see `call`
+REMOTE_ERRORS = {
+    error_class.__name__: error_class
+    for error_class in (
+        exceptions.PDFPasswordError,
+        exceptions.PDFCorruptError,
+        exceptions.PDFTooManyPagesError,
+        exceptions.ExtractionTimeoutError,
+        exceptions.ExtractionMemoryError,
+        exceptions.WorkerCrashError,
+        ValueError,
+        TypeError,
+        FileNotFoundError,
+        PermissionError,
+        MemoryError,
+        RuntimeError,
+    )
+}
+
+
+def parse_address(address: str) -> tuple:
+    """
+    Parses a server address.
+
+    Args:
+        address (str): "unix:/path/to/socket" or "host:port".
+
+    Returns:
+        tuple: ("unix", path) or ("tcp", (host, port)).
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+
+    host, _, port = address.rpartition(":")
+
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid server address '{address}', expected 'unix:<path>' or '<host>:<port>'")
+
+    return "tcp", (host, int(port))
+
+
+def _warm_worker() -> None:
+    """Imports the extractors and the PDF parser and loads the ticker index once per worker process."""
+    import pdfplumber  # noqa: F401
+    from extractors.registry import EXTRACTORS, get_extractor_class
+    from resolvers.ticker_index import default_index
+
+    for broker in EXTRACTORS:
+        get_extractor_class(broker)
+
+    default_index()
+
+
+class ExtractionServer:
+    """
+    Long-running extraction server speaking newline-delimited JSON-RPC 2.0.
+
+    Requests are handled on an asyncio event loop while the extraction runs on worker
+    processes that keep the extractors imported and their caches warm between notes. They are
+    the workers of `pipeline.supervisor.Supervisor`: one past the request timeout is killed,
+    and one that dies (e.g. killed out of memory) fails its request, both being replaced by a
+    fresh process for the next request.
+
+    Errors of the extraction carry {"type", "exception"} as their data: the name of the
+    exception raised and its message.
+
+    Methods:
+        extract: {"broker" (detected when missing), "path" or "content" (base64), "password" (or a list of candidates), "cache" (true by default)} -> list of brokerages.
+        stats: {} -> per-stage timings and counters summed over every extraction (when profiling).
+        ping: {} -> "pong".
+    """
+
+    def __init__(
+            self,
+            workers: int | None = None,
+            timeout: float | None = 60.0,
+            max_concurrency: int | None = None,
+            use_cache: bool = True,
+            profile: bool = False
+        ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency or self.workers * 2
+        self.use_cache = use_cache
+        self.profile = profile
+        self.metrics = profiler.Profiler()
+        self._limits = Limits(timeout=timeout)
+        self._context = multiprocessing.get_context()
+        self._semaphore = None
+        self._free_workers = None
+        self._idle = []
+        self._busy = set()
+
+    async def serve(self, address: str) -> None:
+        """
+        Serves requests until cancelled or sent SIGTERM.
+
+        Args:
+            address (str): "unix:/path/to/socket" or "host:port".
+
+        Returns:
+            None
+        """
+        kind, target = parse_address(address)
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._free_workers = asyncio.Semaphore(self.workers)
+        # Started ahead of the first requests, which would otherwise also wait for the imports
+        self._idle = [Worker(self._context, self._limits, _warm_worker) for _ in range(self.workers)]
+
+        try:
+            if kind == "unix":
+                if os.path.exists(target):
+                    os.unlink(target)
+
+                server = await asyncio.start_unix_server(self._handle_connection, path=target, limit=MAX_MESSAGE_SIZE)
+            else:
+                host, port = target
+                server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_MESSAGE_SIZE)
+
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in [*self._idle, *self._busy]:
+                worker.kill()
+
+            self._idle.clear()
+            self._busy.clear()
+
+            if kind == "unix" and os.path.exists(target):
+                os.unlink(target)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+
+                response = await self._handle_message(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_message(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Parse error")
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        params = request.get("params") or {}
+
+        if request["method"] == "ping":
+            return _result(request_id, "pong")
+
+        if request["method"] == "stats":
+            return _result(request_id, self.metrics.stats())
+
+        if request["method"] != "extract":
+            return _error(request_id, METHOD_NOT_FOUND, f"Method '{request['method']}' not found")
+
+        try:
+            task = self._make_task(params)
+        except (KeyError, TypeError, ValueError) as e:
+            return _error(request_id, INVALID_PARAMS, f"Invalid params: {e}")
+
+        async with self._semaphore:
+            try:
+                result = await self._extract(task)
+            except asyncio.TimeoutError:
+                error = timeout_error(self._limits)
+                return _error(request_id, TIMEOUT_ERROR, f"Extraction timed out after {self.timeout} seconds", _error_data(error))
+            except Exception as e:
+                return _error(request_id, INTERNAL_ERROR, "Internal error", _error_data(e))
+
+        if "profile" in result:
+            self.metrics.merge(result["profile"])
+            profiler.emit(result["path"], result["profile"])
+
+        if "error" in result:
+            error = result["error"]
+            return _error(request_id, EXTRACTION_ERROR, error["message"], {"type": error["type"], "exception": error["exception"]})
+
+        return _result(request_id, result["data"])
+
+    async def _extract(self, task: tuple) -> dict:
+        """
+        Extracts a file on a free worker, starting one if none is idle.
+
+        Raises:
+            asyncio.TimeoutError: If the extraction took longer than the timeout, the worker being killed.
+        """
+        async with self._free_workers:
+            worker = self._idle.pop() if self._idle else Worker(self._context, self._limits, _warm_worker)
+            self._busy.add(worker)
+
+            try:
+                worker.submit(None, task, self.timeout)
+                await asyncio.wait_for(_readable(worker.conn), self.timeout)
+                result, reusable = worker.result(self._limits)
+            except BaseException:
+                # Timed out, cancelled or unable to reach the worker, which is then left mid-extraction
+                reusable = False
+                raise
+            finally:
+                self._busy.discard(worker)
+
+                if reusable:
+                    self._idle.append(worker)
+                else:
+                    worker.kill()
+
+        return result
+
+    def _make_task(self, params: dict) -> tuple:
+        broker = params.get("broker", AUTO)
+        password = params.get("password")
+        use_cache = params.get("cache", True)
+
+        if not isinstance(broker, str):
+            raise TypeError("'broker' must be a string")
+
+        if not isinstance(use_cache, bool):
+            raise TypeError("'cache' must be a boolean")
+
+        # A client may skip the cache of a server using it, not the other way around
+        use_cache = use_cache and self.use_cache
+
+        if not (password is None or isinstance(password, str) or (
+            isinstance(password, list) and all(isinstance(candidate, str) for candidate in password)
+        )):
+            raise TypeError("'password' must be a string or a list of strings")
+
+        if "content" in params:
+            content = base64.b64decode(params["content"], validate=True)
+            return broker, content, password, use_cache, self.profile
+
+        path = params["path"]
+
+        if not isinstance(path, str):
+            raise TypeError("'path' must be a string")
+
+        return broker, path, password, use_cache, self.profile
+
+
+async def _readable(conn) -> None:
+    """Waits until a worker pipe has a result to read, or is closed by the worker dying."""
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    fd = conn.fileno()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+
+    try:
+        await ready
+    finally:
+        loop.remove_reader(fd)
+
+
+def _result(request_id, result) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def _error_data(exception: BaseException) -> dict:
+    return {"type": type(exception).__name__, "exception": str(exception)}
+
+
+def _error(request_id, code: int, message: str, data=None) -> dict:
+    error = {"code": code, "message": message}
+
+    if data is not None:
+        error["data"] = data
+
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def call(address: str, method: str, params: dict | None = None, timeout: float | None = None):
+    """
+    Sends a single request to a running server.
+
+    Args:
+        address (str): "unix:/path/to/socket" or "host:port".
+        method (str): The method to call.
+        params (dict, optional): The method params.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        The call result.
+
+    Raises:
+        Exception: The server error, raised again with its type when it is one of REMOTE_ERRORS
+            and as a RemoteExtractionError otherwise.
+    """
+    kind, target = parse_address(address)
+
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(target)
+    else:
+        sock = socket.create_connection(target, timeout=timeout)
+
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+
+    with sock, sock.makefile("rwb") as fp:
+        fp.write(json.dumps(request).encode("utf-8") + b"\n")
+        fp.flush()
+        response = json.loads(fp.readline())
+
+    if "error" in response:
+        raise remote_error(response["error"])
+
+    return response["result"]
+
+
+def remote_error(error: dict) -> Exception:
+    """
+    Builds the exception of a JSON-RPC error answered by a server.
+
+    Args:
+        error (dict): The "error" member of the response.
+
+    Returns:
+        Exception: An exception of the type raised on the server when it is one of REMOTE_ERRORS,
+            a RemoteExtractionError naming that type otherwise.
+    """
+    data = error.get("data") if isinstance(error.get("data"), dict) else {}
+    message = data.get("exception") or error.get("message", "")
+    remote_type = data.get("type")
+
+    if remote_type in REMOTE_ERRORS:
+        return REMOTE_ERRORS[remote_type](message)
+
+    return exceptions.RemoteExtractionError(message, remote_type, error.get("code"))
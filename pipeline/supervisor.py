@@ -0,0 +1,282 @@
+import multiprocessing
+import os
+import signal
+import time
+from collections import namedtuple
+from multiprocessing.connection import wait
+
+from abstract.exceptions import (
+    ExtractionMemoryError,
+    ExtractionTimeoutError,
+    PDFCorruptError,
+    PDFTooManyPagesError,
+    WorkerCrashError,
+)
+from pipeline.batch import error_result, extract_file, result_path
+
+# Bounds of the extraction of each file, None meaning unbounded: wall time in seconds, address space
+# of the worker in bytes (RLIMIT_AS), number of pages, and files a worker extracts before it is replaced
+Limits = namedtuple("Limits", ["timeout", "memory", "pages", "files_per_worker"], defaults=(None, None, None, None))
+
+
+def count_pages(path, password: str | None = None) -> int:
+    """
+    Reads the page count of a PDF file from its page tree root, without loading the pages.
+
+    Args:
+        path: The PDF file, a path or any source taken by `abstract.sources.PdfSource`.
+        password (str, optional): The password of the file.
+
+    Returns:
+        int: The number of pages the file declares.
+    """
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import int_value, resolve1
+
+    from abstract.sources import as_source
+
+    try:
+        with as_source(path).open() as fp:
+            document = PDFDocument(PDFParser(fp), password or "")
+            return int_value(resolve1(resolve1(document.catalog["Pages"]).get("Count", 0)))
+    except (OSError, MemoryError):
+        raise
+    except Exception as e:
+        raise PDFCorruptError("Error reading the PDF, the file is damaged or not a PDF.") from e
+
+
+def extract_limited(task: tuple, max_pages: int | None) -> dict:
+    """
+    Extracts a single file as `extract_file` does, failing files with more than `max_pages` pages before reading them.
+
+    Args:
+        task (tuple): (broker, path, password, use_cache, profile).
+        max_pages (int, optional): The page-count ceiling.
+
+    Returns:
+        dict: The per-file result.
+    """
+    if max_pages is None:
+        return extract_file(task)
+
+    from abstract.passwords import resolve_password
+    from abstract.sources import as_source
+
+    broker, path, password, use_cache, profile = task
+    source = as_source(path)
+
+    try:
+        password = resolve_password(source, password)
+        pages = count_pages(source, password)
+    except Exception as e:
+        return error_result(path, e)
+
+    if pages > max_pages:
+        return error_result(path, PDFTooManyPagesError(f"The PDF has {pages} pages, more than the {max_pages} allowed."))
+
+    result = extract_file((broker, source, password, use_cache, profile))
+    result["path"] = result_path(path)
+
+    return result
+
+
+def _worker_main(conn, limits: Limits, initializer=None) -> None:
+    """Extracts the tasks received through a pipe until told to stop with None."""
+    import resource
+
+    # Interrupts are handled by the supervisor, which stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if limits.memory is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (limits.memory, limits.memory))
+
+    if initializer is not None:
+        initializer()
+
+    while (task := conn.recv()) is not None:
+        conn.send(extract_limited(task, limits.pages))
+
+
+class Worker:
+    """A worker process, the pipe its tasks go through and the number of files it extracted."""
+
+    def __init__(self, context, limits: Limits, initializer=None) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, limits, initializer), daemon=True)
+        self.process.start()
+        child.close()
+        self.files = 0
+        self.task = None
+        self.deadline = None
+
+    def submit(self, index: int, task: tuple, timeout: float | None) -> None:
+        self.conn.send(task)
+        self.task = (index, task)
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def result(self, limits: Limits) -> tuple:
+        """
+        Reads the result of the file the worker was given, once it is ready or the worker died.
+
+        Returns:
+            tuple: (per-file result, whether the worker can be given another file).
+        """
+        path = self.task[1][1]
+        self.files += 1
+
+        try:
+            result = self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+
+            return error_result(path, crash_error(limits, self.process.exitcode)), False
+
+        reusable = limits.files_per_worker is None or self.files < limits.files_per_worker
+
+        if result.get("error", {}).get("type") == MemoryError.__name__ and limits.memory is not None:
+            # The worker may be left fragmented or holding half-built objects, so it is not reused
+            result = {**result, **error_result(path, memory_error(limits))}
+            reusable = False
+
+        return result, reusable
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+
+        self.process.join(1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+
+        self.process.join()
+        self.conn.close()
+
+
+class Supervisor:
+    """
+    Runs extractions in worker processes whose time and memory are bounded per file.
+
+    Each file is extracted by a worker with a wall-clock deadline and, optionally, an address
+    space limit (RLIMIT_AS) and a page-count ceiling read from the page tree before any page is
+    parsed. A worker past its deadline is killed and its file reported as ExtractionTimeoutError,
+    a worker running out of memory is replaced and its file reported as ExtractionMemoryError,
+    and workers are recycled after `files_per_worker` files, which releases what pdfminer and
+    the extractors cached. A pathological file therefore only costs its own bounded slot, and
+    the other workers keep going.
+
+    Errors are reported as the per-file results of `extract_file`, with the exception type
+    under "type".
+    """
+
+    def __init__(self, workers: int | None = None, limits: Limits = Limits()) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.limits = limits
+        self._context = multiprocessing.get_context()
+        self._idle = []
+
+    def __enter__(self) -> "Supervisor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, tasks):
+        """
+        Extracts files, running at most twice as many ahead of the next result to yield as there are workers.
+
+        Args:
+            tasks (iterable): (broker, path, password, use_cache, profile) tuples, as taken by `extract_file`.
+
+        Returns:
+            Iterator of per-file results, in the same order as `tasks`.
+        """
+        tasks = enumerate(tasks)
+        window = self.workers * 2
+        running = {}
+        done = {}
+        next_index = 0
+        submitted = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(running) < self.workers and submitted - next_index < window:
+                    item = next(tasks, None)
+
+                    if item is None:
+                        exhausted = True
+                        break
+
+                    worker = self._idle.pop() if self._idle else Worker(self._context, self.limits)
+                    worker.submit(*item, self.limits.timeout)
+                    running[worker.conn] = worker
+                    submitted += 1
+
+                if not running:
+                    break
+
+                deadlines = [worker.deadline for worker in running.values() if worker.deadline is not None]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+                for conn in wait(list(running), timeout):
+                    worker = running.pop(conn)
+                    index, result = self._collect(worker)
+                    done[index] = result
+
+                now = time.monotonic()
+
+                for conn, worker in list(running.items()):
+                    if worker.deadline is not None and worker.deadline <= now:
+                        del running[conn]
+                        index, task = worker.task
+                        worker.kill()
+                        done[index] = error_result(task[1], timeout_error(self.limits))
+
+                while next_index in done:
+                    yield done.pop(next_index)
+                    next_index += 1
+        finally:
+            for worker in running.values():
+                worker.kill()
+
+    def _collect(self, worker: Worker) -> tuple:
+        """Reads the result of a worker, then keeps it for the next file or replaces it."""
+        result, reusable = worker.result(self.limits)
+
+        if reusable:
+            self._idle.append(worker)
+        else:
+            worker.stop()
+
+        return worker.task[0], result
+
+    def close(self) -> None:
+        """Stops the idle workers."""
+        while self._idle:
+            self._idle.pop().stop()
+
+
+def timeout_error(limits: Limits) -> ExtractionTimeoutError:
+    return ExtractionTimeoutError(f"The extraction took longer than {limits.timeout} seconds.")
+
+
+def memory_error(limits: Limits) -> ExtractionMemoryError:
+    if limits.memory is None:
+        return ExtractionMemoryError("The worker was killed, most likely out of memory.")
+
+    return ExtractionMemoryError(f"The extraction exceeded the memory limit of {limits.memory // (1024 * 1024)} MB.")
+
+
+def crash_error(limits: Limits, exitcode: int | None) -> Exception:
+    """Returns the error of a file whose worker died with `exitcode` before sending its result."""
+    # SIGKILL is what the kernel's OOM killer sends, so the worker most likely ran out of memory
+    if exitcode == -signal.SIGKILL:
+        return memory_error(limits)
+
+    return WorkerCrashError(f"The worker died without a result (exit code {exitcode}).")
@@ -0,0 +1,389 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from cache.result_cache import default_result_cache, hash_file
+from extractors.registry import AUTO, get_extractor_class, resolve_broker
+from pipeline.batch import run_batch
+from pipeline.manifest import Manifest, ManifestEntry
+from pipeline.output_store import OutputStore
+
+# Customer of the notes dropped directly in the watched directory instead of a customer subdirectory
+UNASSIGNED = "unassigned"
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes, watching every directory of a tree."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories = {}
+
+    def add_tree(self, root: str) -> None:
+        for directory, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+
+            if wd < 0:
+                # e.g. ENOSPC once fs.inotify.max_user_watches is reached
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+            self._directories[wd] = directory
+
+    def read(self, timeout: float | None) -> list | None:
+        """
+        Waits for events.
+
+        Returns:
+            list or None: (path, mask) per event, empty on timeout, or None if events were lost
+                and the tree has to be rescanned.
+        """
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events, position = [], 0
+
+        while position < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, position)
+            position += self._EVENT.size
+            name = data[position:position + length].rstrip(b"\0")
+            position += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+
+            if mask & self.IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+
+            directory = self._directories.get(wd)
+
+            if directory is not None:
+                events.append((os.path.join(directory, os.fsdecode(name)) if name else directory, mask))
+
+        return events
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class Watcher:
+    """
+    Keeps a directory of notes extracted into per-customer NDJSON files.
+
+    Each customer has a subdirectory of the watched directory, and its notes' records are
+    appended to `<customer>.ndjson` in the output directory (notes dropped directly in the
+    watched directory go to UNASSIGNED). A manifest of the files seen, kept in the output
+    directory, makes every sync cost a stat per file plus the work on new or changed notes:
+    only files whose size or mtime changed are hashed, and only those whose content changed
+    (or whose extractor VERSION was bumped) are extracted again.
+
+    `watch` syncs once and then follows inotify events, so later syncs only look at the paths
+    that changed. Where inotify is not available it rescans every `interval` seconds instead.
+
+    Files that failed are extracted again even if unchanged, as the failure may come from
+    outside the file (a resolver outage, a password not given yet): on full syncs at most every
+    RETRY_SECONDS, and when following inotify, once no event came for RETRY_SECONDS.
+    """
+
+    # Files modified more recently than this are left to the next scan when polling, as they may still be written
+    SETTLE_SECONDS = 2.0
+
+    # Delay to gather the events of files written together before syncing them
+    DEBOUNCE_SECONDS = 0.5
+
+    # Least delay between two retries of the files that failed
+    RETRY_SECONDS = 60.0
+
+    def __init__(
+            self,
+            directory: str,
+            output: str,
+            broker: str = AUTO,
+            password=None,
+            workers: int | None = None,
+            use_cache: bool = True,
+            interval: float = 5.0
+        ) -> None:
+        self.directory = os.path.abspath(directory)
+        self.store = OutputStore(output)
+        self.manifest = Manifest(os.path.join(output, Manifest.FILENAME))
+        self.broker = broker
+        self.password = password
+        self.workers = workers
+        self.use_cache = use_cache
+        self.interval = interval
+        self._retried_at = None
+
+    def customer_of(self, path: str) -> str:
+        """Returns the customer of a note, the first directory of its path under the watched directory."""
+        parts = os.path.relpath(path, self.directory).split(os.sep)
+
+        return parts[0] if len(parts) > 1 else UNASSIGNED
+
+    def sync(self, paths=None, settle: float = 0.0, retry: bool | None = None) -> dict:
+        """
+        Extracts the new and changed notes and records the deleted ones.
+
+        Args:
+            paths (iterable, optional): The paths that may have changed, the whole directory by default.
+            settle (float): Skip files modified less than this many seconds ago.
+            retry (bool, optional): Whether files that failed are extracted again even if unchanged,
+                by default on full syncs once RETRY_SECONDS passed since the last retry.
+
+        Returns:
+            dict: Number of files "extracted", "failed", "unchanged", "deleted" and "pending" (not settled).
+        """
+        entries = self.manifest.entries()
+        retry = paths is None and self._retry_due() if retry is None else retry
+        stats = {"extracted": 0, "failed": 0, "unchanged": 0, "deleted": 0, "pending": 0}
+
+        if paths is None:
+            found = self._scan()
+            missing = [path for path in entries if path not in found]
+        else:
+            found, missing = {}, []
+
+            for path in paths:
+                try:
+                    found[path] = os.stat(path)
+                except FileNotFoundError:
+                    if path in entries:
+                        missing.append(path)
+
+        changed = []
+        now = time.time()
+
+        for path, stat in found.items():
+            entry = entries.get(path)
+
+            if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns) and self._is_current(entry, retry):
+                stats["unchanged"] += 1
+                continue
+
+            if now - stat.st_mtime < settle:
+                stats["pending"] += 1
+                continue
+
+            digest = hash_file(path)
+
+            if entry is not None and entry.sha256 == digest and self._is_current(entry, retry):
+                self.manifest.touch(path, stat.st_size, stat.st_mtime_ns)
+                stats["unchanged"] += 1
+                continue
+
+            changed.append((path, stat, digest))
+
+        results = run_batch(self.broker, [path for path, _, _ in changed], self.password, self.workers, 1, self.use_cache)
+
+        for (path, stat, digest), result in zip(changed, results):
+            stats["failed" if "error" in result else "extracted"] += 1
+            self._record(path, stat, digest, result)
+
+        for path in missing:
+            self.store.append(self.customer_of(path), [{"source": path, "deleted": True}])
+            self.manifest.delete(path)
+            stats["deleted"] += 1
+
+        return stats
+
+    def _scan(self) -> dict:
+        """Returns the stat of every PDF under the watched directory, by path."""
+        found = {}
+        directories = [self.directory]
+
+        while directories:
+            with os.scandir(directories.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                        found[entry.path] = entry.stat()
+
+        return found
+
+    def _retry_due(self) -> bool:
+        """Whether RETRY_SECONDS passed since the files that failed were last retried, starting a new retry if so."""
+        now = time.monotonic()
+
+        if self._retried_at is not None and now - self._retried_at < self.RETRY_SECONDS:
+            return False
+
+        self._retried_at = now
+
+        return True
+
+    def _is_current(self, entry: ManifestEntry, retry: bool = False) -> bool:
+        """Whether a file was extracted with the current version of its extractor, and is not a failure to retry."""
+        if entry.error is not None and retry:
+            return False
+
+        if entry.broker is None:
+            # Failed before the broker was known, or extracted by an extractor whose VERSION cannot be checked
+            return entry.error is not None
+
+        try:
+            return get_extractor_class(entry.broker).VERSION == entry.version
+        except ValueError:
+            return True
+
+    def _record(self, path: str, stat: os.stat_result, digest: str, result: dict) -> None:
+        if "error" in result:
+            records = [{"source": path, "sha256": digest, "error": result["error"]}]
+            error = result["error"]["exception"]
+            previous = self.manifest.get(path)
+
+            if previous is not None and (previous.sha256, previous.error) == (digest, error):
+                # Failed again the same way on a retry, its error record is already in the output
+                self.manifest.put(previous._replace(size=stat.st_size, mtime_ns=stat.st_mtime_ns))
+                return
+        else:
+            records = [{"source": path, "sha256": digest, **record} for record in result["data"]]
+            error = None
+
+        broker = self.broker
+
+        if broker == AUTO:
+            broker = next((record["broker"] for record in result.get("data", [])), None)
+
+            if broker is None and error is None:
+                broker = self._detected_broker(path, digest)
+
+        version = get_extractor_class(broker).VERSION if broker is not None else None
+        output, offset, count = self.store.append(self.customer_of(path), records)
+
+        self.manifest.put(ManifestEntry(path, stat.st_size, stat.st_mtime_ns, digest, broker, version, output, offset, count, error))
+
+    def _detected_broker(self, path: str, digest: str) -> str | None:
+        """Returns the broker detected for a note without records, as `main.get_brokerages_data` remembers it."""
+        broker = default_result_cache().get_broker(digest) if self.use_cache else None
+
+        if broker is not None:
+            return broker
+
+        try:
+            return resolve_broker(AUTO, path, self.password)
+        except Exception:
+            return None
+
+    def watch(self, on_sync=None, poll: bool = False) -> None:
+        """
+        Syncs the directory, then keeps syncing the notes that change until interrupted.
+
+        Args:
+            on_sync (callable, optional): Called with the stats of every sync that found changes.
+            poll (bool): Rescan every `interval` seconds even if inotify is available.
+
+        Returns:
+            None
+        """
+        report = on_sync or (lambda stats: None)
+        inotify = None
+
+        if not poll:
+            try:
+                inotify = _Inotify()
+                inotify.add_tree(self.directory)
+            except OSError:
+                if inotify is not None:
+                    inotify.close()
+
+                inotify = None
+
+        report(self.sync())
+
+        try:
+            if inotify is None:
+                self._poll(report)
+            else:
+                self._follow(inotify, report)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _poll(self, report) -> None:
+        while True:
+            time.sleep(self.interval)
+            stats = self.sync(settle=self.SETTLE_SECONDS)
+
+            if stats["extracted"] or stats["failed"] or stats["deleted"]:
+                report(stats)
+
+    def _follow(self, inotify: _Inotify, report) -> None:
+        while True:
+            events = inotify.read(self.RETRY_SECONDS)
+
+            if events == []:
+                failed = [path for path, entry in self.manifest.entries().items() if entry.error is not None]
+
+                if failed and self._retry_due():
+                    stats = self.sync(failed, retry=True)
+
+                    if stats["extracted"] or stats["failed"] or stats["deleted"]:
+                        report(stats)
+
+                continue
+
+            deadline = time.monotonic() + self.DEBOUNCE_SECONDS
+
+            while events is not None and (timeout := deadline - time.monotonic()) > 0:
+                more = inotify.read(timeout)
+                events = events + more if more is not None else None
+
+            if events is None:
+                # The kernel queue overflowed, so changes may have been missed
+                report(self.sync())
+                continue
+
+            paths = set()
+
+            for path, mask in events:
+                if mask & _Inotify.IN_ISDIR:
+                    if mask & (_Inotify.IN_CREATE | _Inotify.IN_MOVED_TO):
+                        inotify.add_tree(path)
+                        paths.update(self._scan_directory(path))
+                    elif mask & _Inotify.IN_MOVED_FROM:
+                        paths.update(entry for entry in self.manifest.entries() if entry.startswith(path + os.sep))
+                elif path.lower().endswith(".pdf") and not mask & _Inotify.IN_CREATE:
+                    # Created files are synced once closed (IN_CLOSE_WRITE), when fully written
+                    paths.add(path)
+
+            if paths:
+                report(self.sync(sorted(paths)))
+
+    def _scan_directory(self, directory: str) -> list:
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(directory)
+            for name in names if name.lower().endswith(".pdf")
+        ]
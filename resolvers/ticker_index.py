@@ -0,0 +1,181 @@
+import csv
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+DEFAULT_DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "b3_tickers.csv")
+
+class TickerIndex:
+    """
+    Offline index of B3 issuer short names ("PETROBRAS", "ITAUUNIBANCO") and share classes to tickers.
+
+    Brokerage notes print the issuer short name followed by the share class and, optionally,
+    governance segment codes ("VALE ON NM", "BRADESCO PN N1"). Names are looked up exactly first
+    and then through a character trigram index scored with the Dice coefficient, which tolerates
+    truncated and slightly misspelled names.
+    """
+
+    # Share classes printed after the issuer name
+    SHARE_CLASSES = ("ON", "PN", "PNA", "PNB", "PNC", "PND", "UNT", "CI")
+
+    MIN_SCORE = 0.8
+    MIN_MARGIN = 0.05
+    MIN_PREFIX_LENGTH = 4
+
+    def __init__(self, rows: list) -> None:
+        """
+        Builds the index.
+
+        Args:
+            rows (list): (ticker, issuer, share_class) tuples.
+        """
+        self._tickers = {}
+        self._names = set()
+        self._issuers = []
+        self._grams = []
+        self._gram_index = defaultdict(set)
+
+        for ticker, issuer, share_class in rows:
+            issuer = self.normalize(issuer)
+            share_class = share_class.strip().upper()
+
+            if issuer not in self._names:
+                self._names.add(issuer)
+                self._add_to_gram_index(issuer)
+
+            self._tickers[(issuer, share_class)] = ticker.strip().upper()
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_DATA_FILE) -> "TickerIndex":
+        """
+        Loads the index from a CSV file with `ticker`, `issuer` and `share_class` columns.
+
+        Args:
+            path (str): The path to the CSV file, defaults to the bundled B3 data file.
+
+        Returns:
+            TickerIndex: The loaded index.
+        """
+        with open(path, encoding="utf-8", newline="") as fp:
+            rows = [(row["ticker"], row["issuer"], row["share_class"]) for row in csv.DictReader(fp)]
+
+        return cls(rows)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Uppercases the name, strips accents and replaces punctuation with spaces."""
+        name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        return " ".join(re.sub(r"[^A-Z0-9]", " ", name.upper()).split())
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        text = f"  {text} "
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def _add_to_gram_index(self, issuer: str) -> None:
+        grams = self._trigrams(issuer)
+        issuer_id = len(self._issuers)
+
+        self._issuers.append(issuer)
+        self._grams.append(grams)
+
+        for gram in grams:
+            self._gram_index[gram].add(issuer_id)
+
+    def split_name(self, stock_name: str) -> tuple:
+        """
+        Splits a stock name into the issuer name and the share class.
+
+        Governance segment codes printed after the share class are discarded.
+
+        Args:
+            stock_name (str): The stock name as printed on the note, e.g. "BRADESCO PN N1".
+
+        Returns:
+            tuple: (issuer, share_class), where share_class may be None.
+        """
+        tokens = self.normalize(stock_name).split(" ")
+
+        for position in range(len(tokens) - 1, 0, -1):
+            if tokens[position] in self.SHARE_CLASSES:
+                return " ".join(tokens[:position]), tokens[position]
+
+        return " ".join(tokens), None
+
+    def lookup(self, stock_name: str) -> str | None:
+        """
+        Looks up the ticker for the given stock name.
+
+        Args:
+            stock_name (str): The stock name as printed on the note.
+
+        Returns:
+            str or None: The ticker, or None if the issuer and share class are not in the index.
+        """
+        issuer, share_class = self.split_name(stock_name)
+
+        if not issuer:
+            return None
+
+        if issuer not in self._names:
+            issuer = self._match_issuer(issuer)
+
+            if issuer is None:
+                return None
+
+        if share_class is None:
+            # Without a share class the name is only unambiguous for single-class issuers
+            tickers = [ticker for (name, _), ticker in self._tickers.items() if name == issuer]
+            return tickers[0] if len(tickers) == 1 else None
+
+        # Classes missing from the data file are left to the network resolver rather than
+        # guessed from the class digit, as many issuers do not list every class
+        return self._tickers.get((issuer, share_class))
+
+    def _match_issuer(self, issuer: str) -> str | None:
+        """Finds the closest indexed issuer name, or None if no candidate is close enough."""
+        grams = self._trigrams(issuer)
+        candidates = set()
+
+        for gram in grams:
+            candidates.update(self._gram_index.get(gram, ()))
+
+        scores = []
+
+        for issuer_id in candidates:
+            candidate = self._issuers[issuer_id]
+            candidate_grams = self._grams[issuer_id]
+            score = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+
+            # Notes may truncate long issuer names
+            if len(issuer) >= self.MIN_PREFIX_LENGTH and candidate.startswith(issuer):
+                score = max(score, 0.9)
+
+            scores.append((score, candidate))
+
+        if not scores:
+            return None
+
+        scores.sort(reverse=True)
+        best_score, best = scores[0]
+
+        if best_score < self.MIN_SCORE:
+            return None
+
+        if len(scores) > 1 and best_score - scores[1][0] < self.MIN_MARGIN:
+            return None
+
+        return best
+
+
+_default_index = None
+
+def default_index() -> TickerIndex:
+    """Returns the process-wide index built from the bundled data file."""
+    global _default_index
+
+    if _default_index is None:
+        _default_index = TickerIndex.from_csv()
+
+    return _default_index
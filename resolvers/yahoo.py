@@ -0,0 +1,311 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import email.utils
+import os
+import threading
+import time
+
+from abstract import profiler
+from cache.sqlite_cache import MISSING
+from cache.ticker_cache import TickerCache
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by the concurrent lookups of a resolver.
+
+    Tokens are refilled at `rate` per second up to `capacity`, and each request takes one.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Takes a token if one is available, otherwise returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        while (delay := self._take()) > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        while (delay := self._take()) > 0:
+            await asyncio.sleep(delay)
+
+
+class YahooFinanceResolver:
+    """
+    Resolves stock names printed on brokerage notes to tickers using Yahoo Finance search.
+
+    Every name prefix queried is stored in a TickerCache, including the ones that had
+    no results, so repeated names do not trigger new network requests. Requests go through
+    a pooled keep-alive session, are rate limited by a token bucket and are retried with
+    exponential backoff on 429 and 5xx responses, honoring Retry-After up to `max_retry_delay`.
+    """
+
+    URL = "https://query2.finance.yahoo.com/v1/finance/search"
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            cache: TickerCache | None = None,
+            url: str | None = None,
+            concurrency: int = 8,
+            rate: float = 10.0,
+            max_retries: int = 3,
+            backoff: float = 0.5,
+            timeout: float = 10.0,
+            max_retry_delay: float = 30.0
+        ) -> None:
+        """
+        Creates the resolver.
+
+        Args:
+            cache (TickerCache, optional): The resolution cache, defaults to the user cache.
+            url (str, optional): The search endpoint, defaults to the BROKERAGE_EXTRACTOR_YAHOO_URL
+                environment variable or Yahoo Finance.
+            concurrency (int): Maximum simultaneous requests made by `resolve_many`.
+            rate (float): Maximum requests per second.
+            max_retries (int): Retries of a request answered with a retryable status.
+            backoff (float): Base delay in seconds of the exponential backoff.
+            timeout (float): Timeout of each request in seconds.
+            max_retry_delay (float): Longest Retry-After in seconds waited for. A request asked to
+                wait longer (than this or its own backoff) is not retried, so its name fails.
+        """
+        self.cache = cache if cache is not None else TickerCache()
+        self.url = url or os.environ.get("BROKERAGE_EXTRACTOR_YAHOO_URL") or self.URL
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_retry_delay = max_retry_delay
+        self.requests_made = 0
+        self._bucket = TokenBucket(rate)
+        self._session = None
+        self._pid = None
+
+    def _get_session(self) -> "requests.Session":
+        # requests is imported on first use, so resolutions answered from the cache do not load it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # Sessions hold open sockets, which must not be shared with forked processes
+        if self._session is None or self._pid != os.getpid():
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = self.USER_AGENT
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._pid = os.getpid()
+
+        return self._session
+
+    def resolve(self, stock_name: str) -> str:
+        """
+        Fetches the stock code for the given stock name.
+
+        Args:
+            stock_name (str): The name of the stock.
+
+        Returns:
+            str: The stock code, or raises an exception if not found.
+        """
+        stock_name = stock_name.strip()
+
+        # Retry search with progressively shorter names if no results found
+        while stock_name:
+            stock_symbol = self._lookup(stock_name)
+
+            if stock_symbol:
+                return stock_symbol
+
+            # If no results, remove the last word from the stock_name
+            stock_name = " ".join(stock_name.split(" ")[:-1])
+
+        # Raise an exception if no valid stock code is found after all attempts
+        raise Exception("Stock code not found after trying all possibilities.")
+
+    def resolve_many(self, stock_names) -> dict:
+        """
+        Resolves many stock names concurrently.
+
+        Duplicated names are resolved once, with at most `concurrency` requests in flight.
+        Called from a running event loop (e.g. a note extracted by an async service), the
+        requests run on an event loop of their own in a helper thread, as loops do not nest,
+        in a copy of the caller's context so they are counted by its profiler.
+
+        Args:
+            stock_names (iterable): The stock names to resolve.
+
+        Returns:
+            dict: Stock name -> stock code, or None for the names that were not found.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.resolve_many_async(stock_names))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            context = contextvars.copy_context()
+            return executor.submit(context.run, asyncio.run, self.resolve_many_async(stock_names)).result()
+
+    async def resolve_many_async(self, stock_names) -> dict:
+        names = list(dict.fromkeys(name.strip() for name in stock_names))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def resolve(name: str) -> str | None:
+            async with semaphore:
+                return await self._resolve_async(name)
+
+        symbols = await asyncio.gather(*(resolve(name) for name in names))
+
+        return dict(zip(names, symbols))
+
+    async def _resolve_async(self, stock_name: str) -> str | None:
+        while stock_name:
+            # The cache is only touched from the event loop thread, so by one thread at a time
+            stock_symbol = self.cache.lookup(stock_name)
+
+            if stock_symbol is MISSING:
+                profiler.count("ticker_cache_misses")
+                data = await self._fetch_async(stock_name)
+                stock_symbol = self._symbol_from_data(data)
+                self.cache.store(stock_name, stock_symbol)
+            else:
+                profiler.count("ticker_cache_hits")
+
+            if stock_symbol:
+                return stock_symbol
+
+            stock_name = " ".join(stock_name.split(" ")[:-1])
+
+        return None
+
+    def _lookup(self, query: str) -> str | None:
+        """Resolves a single name prefix, consulting the cache before the network."""
+        stock_symbol = self.cache.lookup(query)
+
+        if stock_symbol is not MISSING:
+            profiler.count("ticker_cache_hits")
+            return stock_symbol
+
+        profiler.count("ticker_cache_misses")
+        stock_symbol = self._symbol_from_data(self.fetch_stock_data(query))
+        self.cache.store(query, stock_symbol)
+
+        return stock_symbol
+
+    def fetch_stock_data(self, query: str) -> dict:
+        """Makes the API request to Yahoo Finance, retrying with backoff on retryable statuses."""
+        for attempt in range(self.max_retries + 1):
+            self._bucket.acquire()
+            profiler.count("ticker_requests")
+            response = self._request(query)
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                break
+
+            if (delay := self._retry_delay(response, attempt)) is None:
+                break
+
+            time.sleep(delay)
+
+        return self._parse_response(query, response)
+
+    async def _fetch_async(self, query: str) -> dict:
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire_async()
+            profiler.count("ticker_requests")
+            response = await asyncio.to_thread(self._request, query)
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                break
+
+            if (delay := self._retry_delay(response, attempt)) is None:
+                break
+
+            await asyncio.sleep(delay)
+
+        return self._parse_response(query, response)
+
+    def _request(self, query: str) -> "requests.Response":
+        params = {"q": query, "quotes_count": 1, "country": "Brazil"}
+
+        self.requests_made += 1
+        return self._get_session().get(url=self.url, params=params, timeout=self.timeout)
+
+    def _retry_delay(self, response: "requests.Response", attempt: int) -> float | None:
+        """
+        Returns the delay before the next attempt, from Retry-After when the server sent it.
+
+        Returns:
+            float or None: The delay in seconds, or None if Retry-After asks to wait longer than
+                `max_retry_delay` (or the backoff, if longer), in which case the request is not retried.
+        """
+        backoff = self.backoff * 2 ** attempt
+        retry_after = response.headers.get("Retry-After")
+        delay = None
+
+        if retry_after:
+            if retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                try:
+                    retry_at = email.utils.parsedate_to_datetime(retry_after)
+                except (TypeError, ValueError):
+                    retry_at = None
+
+                if retry_at is not None:
+                    delay = max(0.0, retry_at.timestamp() - time.time())
+
+        if delay is None:
+            return backoff
+
+        return delay if delay <= max(backoff, self.max_retry_delay) else None
+
+    @staticmethod
+    def _parse_response(query: str, response: "requests.Response") -> dict:
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch stock data for query '{query}' (HTTP {response.status_code})")
+
+        return response.json()
+
+    @staticmethod
+    def _symbol_from_data(data: dict) -> str | None:
+        if not data.get('quotes'):
+            return None
+
+        company_code = data['quotes'][0]['symbol'].split(".")[0]
+
+        # Remove trailing 'F' if present
+        if company_code.endswith('F'):
+            company_code = company_code[:-1]
+
+        return company_code
+
+
+_default_resolver = None
+
+def default_resolver() -> YahooFinanceResolver:
+    """Returns the process-wide resolver, so its cache connection and HTTP session are reused between notes."""
+    global _default_resolver
+
+    if _default_resolver is None:
+        _default_resolver = YahooFinanceResolver()
+
+    return _default_resolver
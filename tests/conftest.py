@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+# The modules are imported from the repository root, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keeps the on-disk caches of every test in its own directory."""
+    from cache import page_cache, password_cache, result_cache
+    from resolvers import yahoo
+
+    directory = tmp_path / "cache"
+    monkeypatch.setenv("BROKERAGE_EXTRACTOR_CACHE_DIR", str(directory))
+
+    # The process-wide caches are opened again in that directory
+    monkeypatch.setattr(page_cache, "_default_page_cache", None)
+    monkeypatch.setattr(password_cache, "_default_password_cache", None)
+    monkeypatch.setattr(result_cache, "_default_result_cache", None)
+    monkeypatch.setattr(yahoo, "_default_resolver", None)
+
+    return directory
+
+
+@pytest.fixture
+def write_note(tmp_path):
+    """
+    Writes synthetic notes (see benchmarks/synthetic.py) to the test directory.
+
+    Their stocks are all in the bundled ticker index, so extracting them never goes to the network.
+    """
+    from benchmarks.synthetic import make_note
+
+    def write(broker: str, name: str | None = None, **kwargs) -> str:
+        path = str(tmp_path / (name or f"{broker}.pdf"))
+        make_note(path, broker, unindexed_ratio=0, **kwargs)
+
+        return path
+
+    return write
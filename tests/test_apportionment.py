@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from abstract.apportionment import allocate, apportion, apportion_brokerages, to_cents
+from models.brokerage import Brokerage
+from models.brokerage_batch import BrokerageBatch
+
+
+def test_allocate_gives_leftover_units_to_largest_remainders():
+    # 10 over 1, 1, 1 is 3.33 each and over 2, 1, 1 is 5, 2.5, 2.5, ties going to the first shares
+    assert allocate(10, [1, 1, 1]) == [4, 3, 3]
+    assert allocate(10, [2, 1, 1]) == [5, 3, 2]
+    assert allocate(7, [1, 3]) == [2, 5]
+
+
+def test_allocate_without_weights():
+    assert allocate(100, [0, 0]) == [0, 0]
+    assert allocate(100, []) == []
+
+
+def test_allocate_negative_total():
+    assert allocate(-10, [1, 1, 1]) == [-4, -3, -3]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_shares_add_up_to_note_totals(seed):
+    generator = random.Random(seed)
+    trades = generator.randint(1, 500)
+    amounts = [generator.randint(1, 10_000) * generator.choice([0.01, 0.37, 12.5]) for _ in range(trades)]
+    sells = [generator.random() < 0.5 for _ in range(trades)]
+    fee = round(generator.uniform(0, 500), 2)
+    ir = round(generator.uniform(0, 50), 2)
+
+    fees, irs = apportion(amounts, sells, fee, ir)
+
+    assert sum(to_cents(share) for share in fees) == to_cents(fee)
+    assert all(share is None for share, sell in zip(irs, sells) if not sell)
+
+    if any(sells):
+        assert sum(to_cents(share) for share in irs if share is not None) == to_cents(ir)
+
+
+def test_shares_follow_amounts():
+    fees, irs = apportion([100.0, 300.0], [False, True], 1.0, 0.4)
+
+    assert fees == [0.25, 0.75]
+    assert irs == [None, 0.4]
+
+
+def test_apportion_brokerages_sets_fee_and_ir():
+    brokerages = [
+        Brokerage(quantity=10, price=10.0, operation=Brokerage.OPERATION_BUY),
+        Brokerage(quantity=20, price=10.0, operation=Brokerage.OPERATION_SELL),
+        Brokerage(quantity=10, price=10.0, operation=Brokerage.OPERATION_SELL),
+    ]
+
+    apportion_brokerages(brokerages, 0.1, 0.05)
+
+    assert [brokerage.fee for brokerage in brokerages] == [0.03, 0.05, 0.02]
+    assert [brokerage.ir for brokerage in brokerages] == [None, 0.03, 0.02]
+
+
+def test_batch_apportion_splits_each_note_from_its_totals():
+    batch = BrokerageBatch()
+
+    for note_id, trades in (("1", 3), ("2", 7)):
+        for number in range(trades):
+            batch.append(Brokerage(
+                quantity=number + 1, price=9.99, operation=Brokerage.OPERATION_SELL, broker="rico", note_id=note_id
+            ))
+
+    batch.apportion({("rico", "1"): (1.0, 0.1), ("rico", "2"): (2.33, 0.0)})
+    records = batch.to_records()
+
+    for note_id, (fee, ir) in (("1", (1.0, 0.1)), ("2", (2.33, 0.0))):
+        note = [record for record in records if record["note_id"] == note_id]
+
+        assert sum(to_cents(record["fee"]) for record in note) == to_cents(fee)
+        assert sum(to_cents(record["ir"] or 0) for record in note) == to_cents(ir)
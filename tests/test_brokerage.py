@@ -0,0 +1,104 @@
+import csv
+import datetime
+import io
+import json
+
+import pytest
+
+from models.brokerage import Brokerage
+from models.brokerage_batch import BrokerageBatch
+
+
+def _brokerages() -> list:
+    sell = Brokerage("15/03/2024", "VALE3", 100, 61.5, Brokerage.OPERATION_SELL, 1.25, 0.31, "rico", "123456")
+    buy = Brokerage("15/03/2024", "PETR4", 10, 38.02, Brokerage.OPERATION_BUY, 0.12, None, "rico", "123456")
+    # Fees of a note without any are 0.0, which the constructor would turn into None
+    free = Brokerage.from_json({**buy.__json__(), "stock_symbol": "ITUB4", "fee": 0.0, "date": "2024-03-18", "note_id": "123457"})
+    empty = Brokerage()
+
+    return [sell, buy, free, empty]
+
+
+def test_constructor_parses_and_validates():
+    brokerage = Brokerage("15/03/2024", quantity=10, price=1.5, operation=Brokerage.OPERATION_BUY)
+
+    assert brokerage.date == datetime.date(2024, 3, 15)
+
+    with pytest.raises(TypeError):
+        Brokerage(quantity="10")
+
+    with pytest.raises(TypeError):
+        Brokerage(price=1)
+
+    with pytest.raises(ValueError):
+        Brokerage(operation="hold")
+
+    with pytest.raises(ValueError):
+        Brokerage("2024-03-15")
+
+
+def test_json_round_trip():
+    for brokerage in _brokerages():
+        assert Brokerage.from_json(json.loads(json.dumps(brokerage.__json__()))).__json__() == brokerage.__json__()
+
+
+def test_from_json_validates():
+    record = _brokerages()[0].__json__()
+
+    with pytest.raises(TypeError):
+        Brokerage.from_json({**record, "quantity": "100"})
+
+    with pytest.raises(ValueError):
+        Brokerage.from_json({**record, "operation": "short"})
+
+
+def test_records_have_no_dict():
+    with pytest.raises(AttributeError):
+        Brokerage().extra = 1
+
+
+def test_batch_round_trip():
+    brokerages = _brokerages()
+    batch = BrokerageBatch.from_brokerages(brokerages)
+    records = [brokerage.__json__() for brokerage in brokerages]
+
+    assert len(batch) == 4
+    assert [brokerage.__json__() for brokerage in batch] == records
+    assert batch.to_records() == records
+    assert json.loads(batch.to_json()) == records
+
+    copy = BrokerageBatch()
+
+    for record in json.loads(batch.to_json()):
+        copy.append_json(record)
+
+    assert copy.to_records() == records
+
+
+def test_batch_to_json_file():
+    batch = BrokerageBatch.from_brokerages(_brokerages()[:1], source="note.pdf")
+    output = io.StringIO()
+
+    assert batch.to_json(output) is None
+    assert json.loads(output.getvalue())[0]["source"] == "note.pdf"
+
+
+def test_batch_to_csv():
+    batch = BrokerageBatch(with_source=True)
+    brokerages = _brokerages()
+    batch.extend(brokerages[:2], "a.pdf")
+    batch.extend(brokerages[2:], "b.pdf")
+    output = io.StringIO(newline="")
+    batch.to_csv(output)
+
+    assert output.getvalue().splitlines() == [
+        "date,stock_symbol,quantity,price,operation,fee,ir,broker,note_id,source",
+        "2024-03-15,VALE3,100,61.5,sell,1.25,0.31,rico,123456,a.pdf",
+        "2024-03-15,PETR4,10,38.02,buy,0.12,,rico,123456,a.pdf",
+        "2024-03-18,ITUB4,10,38.02,buy,0.0,,rico,123457,b.pdf",
+        ",,,,,,,,,b.pdf",
+    ]
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+
+    assert [row["stock_symbol"] for row in rows] == ["VALE3", "PETR4", "ITUB4", ""]
@@ -0,0 +1,90 @@
+import pytest
+
+from abstract.fee_scanner import FeeScanner
+from extractors.nuinvest import Nuinvest
+from extractors.rico import Rico
+
+RICO_FEES = """Resumo dos Negócios Resumo Financeiro
+Vendas à vista 93.621,10 Clearing
+Taxa de liquidação 35,14 D
+Taxa de Registro 7,03 D
+Taxa de termo/opções 0,00
+Taxa A.N.A. 0,00
+Emolumentos 7,02 D
+Taxa Operacional 0,00 D
+Execução 0,00
+Taxa de Custódia 1,50
+Impostos 0,00
+I.R.R.F. s/ operações, base R$93.621,10 4,68
+Outros 0,10 C"""
+
+NUINVEST_FEES = """RReessuummoo ddooss NNeeggóócciiooss
+Vendas à vista 93.621,10
+Taxa de liquidação 35,14
+Taxa de Registro 7,03
+Taxa de Termo / Opções 0,00
+Taxa A.N.A 0,00
+Emolumentos 7,02
+Corretagem 2,50
+ISS 0,25
+I.R.R.F. s/ operações 93.621,10 4,68
+Outras 0,00"""
+
+
+def _extractor(extractor_class, text: str):
+    # Parsed from the text alone, as the fee summary does not need the PDF
+    extractor = extractor_class.__new__(extractor_class)
+    extractor._text = text
+
+    return extractor
+
+
+@pytest.mark.parametrize("extractor_class, text, expected", [
+    (Rico, RICO_FEES, {
+        "liquidacao": 35.14, "registro": 7.03, "termo_opcoes": 0.0, "ana": 0.0, "emolumentos": 7.02,
+        "operacional": 0.0, "execucao": 0.0, "custodia": 1.5, "impostos": 0.0, "outros": 0.1, "irrf": 4.68,
+    }),
+    (Nuinvest, NUINVEST_FEES, {
+        "liquidacao": 35.14, "registro": 7.03, "termo_opcoes": 0.0, "ana": 0.0, "emolumentos": 7.02,
+        "corretagem": 2.5, "iss": 0.25, "outras": 0.0, "irrf": 4.68,
+    }),
+])
+def test_fee_breakdown(extractor_class, text, expected):
+    extractor = _extractor(extractor_class, "NOTA DE CORRETAGEM\n" + text)
+
+    assert extractor._get_fee_breakdown() == expected
+    assert extractor._get_taxes() == [pytest.approx(sum(expected.values()) - expected["irrf"]), 4.68]
+
+
+def test_irrf_is_the_last_number_of_its_line():
+    scanner = FeeScanner({"emolumentos": r"Emolumentos"})
+
+    assert scanner.scan("I.R.R.F. s/ operações, base R$1.234,56 0,06\nEmolumentos 1,00 2,00") == {"irrf": 0.06, "emolumentos": 1.0}
+    assert scanner.scan("I.R.R.F. s/ operações\n0,06") == {}
+
+
+def test_labels_are_case_insensitive_and_only_their_first_value_counts():
+    scanner = FeeScanner({"iss": r"ISS", "outras": r"Outras"})
+
+    assert scanner.scan("Iss 1,00\nOUTRAS 2,00\nISS 3,00\nOutras 4,00") == {"iss": 1.0, "outras": 2.0}
+
+
+def test_labels_without_a_value_are_skipped():
+    scanner = FeeScanner({"emolumentos": r"Emolumentos"})
+
+    assert scanner.scan("Emolumentos (ver nota)\nEmolumentos 7,02") == {"emolumentos": 7.02}
+
+
+@pytest.mark.parametrize("extractor_class, text", [(Rico, RICO_FEES), (Nuinvest, NUINVEST_FEES)])
+def test_labels_outside_the_fee_section_are_ignored(extractor_class, text):
+    body = "Emolumentos 99,99 cobrados conforme tabela\nI.R.R.F. 99,99\n"
+    extractor = _extractor(extractor_class, "NOTA DE CORRETAGEM\n" + body + text)
+    breakdown = extractor._get_fee_breakdown()
+
+    assert (breakdown["emolumentos"], breakdown["irrf"]) == (7.02, 4.68)
+
+
+def test_whole_text_is_scanned_without_a_fee_section():
+    extractor = _extractor(Rico, "NOTA DE CORRETAGEM\nEmolumentos 7,02 D\nI.R.R.F. base 100,00 0,01")
+
+    assert extractor._get_fee_breakdown() == {"emolumentos": 7.02, "irrf": 0.01}
@@ -0,0 +1,78 @@
+import concurrent.futures
+import datetime
+import itertools
+
+import pytest
+
+from abstract import extractor as extractor_module
+from abstract.extractor import _Page
+from extractors.nuinvest import Nuinvest
+from extractors.rico import Rico
+
+
+def _records(brokerages) -> list:
+    return [brokerage.__json__() for brokerage in brokerages]
+
+
+def _page(number: int, note_id: str | None, text: str) -> _Page:
+    page = _Page(number)
+    page.note_id = note_id
+    page.text = text
+
+    return page
+
+
+@pytest.mark.parametrize("extractor_class", [Rico, Nuinvest])
+def test_consolidated_files_are_split_into_notes(write_note, extractor_class):
+    path = write_note(extractor_class.__name__.lower(), notes=3, pages=2, trades=4)
+    extractor = extractor_class(path)
+    brokerages = extractor.extract()
+
+    assert len(extractor._notes) == 3
+    assert [
+        (note_id, date, len(list(trades)))
+        for (note_id, date), trades in itertools.groupby(brokerages, lambda brokerage: (brokerage.note_id, brokerage.date))
+    ] == [
+        ("123456", datetime.date(2024, 3, 1), 4),
+        ("123457", datetime.date(2024, 3, 2), 4),
+        ("123458", datetime.date(2024, 3, 3), 4),
+    ]
+
+
+def test_pages_without_a_note_id_belong_to_the_note_before_them(monkeypatch):
+    pages = [
+        _page(0, None, "cover"),
+        _page(1, "1", "first"),
+        _page(2, None, "terms"),
+        _page(3, "1", "first, continued"),
+        _page(4, "2", "second"),
+        _page(5, None, "terms"),
+    ]
+    extractor = Rico.__new__(Rico)
+    extractor._page_cache = None
+    monkeypatch.setattr(extractor, "_read_all_pages", lambda path, password: pages)
+
+    assert extractor._read_notes("notes.pdf", None) == [
+        ("cover\nfirst\nterms\nfirst, continued\n", None),
+        ("second\nterms\n", None),
+    ]
+
+
+@pytest.mark.parametrize("extractor_class", [Rico, Nuinvest])
+def test_large_files_are_read_in_parallel(write_note, monkeypatch, extractor_class):
+    path = write_note(extractor_class.__name__.lower(), notes=3, pages=2, trades=4)
+    records = _records(extractor_class(path).extract())
+    pools = []
+
+    class CountingPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, max_workers: int) -> None:
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    # Six pages of two per process, on a machine of four CPUs
+    monkeypatch.setattr(extractor_class, "PARALLEL_PAGES", 2)
+    monkeypatch.setattr(extractor_module.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", CountingPool)
+
+    assert _records(extractor_class(path).extract()) == records
+    assert pools == [3]
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from abstract.text_backends import PdfplumberBackend
+from cache import page_cache
+from cache.page_cache import PageCache
+from extractors.nuinvest import Nuinvest
+from extractors.rico import Rico
+
+
+@pytest.fixture
+def cache():
+    return PageCache()
+
+
+def _unreadable(*args, **kwargs):
+    raise AssertionError("the PDF was opened")
+
+
+def _records(extractor) -> list:
+    return [brokerage.__json__() for brokerage in extractor.extract()]
+
+
+def test_pages_are_stored_compressed(cache):
+    pages = [[0, "123456", "Negócios realizados\n" * 200, True, None]]
+    cache.set_pages("key", pages)
+
+    assert cache.get_pages("key") == pages
+    assert cache.get_pages("other") is None
+    assert cache.stats()["bytes"] < len(json.dumps(pages)) / 10
+
+
+def test_keys_hold_the_library_versions(cache, monkeypatch):
+    key = cache.make_key("pdfplumber", "signature", "ab" * 32)
+    monkeypatch.setattr(page_cache, "library_versions", lambda: "pdfplumber-next,pdfminer.six-next")
+
+    assert cache.make_key("pdfplumber", "signature", "ab" * 32) != key
+    assert cache.make_key("pdfminer", "signature", "ab" * 32) != cache.make_key("pdfplumber", "signature", "ab" * 32)
+
+
+@pytest.mark.parametrize("extractor_class", [Rico, Nuinvest])
+def test_cached_pages_skip_reading_the_pdf(write_note, cache, monkeypatch, extractor_class):
+    path = write_note(extractor_class.__name__.lower(), notes=2)
+    records = _records(extractor_class(path, page_cache=cache))
+    monkeypatch.setattr(PdfplumberBackend, "open", _unreadable)
+    # A parsing fix does not change what is read from the pages
+    monkeypatch.setattr(extractor_class, "VERSION", extractor_class.VERSION + "-next")
+
+    assert _records(extractor_class(path, page_cache=cache)) == records
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("setting, value", [("PAGES_VERSION", "next"), ("TABLE_MARKER", "Negócios")])
+def test_page_reading_changes_invalidate_pages(write_note, cache, monkeypatch, setting, value):
+    path = write_note("rico")
+    records = _records(Rico(path, page_cache=cache))
+    signature = Rico._pages_signature()
+    monkeypatch.setattr(Rico, setting, value)
+
+    assert Rico._pages_signature() != signature
+    assert _records(Rico(path, page_cache=cache)) == records
+    assert len(cache) == 2
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import stat
+
+import pytest
+
+from abstract import passwords, profiler
+from abstract.exceptions import PDFPasswordError
+from abstract.passwords import iter_candidates, resolve_password
+from abstract.sources import as_source
+from cache.password_cache import PasswordCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PasswordCache(str(tmp_path / "passwords.sqlite3"))
+
+
+def _resolve(path, candidates, cache) -> tuple:
+    """Resolves the password of a file, returning it with the profiler counters."""
+    with profiler.profile() as resolve_profiler:
+        password = resolve_password(path, candidates, cache)
+
+    return password, resolve_profiler.stats()["counters"]
+
+
+def test_candidates():
+    assert iter_candidates("note.pdf", None) == []
+    assert iter_candidates("note.pdf", "1234") == ["1234"]
+    assert iter_candidates("note.pdf", ("123", None, "1234")) == ["123", "1234"]
+    assert iter_candidates("note.pdf", lambda path: [path[:4], None]) == ["note"]
+
+
+def test_unencrypted_files_need_no_password(write_note, cache):
+    assert _resolve(write_note("rico"), ["1234"], cache) == (None, {})
+    assert len(cache) == 0
+
+
+def test_wrong_passwords(write_note, cache):
+    path = write_note("rico", password="1234")
+
+    with pytest.raises(PDFPasswordError):
+        resolve_password(path, ["0000", "4321"], cache)
+
+    with pytest.raises(PDFPasswordError):
+        resolve_password(path, None, cache)
+
+    assert len(cache) == 0
+
+
+def test_the_candidate_opening_the_file_is_found(write_note, cache):
+    path = write_note("nuinvest", password="1234")
+
+    # The empty password is tried before the candidates
+    assert _resolve(path, ["000", "123", "1234", "12345"], cache) == ("1234", {"password_attempts": 4})
+
+
+def test_remembered_passwords_are_picked_without_attempts(write_note, cache, monkeypatch):
+    path = write_note("rico", password="1234")
+    resolve_password(path, ["0000", "1234"], cache)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(passwords, "check_password", pytest.fail)
+
+        assert _resolve(path, ["0000", "1234"], cache) == ("1234", {"password_cache_hits": 1})
+
+    # The remembered password is only picked when it is among the candidates
+    with pytest.raises(PDFPasswordError):
+        resolve_password(path, ["0000"], cache)
+
+
+def test_passwords_are_stored_keyed(write_note, cache, tmp_path):
+    path = write_note("rico", password="1234")
+    resolve_password(path, ["1234"], cache)
+    digest = as_source(path).digest()
+    fingerprint = cache.lookup(digest)
+
+    assert "1234" not in fingerprint
+    # Not the salted hash of the password, which the file hash alone would let anyone test candidates against
+    assert fingerprint != hashlib.sha256(f"{digest}:1234".encode("utf-8")).hexdigest()
+    assert fingerprint == cache.fingerprint(digest, "1234")
+    assert stat.S_IMODE(os.stat(tmp_path / "passwords.key").st_mode) == 0o600
+
+    # Another key recognizes none of the passwords remembered with the first one
+    other = PasswordCache(cache.path, key_path=str(tmp_path / "other.key"))
+
+    assert other.fingerprint(digest, "1234") != fingerprint
+    assert _resolve(path, ["1234"], other) == ("1234", {"password_attempts": 2})
+
+
+def test_the_key_is_shared_by_the_caches_of_a_directory(tmp_path):
+    first = PasswordCache(str(tmp_path / "passwords.sqlite3"))
+    second = PasswordCache(str(tmp_path / "passwords.sqlite3"))
+
+    assert first.fingerprint("digest", "1234") == second.fingerprint("digest", "1234")
+    assert len((tmp_path / "passwords.key").read_bytes()) == 32
+    # Without leaving the temporary file the key was written to
+    assert os.listdir(tmp_path) == ["passwords.key"]
@@ -0,0 +1,62 @@
+import pytest
+
+import main
+from benchmarks.synthetic import write_pdf
+from cache.result_cache import ResultCache
+from extractors import registry
+from extractors.registry import AUTO, detect_broker, register_extractor, resolve_broker
+from extractors.rico import Rico
+
+
+def _records(brokerages) -> list:
+    return [brokerage.__json__() for brokerage in brokerages]
+
+
+@pytest.mark.parametrize("broker", ["rico", "nuinvest"])
+def test_brokers_are_detected(write_note, broker):
+    path = write_note(broker)
+
+    assert detect_broker(path) == broker
+    assert resolve_broker(AUTO, path) == broker
+    assert resolve_broker("rico", path) == "rico"
+
+
+def test_encrypted_notes_are_detected(write_note):
+    assert detect_broker(write_note("nuinvest", password="1234"), ["0000", "1234"]) == "nuinvest"
+
+
+def test_ties_are_not_guessed(write_note, monkeypatch):
+    class Copy(Rico):
+        pass
+
+    monkeypatch.setitem(registry.EXTRACTORS, "copy", Copy)
+
+    with pytest.raises(ValueError, match="rico, copy"):
+        detect_broker(write_note("rico"))
+
+
+def test_unknown_notes_are_not_guessed(tmp_path):
+    path = str(tmp_path / "letter.pdf")
+    write_pdf(path, [["Dear investor,", "your statement is attached."]])
+
+    with pytest.raises(ValueError, match="pass it explicitly"):
+        detect_broker(path)
+
+
+def test_auto_is_reserved():
+    with pytest.raises(ValueError):
+        register_extractor(AUTO, Rico)
+
+
+def test_auto_extraction_matches_the_broker(write_note, monkeypatch):
+    path = write_note("rico", notes=2)
+    records = _records(main.get_brokerages_data("rico", path))
+    cache = ResultCache()
+
+    assert _records(main.get_brokerages_data(AUTO, path)) == records
+    assert _records(main.get_brokerages_data(AUTO, path, cache=cache)) == records
+
+    # The broker of a file extracted before is looked up by its content
+    monkeypatch.setattr(registry, "detect_broker", pytest.fail)
+
+    assert _records(main.get_brokerages_data(AUTO, path, cache=cache)) == records
@@ -0,0 +1,79 @@
+import hashlib
+
+import pytest
+
+import main
+from abstract.sources import as_source
+from cache.result_cache import ResultCache, hash_file
+from extractors.rico import Rico
+
+
+@pytest.fixture
+def cache():
+    return ResultCache()
+
+
+def _unreadable(*args, **kwargs):
+    raise AssertionError("the PDF was opened")
+
+
+def test_hash_file_matches_the_source_digest(write_note):
+    path = write_note("rico")
+
+    with open(path, "rb") as fp:
+        expected = hashlib.sha256(fp.read()).hexdigest()
+
+    assert hash_file(path, chunk_size=1000) == expected == as_source(path).digest()
+
+
+def test_keys_hold_the_broker_and_version(cache):
+    keys = {cache.make_key(broker, version, "ab" * 32) for broker in ("rico", "nuinvest") for version in ("1", "2")}
+
+    assert len(keys) == 4
+
+
+def test_results_round_trip(cache):
+    records = [{"date": "2024-03-15", "stock_symbol": "VALE3", "quantity": 10}]
+    cache.set_result("key", records)
+
+    assert cache.get_result("key") == records
+    assert cache.get_result("other") is None
+
+
+def test_extracted_files_are_answered_from_the_cache(write_note, cache, monkeypatch):
+    path = write_note("rico")
+    extracted = main.get_brokerages_data("rico", path, cache=cache)
+    monkeypatch.setattr(main, "get_extractor", _unreadable)
+    cached = main.get_brokerages_data("rico", path, cache=cache)
+
+    assert [brokerage.__json__() for brokerage in cached] == [brokerage.__json__() for brokerage in extracted]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_version_bump_invalidates_results(write_note, cache, monkeypatch):
+    path = write_note("rico")
+    main.get_brokerages_data("rico", path, cache=cache)
+    monkeypatch.setattr(Rico, "VERSION", Rico.VERSION + "-next")
+    opened = []
+    extractor = main.get_extractor
+
+    def get_extractor(broker, *args, **kwargs):
+        opened.append(broker)
+        return extractor(broker, *args, **kwargs)
+
+    monkeypatch.setattr(main, "get_extractor", get_extractor)
+
+    assert len(main.get_brokerages_data("rico", path, cache=cache)) == 10
+    assert opened == ["rico"]
+    assert len(cache) == 2
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "results.sqlite3"), max_entries=None, max_bytes=1000)
+
+    for number in range(20):
+        cache.set_result(str(number), [{"value": "x" * 80}])
+
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get_result("19") is not None
+    assert cache.get_result("0") is None
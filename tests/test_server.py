@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from abstract.exceptions import PDFCorruptError, PDFPasswordError, RemoteExtractionError
+from pipeline.server import INVALID_PARAMS, ExtractionServer, call, remote_error
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def address(tmp_path):
+    address = f"unix:{tmp_path / 'server.sock'}"
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "serve", address, "--workers", "1", "--timeout", "30"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+
+    while True:
+        try:
+            call(address, "ping", timeout=5)
+            break
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise
+
+            time.sleep(0.05)
+
+    yield address
+
+    server.terminate()
+    server.wait(10)
+
+
+def _run(*args) -> tuple:
+    process = subprocess.run([sys.executable, "main.py", *args], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+    return process.returncode, json.loads(process.stdout)
+
+
+def test_extract(address, write_note):
+    path = write_note("nuinvest")
+    data = call(address, "extract", {"path": path})
+
+    assert len(data) == 10
+    assert data[0]["broker"] == "nuinvest"
+
+
+def test_errors_keep_their_type(address, write_note, tmp_path):
+    encrypted = write_note("nuinvest", password="1234")
+    damaged = tmp_path / "damaged.pdf"
+    damaged.write_bytes(b"%PDF-1.4 not really")
+
+    with pytest.raises(PDFPasswordError):
+        call(address, "extract", {"broker": "nuinvest", "path": encrypted})
+
+    with pytest.raises(PDFCorruptError):
+        call(address, "extract", {"broker": "nuinvest", "path": str(damaged)})
+
+    with pytest.raises(RemoteExtractionError) as error:
+        call(address, "extract", {"broker": 1, "path": encrypted})
+
+    assert error.value.code == INVALID_PARAMS
+
+    assert len(call(address, "extract", {"broker": "nuinvest", "path": encrypted, "password": ["0000", "1234"]})) == 10
+
+
+def test_client_reports_the_server_error_type(address, write_note):
+    returncode, output = _run("nuinvest", write_note("nuinvest", password="1234"), "--server", address)
+
+    assert returncode == 1
+    assert output["error"]["type"] == "PDFPasswordError"
+
+
+def test_unknown_error_types_keep_their_name():
+    error = remote_error({"code": -32000, "message": "Error", "data": {"type": "ZeroDivisionError", "exception": "division by zero"}})
+
+    assert isinstance(error, RemoteExtractionError)
+    assert (str(error), error.remote_type) == ("division by zero", "ZeroDivisionError")
+
+
+def test_clients_can_skip_the_cache():
+    server = ExtractionServer(workers=1)
+
+    assert server._make_task({"path": "note.pdf"})[3] is True
+    assert server._make_task({"path": "note.pdf", "cache": False})[3] is False
+
+    with pytest.raises(TypeError):
+        server._make_task({"path": "note.pdf", "cache": "no"})
+
+    # Nor can they use the cache of a server run with --no-cache
+    assert ExtractionServer(workers=1, use_cache=False)._make_task({"path": "note.pdf", "cache": True})[3] is False
+
+
+def test_client_forwards_no_cache(monkeypatch):
+    import main
+
+    sent = []
+
+    def fake_call(address, method, params):
+        sent.append(params)
+        return []
+
+    monkeypatch.setattr("pipeline.server.call", fake_call)
+    main.request_brokerages_data("unix:/nowhere", "nuinvest", "note.pdf", use_cache=False)
+
+    assert sent == [{"broker": "nuinvest", "password": None, "cache": False, "path": os.path.abspath("note.pdf")}]
@@ -0,0 +1,156 @@
+import io
+import mmap
+import os
+import threading
+
+import pytest
+
+from abstract import sources
+from abstract.sources import MMAP_THRESHOLD, MemoryStream, PdfSource, as_source
+from cache.result_cache import hash_file
+from extractors.rico import Rico
+
+
+@pytest.fixture
+def note(write_note):
+    return write_note("rico", notes=2, trades=3)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _records(source) -> list:
+    return [brokerage.__json__() for brokerage in Rico(source).extract()]
+
+
+def _pipe(data: bytes):
+    """Returns the read end of a pipe `data` is written to, which cannot seek."""
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with os.fdopen(write_fd, "wb") as file:
+            file.write(data)
+
+    threading.Thread(target=write, daemon=True).start()
+
+    return os.fdopen(read_fd, "rb")
+
+
+def test_memory_stream():
+    stream = MemoryStream(memoryview(b"0123456789"))
+    buffer = bytearray(3)
+
+    assert stream.read(4) == b"0123"
+    assert (stream.seek(2, io.SEEK_CUR), stream.read(2)) == (6, b"67")
+    assert (stream.seek(-3, io.SEEK_END), stream.read()) == (7, b"789")
+    assert stream.read(1) == b""
+
+    stream.seek(1)
+
+    assert (stream.readinto(buffer), bytes(buffer)) == (3, b"123")
+    assert stream.seek(20) == 20 and stream.read() == b""
+
+    with pytest.raises(ValueError):
+        stream.seek(-1)
+
+
+def test_every_source_reads_the_same_notes(note):
+    data = _read(note)
+    records = _records(note)
+
+    assert len(records) == 6
+
+    for source in (data, bytearray(data), memoryview(data)):
+        assert _records(source) == records
+
+    with open(note, "rb") as file:
+        assert _records(file) == records
+
+    with _pipe(data) as pipe:
+        assert _records(pipe) == records
+
+
+def test_seekable_files_are_rewound_to_where_they_started(note):
+    data = _read(note)
+    file = io.BytesIO(b"preamble" + data)
+    file.seek(len(b"preamble"))
+    source = PdfSource(file)
+
+    for _ in range(2):
+        with source.open() as stream:
+            assert stream.read() == data
+
+        file.seek(0, io.SEEK_END)
+
+    assert _records(source) == _records(note)
+    # File objects are left open for their owner to close
+    assert not file.closed
+
+
+def test_pipes_are_read_once(note):
+    data = _read(note)
+
+    with _pipe(data) as pipe:
+        source = PdfSource(pipe)
+
+        assert pipe.read() == b""
+
+    for _ in range(2):
+        with source.open() as stream:
+            assert stream.read() == data
+
+
+def test_large_files_are_memory_mapped(tmp_path):
+    large = tmp_path / "large.pdf"
+    large.write_bytes(b"%PDF" + bytes(MMAP_THRESHOLD - 4))
+    small = tmp_path / "small.pdf"
+    small.write_bytes(b"%PDF" + bytes(MMAP_THRESHOLD - 5))
+
+    with PdfSource(str(large)).open() as stream:
+        assert isinstance(stream, mmap.mmap)
+        assert stream[:4] == b"%PDF"
+
+    with open(large, "rb") as file, PdfSource(file).open() as stream:
+        assert isinstance(stream, mmap.mmap)
+
+    with PdfSource(str(small)).open() as stream:
+        assert not isinstance(stream, mmap.mmap)
+
+
+def test_mapped_files_read_the_same_notes(note, monkeypatch):
+    records = _records(note)
+    monkeypatch.setattr(sources, "MMAP_THRESHOLD", 1024)
+
+    with PdfSource(note).open() as stream:
+        assert isinstance(stream, mmap.mmap)
+
+    assert _records(note) == records
+
+    with open(note, "rb") as file:
+        assert _records(file) == records
+
+
+def test_digests_do_not_depend_on_the_source(note):
+    data = _read(note)
+    digest = hash_file(note)
+    file = io.BytesIO(b"preamble" + data)
+    file.seek(len(b"preamble"))
+
+    with open(note, "rb") as disk_file, _pipe(data) as pipe:
+        for source in (note, data, bytearray(data), memoryview(data), disk_file, file, pipe):
+            assert as_source(source).digest() == digest
+
+
+def test_names():
+    assert PdfSource("notes/march.pdf").name == "notes/march.pdf"
+    assert PdfSource(b"%PDF").name == "<memory>"
+    assert PdfSource(b"%PDF", "upload.pdf").name == "upload.pdf"
+
+    source = PdfSource(b"%PDF")
+
+    assert as_source(source) is source
+
+    with pytest.raises(TypeError):
+        PdfSource(1234)
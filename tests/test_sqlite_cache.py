@@ -0,0 +1,189 @@
+import io
+import types
+
+import pytest
+
+from cache import sqlite_cache
+from cache.sqlite_cache import MISSING, SQLiteCache
+from cache.ticker_cache import TickerCache
+
+
+class Clock:
+    """Stands in for the time module of the cache, so access times are set by the tests."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class CountingCache(SQLiteCache):
+    PERSIST_STATS = True
+    STATS_BATCH = 3
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sqlite_cache, "time", types.SimpleNamespace(time=clock.time))
+
+    return clock
+
+
+def _usage(cache: SQLiteCache) -> tuple:
+    conn = cache._connection()
+
+    return conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+
+def test_get_set_delete(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "1")
+    cache.set("b", None)
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") is MISSING
+    assert cache.get("c", "default") == "default"
+
+    cache.delete("a")
+
+    assert cache.get("a") is MISSING
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_entries_expire(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), ttl=10)
+    cache.set("short", "1")
+    cache.set("long", "2", ttl=100)
+    clock.now += 50
+
+    assert cache.get("short") is MISSING
+    assert cache.get("long") == "2"
+    assert [key for key, _, _ in cache.items()] == ["long"]
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_entries=10)
+    cache.TOUCH_INTERVAL = 0
+
+    for number in range(10):
+        cache.set(str(number), "x")
+        clock.now += 1
+
+    # Entry 0 becomes the most recently used, so 1 and 2 go first
+    cache.get("0")
+    clock.now += 1
+    cache.set("10", "x")
+
+    # Shrunk to EVICT_TO of the limit at once, instead of one entry per write
+    assert sorted(key for key, _, _ in cache.items()) == ["0", "10", "3", "4", "5", "6", "7", "8", "9"]
+    assert len(cache) == 9
+
+
+def test_evicts_by_size(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=100)
+
+    for number in range(5):
+        cache.set(str(number), "x" * 20)
+        clock.now += 1
+
+    assert len(cache) == 5
+
+    cache.set("big", "x" * 30)
+
+    # 130 bytes are brought back to 90 by dropping the oldest entries
+    assert [key for key, _, _ in cache.items()] == ["2", "3", "4", "big"]
+    assert cache.stats()["bytes"] == 90
+
+
+def test_usage_follows_replaced_expired_and_cleared_entries(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_entries=1000)
+    cache.set("a", "12345")
+    cache.set("a", "12")
+    cache.set("b", "123", ttl=1)
+    clock.now += 2
+    cache.get("b")
+    cache.set("c", b"\x00" * 4)
+
+    assert (len(cache), cache.stats()["bytes"]) == _usage(cache) == (2, 6)
+
+    cache.clear()
+
+    assert (len(cache), cache.stats()["bytes"]) == _usage(cache) == (0, 0)
+
+
+def test_hits_only_write_once_the_access_time_is_stale(tmp_path, clock):
+    cache = SQLiteCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "1")
+    conn = cache._connection()
+    changes = conn.total_changes
+
+    for _ in range(10):
+        cache.get("a")
+        clock.now += cache.TOUCH_INTERVAL / 20
+
+    assert conn.total_changes == changes
+
+    clock.now += cache.TOUCH_INTERVAL
+    cache.get("a")
+
+    assert conn.total_changes == changes + 1
+    assert conn.execute("SELECT accessed_at FROM entries").fetchone()[0] == clock.now
+
+
+def test_persisted_stats_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = CountingCache(path=path)
+    cache.set("a", "1")
+    cache.get("a")
+    cache.get("b")
+    conn = cache._connection()
+
+    assert conn.execute("SELECT COUNT(*) FROM stats").fetchone()[0] == 0
+
+    cache.get("a")
+
+    assert dict(conn.execute("SELECT name, value FROM stats")) == {"hits": 2, "misses": 1}
+
+    # Counted by every process sharing the database
+    other = CountingCache(path=path)
+    other.get("a")
+    stats = other.stats()
+
+    assert (stats["hits"], stats["total_hits"], stats["total_misses"]) == (1, 3, 1)
+
+
+def test_ticker_cache_stores_misses():
+    cache = TickerCache()
+    cache.store("VALE ON", "VALE3")
+    cache.store("SINTETICA ON", None)
+
+    assert cache.lookup(" vale   on ") == "VALE3"
+    assert cache.lookup("SINTETICA ON") is None
+    assert cache.lookup("PETROBRAS PN") is MISSING
+
+
+def test_ticker_cache_export_import_round_trip(tmp_path, clock):
+    cache = TickerCache(path=str(tmp_path / "tickers.sqlite3"))
+    cache.store("VALE ON", "VALE3")
+    cache.store("SINTETICA ON", None)
+    cache.set("EXPIRED PN", "EXPR4", ttl=-1)
+    exported = io.StringIO()
+
+    assert cache.export(exported) == 2
+
+    copy = TickerCache(path=str(tmp_path / "copy.sqlite3"))
+    exported.seek(0)
+
+    assert copy.import_(exported) == 2
+    assert list(copy.items()) == list(cache.items())
+    assert copy.lookup("SINTETICA ON") is None
+
+    # Imported entries keep their expiration, so misses are queried again as soon as the original's are
+    clock.now += TickerCache.NEGATIVE_TTL
+
+    assert copy.lookup("SINTETICA ON") is MISSING
+    assert copy.lookup("VALE ON") == "VALE3"
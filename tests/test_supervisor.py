@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+import main
+from models.brokerage import Brokerage
+from pipeline.supervisor import Limits, Supervisor, count_pages, extract_limited
+
+# The fake extraction below reaches the workers by being patched in before they are forked
+pytestmark = pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="workers are not forked")
+
+
+def _fake_extraction(broker, path, password=None, cache=None) -> list:
+    """Misbehaves as the file name says, and otherwise reports the worker process id as the note id."""
+    if path == "slow.pdf":
+        time.sleep(60)
+    elif path == "memory.pdf":
+        bytearray(4 * 1024 ** 3)
+    elif path == "killed.pdf":
+        os.kill(os.getpid(), signal.SIGKILL)
+    elif path == "crash.pdf":
+        os._exit(3)
+
+    return [Brokerage(broker=broker, note_id=str(os.getpid()))]
+
+
+@pytest.fixture
+def fake_extraction(monkeypatch):
+    monkeypatch.setattr(main, "get_brokerages_data", _fake_extraction)
+
+
+def _run(limits: Limits, *paths, workers: int = 1, password=None) -> list:
+    with Supervisor(workers, limits) as supervisor:
+        return list(supervisor.run(("rico", path, password, False, False) for path in paths))
+
+
+def _pid(result: dict) -> str:
+    return result["data"][0]["note_id"]
+
+
+def _error(result: dict) -> tuple:
+    return result["error"]["type"], result["error"]["exception"]
+
+
+def _address_space() -> int:
+    """Returns the address space of the current process, which the workers start with."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmSize:"):
+                return int(line.split()[1]) * 1024
+
+    pytest.skip("the address space is unknown")
+
+
+def test_files_past_their_deadline_are_killed(fake_extraction):
+    start = time.monotonic()
+    results = _run(Limits(timeout=1), "ok.pdf", "slow.pdf", "ok.pdf")
+
+    assert time.monotonic() - start < 10
+    assert _error(results[1]) == ("ExtractionTimeoutError", "The extraction took longer than 1 seconds.")
+    assert results[1]["path"] == "slow.pdf"
+    # The next file is extracted by a new worker
+    assert _pid(results[0]) != _pid(results[2])
+
+
+def test_files_past_the_memory_limit_fail_alone(fake_extraction):
+    memory = (_address_space() // 2 ** 20 + 512) * 2 ** 20
+    results = _run(Limits(memory=memory), "ok.pdf", "memory.pdf", "ok.pdf")
+
+    assert _error(results[1]) == (
+        "ExtractionMemoryError", f"The extraction exceeded the memory limit of {memory // 2 ** 20} MB."
+    )
+    # The worker that ran out of memory is not reused
+    assert _pid(results[0]) != _pid(results[2])
+
+
+def test_workers_that_die_are_replaced(fake_extraction):
+    results = _run(Limits(), "killed.pdf", "crash.pdf", "ok.pdf")
+
+    # SIGKILL is taken for the OOM killer
+    assert _error(results[0]) == ("ExtractionMemoryError", "The worker was killed, most likely out of memory.")
+    assert _error(results[1]) == ("WorkerCrashError", "The worker died without a result (exit code 3).")
+    assert results[2]["data"][0]["broker"] == "rico"
+
+
+def test_workers_are_recycled(fake_extraction):
+    pids = [_pid(result) for result in _run(Limits(files_per_worker=2), *["ok.pdf"] * 5)]
+
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert len({_pid(result) for result in _run(Limits(), *["ok.pdf"] * 5)}) == 1
+
+
+def test_results_keep_the_task_order(fake_extraction):
+    results = _run(Limits(timeout=1), "slow.pdf", "ok.pdf", "crash.pdf", "ok.pdf", workers=2)
+
+    assert [result["path"] for result in results] == ["slow.pdf", "ok.pdf", "crash.pdf", "ok.pdf"]
+    assert [result.get("error", {}).get("type") for result in results] == ["ExtractionTimeoutError", None, "WorkerCrashError", None]
+
+
+def test_page_ceiling(write_note):
+    path = write_note("rico", pages=3, password="1234")
+    task = ("rico", path, "1234", False, False)
+
+    assert count_pages(path, "1234") == 3
+    assert _error(extract_limited(task, 2)) == ("PDFTooManyPagesError", "The PDF has 3 pages, more than the 2 allowed.")
+    assert len(extract_limited(task, 3)["data"]) == 10
+
+    results = _run(Limits(pages=2), path, write_note("rico", "short.pdf", password="1234"), password="1234")
+
+    assert results[0]["error"]["type"] == "PDFTooManyPagesError"
+    assert (results[0]["path"], len(results[1]["data"])) == (path, 10)
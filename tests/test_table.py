@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+import pytest
+
+from abstract.table import Glyphs, TableLayout, parse_decimal, parse_integer, read_table
+from benchmarks.synthetic import TABLE_COLUMNS, make_note_pages, write_pdf
+from extractors.nuinvest import Nuinvest
+from extractors.rico import Rico
+
+# Width of every character drawn by `_draw`, close to Helvetica's at the size of the notes
+CHAR_WIDTH = 3.5
+
+END_MARKERS = ["ResumodosNegócios"]
+
+
+def _draw(glyphs: Glyphs, text: str, x: float, y: float, right: bool = False) -> None:
+    """Draws a string starting at `x`, or ending at `x` when right-aligned."""
+    if right:
+        x -= len(text) * CHAR_WIDTH
+
+    for number, char in enumerate(text):
+        glyphs.append(char, x + number * CHAR_WIDTH, x + (number + 1) * CHAR_WIDTH, y)
+
+
+def _page(broker: str, rows: list) -> Glyphs:
+    """
+    Draws a trades table with the header labels at the positions of the synthetic notes.
+
+    Cells of the columns in `right` are right-aligned to the end of their label, as numbers are
+    printed on the real notes, and the others start at their label.
+    """
+    glyphs = Glyphs()
+    columns = TABLE_COLUMNS[broker]
+    right = {"Quantidade", "Preço / Ajuste", "Valor Operação / Ajuste", "Valor / Ajuste"}
+    y = 700
+
+    _draw(glyphs, "Negócios realizados", 30, y + 12)
+
+    for label, x in columns:
+        _draw(glyphs, label, x, y)
+
+    for row in rows:
+        y -= 12
+
+        for (label, x), text in zip(columns, row):
+            if label in right:
+                _draw(glyphs, text, x + len(label) * CHAR_WIDTH, y, right=True)
+            elif text:
+                _draw(glyphs, text, x, y)
+
+    _draw(glyphs, "Resumo dos Negócios", 30, y - 12)
+    _draw(glyphs, "Taxa de liquidação 1,00", 30, y - 24)
+
+    return glyphs
+
+
+@pytest.fixture(autouse=True)
+def layouts(monkeypatch):
+    monkeypatch.setattr(TableLayout, "_cache", OrderedDict())
+
+    return TableLayout._cache
+
+
+def test_rico_cells():
+    glyphs = _page("rico", [
+        ["", "1-BOVESPA", "C", "VISTA", "", "3R PETROLEUM ON NM", "", "1.000", "12,50", "12.500,00", "D"],
+        ["", "1-BOVESPA", "V", "FRACIONARIO", "", "B3 ON NM", "#", "30", "11,20", "336,00", "C"],
+    ])
+
+    assert read_table(glyphs, Rico.TABLE_COLUMNS, END_MARKERS) == [
+        {
+            "q": "", "market": "1-BOVESPA", "operation": "C", "market_type": "VISTA", "term": "",
+            "title": "3R PETROLEUM ON NM", "notes": "", "quantity": "1.000", "price": "12,50", "value": "12.500,00", "side": "D",
+        },
+        {
+            "q": "", "market": "1-BOVESPA", "operation": "V", "market_type": "FRACIONARIO", "term": "",
+            "title": "B3 ON NM", "notes": "#", "quantity": "30", "price": "11,20", "value": "336,00", "side": "C",
+        },
+    ]
+
+
+def test_nuinvest_cells():
+    glyphs = _page("nuinvest", [
+        ["BOVESPA", "C", "VISTA", "RRRP3", "3R PETROLEUM ON NM", "1.000", "12,50", "12.500,00", "D"],
+        ["BOVESPA", "V", "FRACIONARIO", "B3SA3F", "B3 ON NM", "30", "11,20", "336,00", "C"],
+    ])
+
+    rows = read_table(glyphs, Nuinvest.TABLE_COLUMNS, END_MARKERS)
+
+    assert [(row["code"], row["title"], row["quantity"], row["price"], row["value"]) for row in rows] == [
+        ("RRRP3", "3R PETROLEUM ON NM", "1.000", "12,50", "12.500,00"),
+        ("B3SA3F", "B3 ON NM", "30", "11,20", "336,00"),
+    ]
+
+
+def test_rows_parse_into_trades():
+    glyphs = _page("rico", [["", "1-BOVESPA", "C", "VISTA", "", "3R PETROLEUM ON NM", "", "1.000", "12,50", "12.500,00", "D"]])
+    rico = Rico.__new__(Rico)
+    stock_name, brokerage = rico._extract_brokerage_note_from_cells(read_table(glyphs, Rico.TABLE_COLUMNS)[0])
+
+    assert stock_name == "3R PETROLEUM ON NM"
+    assert (brokerage.quantity, brokerage.price, brokerage.operation) == (1000, 12.5, "buy")
+
+
+def test_table_without_header():
+    glyphs = Glyphs()
+    _draw(glyphs, "Quantidade Preço", 30, 700)
+
+    assert read_table(glyphs, Rico.TABLE_COLUMNS) is None
+
+
+def test_table_ends_at_the_end_markers():
+    glyphs = _page("rico", [["", "1-BOVESPA", "C", "VISTA", "", "VALE ON NM", "", "100", "61,50", "6.150,00", "D"]])
+
+    assert len(read_table(glyphs, Rico.TABLE_COLUMNS, END_MARKERS)) == 1
+    # Without markers every row below the header is read, fee summary included
+    assert len(read_table(glyphs, Rico.TABLE_COLUMNS)) == 3
+
+
+def test_layouts_are_bounded(layouts, monkeypatch):
+    monkeypatch.setattr(TableLayout, "MAX_LAYOUTS", 2)
+    columns = (("a", "Quantidade"), ("b", "Preço"))
+    learned = []
+
+    for x in (30, 60, 90, 30):
+        glyphs = Glyphs()
+        _draw(glyphs, "Quantidade", x, 700)
+        _draw(glyphs, "Preço", x + 50, 700)
+        learned.append(TableLayout.learn(glyphs, glyphs.rows()[0], columns))
+
+    assert [layout.boundaries for layout in learned] == [[80], [110], [140], [80]]
+    # The first layout was dropped when the third was learned
+    assert learned[3] is not learned[0]
+    assert len(layouts) == 2
+
+
+@pytest.mark.parametrize("extractor_class", [Rico, Nuinvest])
+def test_stock_names_with_digits_end_to_end(tmp_path, extractor_class):
+    broker = extractor_class.__name__.lower()
+    trades = [
+        ("RRRP3", "3R PETROLEUM ON NM", "C", "VISTA", 300, 12.5),
+        ("B3SA3", "B3 ON NM", "V", "FRACIONARIO", 30, 11.2),
+    ]
+    path = str(tmp_path / "note.pdf")
+    write_pdf(path, make_note_pages(broker, trades))
+
+    brokerages = extractor_class(path).extract()
+
+    assert [(brokerage.stock_symbol, brokerage.quantity, brokerage.price) for brokerage in brokerages] == [
+        ("RRRP3", 300, 12.5),
+        ("B3SA3", 30, 11.2),
+    ]
+
+
+def test_parse_numbers():
+    assert parse_integer("1.000") == 1000
+    assert parse_integer("") is None
+    assert parse_decimal("12.500,00") == 12500.0
+    assert parse_decimal("-0,5") == -0.5
+    assert parse_decimal("12,50 D") is None
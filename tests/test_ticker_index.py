@@ -0,0 +1,54 @@
+import pytest
+
+from resolvers.ticker_index import TickerIndex, default_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    return default_index()
+
+
+@pytest.mark.parametrize("stock_name, ticker", [
+    ("VALE ON NM", "VALE3"),
+    ("PETROBRAS PN N2", "PETR4"),
+    ("ITAUUNIBANCO PN N1", "ITUB4"),
+    ("TELEF BRASIL ON", "VIVT3"),
+    ("Petrobras pn", "PETR4"),
+])
+def test_lookup_indexed_names(index, stock_name, ticker):
+    assert index.lookup(stock_name) == ticker
+
+
+def test_lookup_truncated_issuer(index):
+    assert index.lookup("ITAUUNIB PN") == "ITUB4"
+
+
+def test_lookup_single_class_issuer_without_class(index):
+    assert index.lookup("VALE") == "VALE3"
+
+
+def test_lookup_multi_class_issuer_without_class_is_ambiguous(index):
+    assert index.lookup("BRADESCO") is None
+
+
+def test_lookup_class_missing_from_index_is_not_guessed(index):
+    # BRASIL only lists BBAS3, so BBAS4 must come from the network resolver, if it exists
+    assert index.lookup("BRASIL PN") is None
+
+
+def test_lookup_unknown_issuer(index):
+    assert index.lookup("NONEXISTENT CO ON") is None
+
+
+def test_split_name_drops_governance_segment():
+    index = TickerIndex([])
+
+    assert index.split_name("BRADESCO PN N1") == ("BRADESCO", "PN")
+    assert index.split_name("ENERGISA UNT N2") == ("ENERGISA", "UNT")
+    assert index.split_name("NO CLASS") == ("NO CLASS", None)
+
+
+def test_lookup_normalizes_accents_and_punctuation():
+    index = TickerIndex([("ABCD3", "AÇÚCAR S/A", "ON")])
+
+    assert index.lookup("ACUCAR S A ON") == "ABCD3"
@@ -0,0 +1,64 @@
+from abstract import tokenizer
+from abstract.tokenizer import NoteGrammar, Token
+from extractors.rico import Rico
+
+RICO_NOTE = """NOTA DE CORRETAGEM
+Nr. nota Folha Data pregão
+123456 1 01/03/2024
+Cliente: 000000 INVESTIDOR
+Negócios realizados
+Q Negociação C/V Tipo mercado Prazo Especificação do título Obs. (*) Quantidade Preço / Ajuste Valor Operação / Ajuste D/C
+1-BOVESPA V FRACIONARIO SANEPAR PN N1 10 31,81 318,10 C
+1-BOVESPA C VISTA ISHARES SMAL CI N1 1000 43,61 43.610,00 D
+Resumo dos Negócios Resumo Financeiro
+Taxa de liquidação 35,14 D
+Nr. nota 999999 Data pregão 02/03/2024"""
+
+
+def test_rico_note_events():
+    tokens = list(Rico._get_grammar().tokenize(RICO_NOTE))
+
+    assert tokens == [
+        Token(tokenizer.NOTE_HEADER, 1, "Nr. nota Folha Data pregão"),
+        Token(tokenizer.DATE, 2, "01/03/2024"),
+        Token(tokenizer.NOTE_ID, 2, "123456"),
+        Token(tokenizer.TRADE_ROW, 6, "1-BOVESPA V FRACIONARIO SANEPAR PN N1 10 31,81 318,10 C"),
+        Token(tokenizer.TRADE_ROW, 7, "1-BOVESPA C VISTA ISHARES SMAL CI N1 1000 43,61 43.610,00 D"),
+        Token(tokenizer.SECTION_END, 8, "Resumo dos Negócios Resumo Financeiro"),
+        Token(tokenizer.FEE_ROW, 8, "Resumo dos Negócios Resumo Financeiro"),
+        Token(tokenizer.FEE_ROW, 9, "Taxa de liquidação 35,14 D"),
+        # The labels of the fee section are no longer looked for once the header values were found
+        Token(tokenizer.FEE_ROW, 10, "Nr. nota 999999 Data pregão 02/03/2024"),
+    ]
+
+
+def test_values_on_the_label_line():
+    grammar = NoteGrammar(date_label="Data Pregão", note_id_label="Número da nota", note_id_pattern=r"\d{5,}")
+    text = "Número da nota 1 de 2 12345678\nData Pregão 15/03/2024 e 16/03/2024"
+
+    assert grammar.find(text, tokenizer.NOTE_ID) == "12345678"
+    assert grammar.find(text, tokenizer.DATE) == "15/03/2024"
+
+
+def test_fee_rows_start_at_the_section_end_marker():
+    grammar = NoteGrammar(table_marker="Negócios", section_end="Resumo")
+    text = "Negócios\nrow 1\nrow 2 Resumo Taxa 1,00\nTaxa 2,00"
+
+    assert [(token.kind, token.value) for token in grammar.tokenize(text)] == [
+        (tokenizer.TRADE_ROW, "row 1"),
+        (tokenizer.SECTION_END, "row 2 Resumo Taxa 1,00"),
+        (tokenizer.FEE_ROW, "Resumo Taxa 1,00"),
+        (tokenizer.FEE_ROW, "Taxa 2,00"),
+    ]
+
+
+def test_missing_sections():
+    grammar = NoteGrammar(date_label="Data", note_id_label="Nota", table_marker="Negócios", section_end="Resumo")
+
+    assert list(grammar.tokenize("")) == []
+    assert grammar.find("Nota\nsem número", tokenizer.NOTE_ID) is None
+    assert [token.kind for token in grammar.tokenize("Resumo\nTaxa 1,00")] == [tokenizer.FEE_ROW, tokenizer.FEE_ROW]
+
+
+def test_grammar_without_labels_yields_nothing():
+    assert list(NoteGrammar().tokenize(RICO_NOTE)) == []
@@ -0,0 +1,142 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import make_note, make_note_pages, write_pdf
+from extractors.rico import Rico
+from pipeline.watch import UNASSIGNED, Watcher
+
+
+@pytest.fixture
+def notes(tmp_path):
+    directory = tmp_path / "notes"
+    (directory / "alice").mkdir(parents=True)
+
+    return directory
+
+
+@pytest.fixture
+def watcher(notes, tmp_path):
+    return Watcher(str(notes), str(tmp_path / "extracted"), workers=1)
+
+
+def _write(path, broker: str = "rico", **kwargs) -> str:
+    make_note(str(path), broker, unindexed_ratio=0, **kwargs)
+
+    return str(path)
+
+
+def _output(watcher: Watcher, customer: str) -> list:
+    with open(os.path.join(watcher.store.directory, f"{customer}.ndjson"), encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def _stats(**counts) -> dict:
+    return {"extracted": 0, "failed": 0, "unchanged": 0, "deleted": 0, "pending": 0, **counts}
+
+
+def test_new_notes_are_extracted_per_customer(watcher, notes):
+    alice = _write(notes / "alice" / "march.pdf", trades=3)
+    loose = _write(notes / "loose.pdf", "nuinvest", trades=2)
+
+    assert watcher.sync() == _stats(extracted=2)
+    assert [(record["source"], record["broker"]) for record in _output(watcher, "alice")] == [(alice, "rico")] * 3
+    assert [record["source"] for record in _output(watcher, UNASSIGNED)] == [loose] * 2
+
+    entry = watcher.manifest.get(alice)
+
+    assert (entry.broker, entry.version, entry.count, entry.error) == ("rico", Rico.VERSION, 3, None)
+
+
+def test_unchanged_notes_are_skipped(watcher, notes, monkeypatch):
+    path = _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    monkeypatch.setattr("pipeline.watch.hash_file", pytest.fail)
+
+    assert watcher.sync() == _stats(unchanged=1)
+    assert watcher.sync([path]) == _stats(unchanged=1)
+
+
+def test_touched_notes_are_hashed_but_not_extracted(watcher, notes):
+    path = _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    os.utime(path, ns=(0, 0))
+
+    assert watcher.sync() == _stats(unchanged=1)
+    assert watcher.manifest.get(path).mtime_ns == 0
+    assert len(_output(watcher, "alice")) == 3
+
+
+def test_changed_notes_are_extracted_again(watcher, notes):
+    path = _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    first = watcher.manifest.get(path)
+    _write(path, trades=4, seed=1)
+
+    assert watcher.sync() == _stats(extracted=1)
+
+    entry = watcher.manifest.get(path)
+    records = _output(watcher, "alice")
+
+    assert entry.sha256 != first.sha256
+    assert (len(records), entry.offset > first.offset, entry.count) == (7, True, 4)
+    assert {record["sha256"] for record in records[3:]} == {entry.sha256}
+
+
+def test_version_bumps_extract_notes_again(watcher, notes, monkeypatch):
+    _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    monkeypatch.setattr(Rico, "VERSION", Rico.VERSION + "-next")
+
+    assert watcher.sync() == _stats(extracted=1)
+    assert watcher.sync() == _stats(unchanged=1)
+
+
+def test_deleted_notes_are_recorded(watcher, notes):
+    path = _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    os.remove(path)
+
+    assert watcher.sync() == _stats(deleted=1)
+    assert _output(watcher, "alice")[-1] == {"source": path, "deleted": True}
+    assert watcher.manifest.get(path) is None
+    assert watcher.sync() == _stats()
+
+
+def test_failed_notes_are_retried(watcher, notes):
+    path = _write(notes / "alice" / "march.pdf", trades=3, password="1234")
+
+    assert watcher.sync() == _stats(failed=1)
+    assert watcher.manifest.get(path).error is not None
+
+    # Not before RETRY_SECONDS passed, and without writing the same error twice
+    assert watcher.sync() == _stats(unchanged=1)
+    assert watcher.sync(retry=True) == _stats(failed=1)
+    assert [record["error"]["type"] for record in _output(watcher, "alice")] == ["PDFPasswordError"]
+
+    watcher.password = "1234"
+
+    assert watcher.sync([path], retry=True) == _stats(extracted=1)
+    assert watcher.manifest.get(path).error is None
+    assert len(_output(watcher, "alice")) == 4
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_notes_without_records_keep_their_broker(watcher, notes, use_cache):
+    path = str(notes / "alice" / "empty.pdf")
+    write_pdf(path, make_note_pages("nuinvest", []))
+    watcher.use_cache = use_cache
+
+    assert watcher.sync() == _stats(extracted=1)
+    assert watcher.manifest.get(path).broker == "nuinvest"
+    assert watcher.sync() == _stats(unchanged=1)
+
+
+def test_notes_extracted_by_an_unknown_broker_are_stale(watcher, notes):
+    path = _write(notes / "alice" / "march.pdf", trades=3)
+    watcher.sync()
+    watcher.manifest.put(watcher.manifest.get(path)._replace(broker=None, version=None))
+
+    assert watcher.sync() == _stats(extracted=1)
+    assert watcher.manifest.get(path).broker == "rico"
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from abstract import profiler
+from cache.ticker_cache import TickerCache
+from resolvers.yahoo import YahooFinanceResolver
+
+
+class StubYahoo(ThreadingHTTPServer):
+    """
+    Local stand-in for the Yahoo Finance search endpoint.
+
+    `symbols` maps queries to the symbol answered, queries missing from it have no quotes, and
+    `throttled` maps queries to the number of 429 responses sent before answering them.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.symbols = {}
+        self.throttled = {}
+        self.retry_after = "0"
+        self.queries = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v1/finance/search"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        self.server.queries.append(query)
+
+        if self.server.throttled.get(query):
+            self.server.throttled[query] -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", self.server.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        symbol = self.server.symbols.get(query)
+        body = json.dumps({"quotes": [{"symbol": symbol}] if symbol else []}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StubYahoo()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resolver(server, tmp_path):
+    return YahooFinanceResolver(TickerCache(path=str(tmp_path / "tickers.sqlite3")), url=server.url, rate=1000.0, backoff=0.0)
+
+
+def test_resolve_strips_exchange_suffix(server, resolver):
+    server.symbols["VALE ON NM"] = "VALE3.SA"
+
+    assert resolver.resolve("VALE ON NM") == "VALE3"
+
+
+def test_resolve_retries_shorter_names(server, resolver):
+    server.symbols["EXAMPLE"] = "EXMP3.SA"
+
+    assert resolver.resolve("EXAMPLE ON NM") == "EXMP3"
+    assert server.queries == ["EXAMPLE ON NM", "EXAMPLE ON", "EXAMPLE"]
+
+
+def test_retries_after_429_honoring_retry_after(server, resolver):
+    server.symbols["VALE ON"] = "VALE3.SA"
+    server.throttled["VALE ON"] = 2
+
+    assert resolver.resolve_many(["VALE ON"]) == {"VALE ON": "VALE3"}
+    assert server.queries == ["VALE ON"] * 3
+    assert resolver.requests_made == 3
+
+
+def test_retry_delay_reads_retry_after(server, resolver):
+    server.retry_after = "1"
+    server.symbols["VALE ON"] = "VALE3.SA"
+    server.throttled["VALE ON"] = 1
+    response = resolver._request("VALE ON")
+
+    assert response.status_code == 429
+    assert resolver._retry_delay(response, 0) == 1.0
+
+
+def test_retry_delay_reads_http_dates(server, resolver):
+    server.retry_after = "Wed, 21 Oct 2015 07:28:00 GMT"
+    server.throttled["VALE ON"] = 1
+
+    assert resolver._retry_delay(resolver._request("VALE ON"), 0) == 0.0
+
+
+def test_long_retry_after_fails_the_name(server, resolver):
+    # A single answer asking to wait an hour must not stall the extraction for that hour
+    server.retry_after = "3600"
+    server.throttled["VALE ON"] = 1
+
+    with pytest.raises(Exception, match="HTTP 429"):
+        resolver.resolve_many(["VALE ON"])
+
+    assert server.queries == ["VALE ON"]
+
+
+def test_gives_up_after_max_retries(server, resolver):
+    server.throttled["VALE ON"] = resolver.max_retries + 1
+
+    with pytest.raises(Exception, match="HTTP 429"):
+        resolver.resolve("VALE ON")
+
+    assert len(server.queries) == resolver.max_retries + 1
+
+
+def test_misses_are_cached(server, resolver):
+    assert resolver.resolve_many(["UNKNOWN ON"]) == {"UNKNOWN ON": None}
+    queried = list(server.queries)
+
+    assert resolver.resolve_many(["UNKNOWN ON"]) == {"UNKNOWN ON": None}
+    assert server.queries == queried == ["UNKNOWN ON", "UNKNOWN"]
+    assert resolver.cache.lookup("UNKNOWN ON") is None
+
+
+def test_resolve_many_deduplicates_names(server, resolver):
+    server.symbols["VALE ON"] = "VALE3.SA"
+    server.symbols["ITAUUNIBANCO PN"] = "ITUB4.SA"
+
+    resolved = resolver.resolve_many(["VALE ON", " VALE ON ", "ITAUUNIBANCO PN"])
+
+    assert resolved == {"VALE ON": "VALE3", "ITAUUNIBANCO PN": "ITUB4"}
+    assert sorted(server.queries) == ["ITAUUNIBANCO PN", "VALE ON"]
+
+
+def test_resolve_many_inside_running_event_loop(server, resolver):
+    server.symbols["VALE ON"] = "VALE3.SA"
+    # The cache connection is opened outside of the loop's helper thread
+    resolver.cache.lookup("VALE ON")
+
+    async def extract():
+        with profiler.profile() as note_profiler:
+            return resolver.resolve_many(["VALE ON"]), note_profiler.stats()
+
+    resolved, stats = asyncio.run(extract())
+
+    assert resolved == {"VALE ON": "VALE3"}
+    # The lookups of the helper thread are counted by the caller's profiler
+    assert stats["counters"] == {"ticker_cache_misses": 1, "ticker_requests": 1}